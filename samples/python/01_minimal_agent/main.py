@@ -5,17 +5,29 @@ import sys
 from typing import Optional
 
 from azure.ai.agents.models import CodeInterpreterTool, MessageRole
-from azure.ai.projects import AIProjectClient
 from azure.core.exceptions import HttpResponseError
-from azure.identity import DefaultAzureCredential
 
-from ..common import configure_logging, load_config, pretty_print_messages
+from ..common import (
+    AgentRegistry,
+    MessageReader,
+    RunStream,
+    configure_logging,
+    configure_metrics,
+    discard_thread,
+    echo_run,
+    get_metrics,
+    load_config,
+    pretty_print_messages,
+    shared_project_client,
+)
+from ..common.metrics import MESSAGE_LIST, THREAD_CREATE
 
 _logger = logging.getLogger("minimal_agent")
 
 
 def main() -> int:
     configure_logging()
+    configure_metrics()
 
     try:
         config = load_config()
@@ -23,47 +35,52 @@ def main() -> int:
         _logger.error("Failed to load configuration (設定を読み込めませんでした): %s", exc)
         return 1
 
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
-
-    with AIProjectClient(endpoint=config.project_endpoint, credential=credential) as project_client:
-        agent = None
+    with shared_project_client(config.project_endpoint) as project_client:
+        registry = AgentRegistry(project_client.agents, config.project_endpoint)
+        agent_id: Optional[str] = None
+        thread = None
         try:
             _logger.info(
-                "Creating agent (エージェントを作成します) [model=%s]", config.model_deployment_name
+                "Preparing agent (エージェントを準備します) [model=%s]", config.model_deployment_name
             )
-            agent = project_client.agents.create_agent(
+            agent_id = registry.acquire(
                 model=config.model_deployment_name,
                 name="workshop-minimal-agent",
                 instructions="You are a polite assistant for quick math checks.",
                 tools=CodeInterpreterTool().definitions,
             )
-            thread = project_client.agents.threads.create()
+            with get_metrics().time(THREAD_CREATE, agent_id):
+                thread = project_client.agents.threads.create()
             project_client.agents.messages.create(
                 thread_id=thread.id,
                 role=MessageRole.USER,
                 content="Please plot y = 4x + 9 and summarise the intercepts.",
             )
 
-            run = project_client.agents.runs.create_and_process(
-                thread_id=thread.id,
-                agent_id=agent.id,
-                additional_instructions="Address the user as Workshop Participant.",
+            run = echo_run(
+                RunStream(
+                    project_client.agents,
+                    thread_id=thread.id,
+                    agent_id=agent_id,
+                    additional_instructions="Address the user as Workshop Participant.",
+                )
             )
             if run.status == "failed":
                 _logger.error("Agent run failed (エージェントの実行が失敗しました): %s", run.last_error)
                 return 1
 
             _logger.info("Fetching thread responses (スレッドの応答を取得します)")
-            messages = project_client.agents.messages.list(thread_id=thread.id)
-            pretty_print_messages(messages)
+            with get_metrics().time(MESSAGE_LIST, agent_id):
+                pretty_print_messages(MessageReader(project_client.agents).new_messages(thread.id))
             return 0
         except HttpResponseError as exc:
             _logger.exception("Azure AI Agent Service call failed (Azure AI Agent Service 呼び出しに失敗しました): %s", exc)
             return 1
         finally:
-            if agent is not None:
-                _logger.info("Deleting created agent (作成したエージェントを削除します)")
-                project_client.agents.delete_agent(agent.id)
+            if thread is not None:
+                discard_thread(project_client.agents, thread.id)
+            if agent_id is not None:
+                registry.release(agent_id)
 
 
 if __name__ == "__main__":
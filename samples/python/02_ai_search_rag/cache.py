@@ -0,0 +1,262 @@
+"""Response cache in front of the RAG agent.
+
+Answers are keyed by the normalised question plus the search index name. With an
+``embedder``, a second tier returns the answer of the most similar cached question when its
+cosine similarity reaches ``threshold``. That tier is only as good as the embedding model:
+use a real embedding deployment (:class:`~samples.python.common.embeddings.AzureOpenAIEmbedder`);
+the lexical ``HashingEmbedder`` scores "... product A ..." and "... product B ..." above 0.95
+and is for tests only. Entries expire after ``ttl`` seconds, the least recently used are
+evicted beyond ``max_entries``, and the cache is persisted as JSON.
+
+Lookups stay cheap under concurrency: the question is embedded outside the cache lock, the
+vector of a miss is reused by the following :meth:`ResponseCache.store`, and hits only
+update the in-memory LRU state, which is written on the next store or on
+:meth:`ResponseCache.close`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from azure.ai.agents.models import MessageTextUrlCitationAnnotation
+
+from ..common.embeddings import Embedder, VectorIndex, normalize_text
+
+_logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_PATH = Path.home() / ".cache" / "azure-ai-agent-workshop" / "rag-cache.json"
+
+
+def cache_path_from_env() -> Optional[Path]:
+    """``WORKSHOP_RAG_CACHE`` overrides the cache file; ``off`` disables the cache."""
+
+    value = os.getenv("WORKSHOP_RAG_CACHE", str(_DEFAULT_CACHE_PATH))
+    if value.lower() in {"", "0", "false", "no", "off"}:
+        return None
+    return Path(value)
+
+
+@dataclass(slots=True)
+class CachedAnswer:
+    query: str
+    index_name: str
+    text: str
+    annotations: list[dict[str, Any]]
+    created_at: float
+    last_used_at: float
+    vector: Optional[list[float]] = None
+    embedding_model: Optional[str] = None
+    hits: int = 0
+    similarity: float = field(default=1.0, compare=False)
+
+    @property
+    def url_citation_annotations(self) -> list[MessageTextUrlCitationAnnotation]:
+        return [MessageTextUrlCitationAnnotation(annotation) for annotation in self.annotations]
+
+
+def _annotation_dict(annotation: Any) -> dict[str, Any]:
+    return annotation.as_dict() if hasattr(annotation, "as_dict") else dict(annotation)
+
+
+def _exact_key(index_name: str, query: str) -> str:
+    return hashlib.sha256(f"{index_name}\n{normalize_text(query)}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (exact, then embedding-similarity) cache for RAG answers.
+
+    Parameters
+    ----------
+    path:
+        JSON file to persist entries in; ``None`` keeps the cache in memory.
+    embedder:
+        Optional callable returning a normalised vector for a question. Enables the
+        similarity tier. Its ``name`` attribute (if any) is stored with each vector, so
+        vectors from a different model are never compared.
+    threshold:
+        Minimum cosine similarity for a similarity hit.
+    ttl, max_entries:
+        Expiry in seconds and LRU capacity.
+    lsh_tables:
+        Use an LSH-accelerated :class:`VectorIndex` instead of pure brute force.
+    """
+
+    # Vectors of recent misses kept for the store() that usually follows them.
+    _PENDING_VECTORS = 64
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        embedder: Optional[Embedder] = None,
+        threshold: float = 0.92,
+        ttl: float = 24 * 3600,
+        max_entries: int = 512,
+        lsh_tables: int = 0,
+    ) -> None:
+        self.path = path
+        self.embedder = embedder
+        self.embedding_model = getattr(embedder, "name", type(embedder).__name__) if embedder else None
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self._index: Optional[VectorIndex] = None
+        self._lsh_tables = lsh_tables
+        self._pending: OrderedDict[str, list[float]] = OrderedDict()
+        self._dirty = False
+        self._load()
+
+    def _vector_index(self, dim: int) -> VectorIndex:
+        if self._index is None:
+            self._index = VectorIndex(dim, lsh_tables=self._lsh_tables)
+        return self._index
+
+    def _expired(self, entry: CachedAnswer, now: float) -> bool:
+        return now - entry.created_at > self.ttl
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._index is not None:
+            self._index.remove(key)
+        self._dirty = True
+
+    def _embed(self, query: str) -> list[float]:
+        return [float(value) for value in self.embedder(query)]
+
+    def lookup(self, index_name: str, query: str) -> Optional[CachedAnswer]:
+        """Return a cached answer for ``query`` against ``index_name``, or ``None``."""
+
+        now = time.time()
+        key = _exact_key(index_name, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                return self._hit(key, entry, 1.0, now)
+            searchable = self.embedder is not None and self._index is not None and len(self._index) > 0
+        if searchable:
+            # With a real model this is a network round trip: never hold the lock across it.
+            vector = self._embed(query)
+            with self._lock:
+                self._pending[key] = vector
+                while len(self._pending) > self._PENDING_VECTORS:
+                    self._pending.popitem(last=False)
+                for candidate_key, score in self._index.search(vector, k=4):
+                    candidate = self._entries.get(candidate_key)
+                    if score < self.threshold:
+                        break
+                    if candidate is None or candidate.index_name != index_name:
+                        continue
+                    if self._expired(candidate, now):
+                        self._drop(candidate_key)
+                        continue
+                    return self._hit(candidate_key, candidate, score, now)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _hit(self, key: str, entry: CachedAnswer, similarity: float, now: float) -> CachedAnswer:
+        if similarity < 1.0:
+            self.similar_hits += 1
+        else:
+            self.hits += 1
+        entry.hits += 1
+        entry.last_used_at = now
+        entry.similarity = similarity
+        self._entries.move_to_end(key)
+        self._dirty = True
+        return entry
+
+    def store(self, index_name: str, query: str, text: str, annotations: list[Any]) -> CachedAnswer:
+        """Cache an answer together with its ``url_citation_annotations``."""
+
+        now = time.time()
+        key = _exact_key(index_name, query)
+        vector = None
+        if self.embedder is not None:
+            with self._lock:
+                vector = self._pending.pop(key, None)
+            if vector is None:
+                vector = self._embed(query)
+        entry = CachedAnswer(
+            query=query,
+            index_name=index_name,
+            text=text,
+            annotations=[_annotation_dict(item) for item in annotations],
+            created_at=now,
+            last_used_at=now,
+            vector=vector,
+            embedding_model=self.embedding_model if vector is not None else None,
+        )
+        with self._lock:
+            self._insert(key, entry)
+            self._save()
+        return entry
+
+    def close(self) -> None:
+        """Write hit counts and LRU order recorded since the last store."""
+
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _insert(self, key: str, entry: CachedAnswer) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if entry.vector is not None:
+            self._vector_index(len(entry.vector)).add(key, entry.vector)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            _logger.warning("Ignoring unreadable response cache %s: %s", self.path, exc)
+            return
+        now = time.time()
+        for key, record in sorted(data.items(), key=lambda item: item[1].get("last_used_at", 0.0)):
+            record.pop("similarity", None)
+            entry = CachedAnswer(**record)
+            if self._expired(entry, now):
+                continue
+            # Vectors from another (or no) model only serve exact hits; re-embedding every
+            # entry here would cost a model call per entry on start-up.
+            if entry.embedding_model != self.embedding_model:
+                entry.vector = entry.embedding_model = None
+            self._insert(key, entry)
+
+    def _save(self) -> None:
+        self._dirty = False
+        if self.path is None:
+            return
+        data = {}
+        for key, entry in self._entries.items():
+            record = asdict(entry)
+            record.pop("similarity")
+            data[key] = record
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
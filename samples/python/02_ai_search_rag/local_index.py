@@ -0,0 +1,336 @@
+"""In-process hybrid retrieval as an offline alternative to ``AzureAISearchTool``.
+
+A BM25 inverted index and a dense embedding matrix are built in bulk, saved as ``.npy``
+arrays and memory-mapped on load. Queries score both with NumPy, fuse the rankings with
+reciprocal rank fusion, and return ``top_k`` hits shaped like the citations the RAG sample
+logs (title and URL)::
+
+    python -m samples.python.02_ai_search_rag.local_index build
+    python -m samples.python.02_ai_search_rag.local_index query "How is RAG scope defined?"
+    python -m samples.python.02_ai_search_rag.local_index bench --queries 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import statistics
+import sys
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from azure.ai.agents.models import FunctionTool, MessageTextUrlCitationAnnotation, MessageTextUrlCitationDetails
+
+from ..common.embeddings import Embedder, HashingEmbedder, np
+
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_SOURCE = _REPO_ROOT / "docs" / "en" / "document-samples.md"
+DEFAULT_INDEX_DIR = Path.home() / ".cache" / "azure-ai-agent-workshop" / "local-index"
+
+_HEADING = re.compile(r"^(E-\d+)\.\s+(.+)$")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_RRF_K = 60
+
+
+@dataclass(slots=True)
+class Document:
+    doc_id: str
+    title: str
+    url: str
+    text: str
+
+
+@dataclass(slots=True)
+class SearchHit:
+    title: str
+    url: str
+    score: float
+    content: str
+
+
+def _source_url(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(_REPO_ROOT).as_posix()
+    except ValueError:
+        return path.name
+
+
+def parse_document_samples(path: Path = DEFAULT_SOURCE) -> list[Document]:
+    """Split ``document-samples.md`` into one :class:`Document` per ``E-n.`` heading."""
+
+    documents: list[Document] = []
+    current: Optional[dict[str, Any]] = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        match = _HEADING.match(line.strip())
+        if match:
+            if current:
+                documents.append(Document(**current))
+            doc_id, title = match.groups()
+            current = {
+                "doc_id": doc_id,
+                "title": title.strip(),
+                "url": f"{_source_url(path)}#{doc_id.lower()}",
+                "text": "",
+            }
+        elif current is not None and line.strip() and not line.startswith(("Length:", "Text:")):
+            current["text"] = f"{current['text']} {line.strip()}".strip()
+    if current:
+        documents.append(Document(**current))
+    return documents
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens; words outside ASCII (e.g. Japanese) become character bigrams."""
+
+    tokens: list[str] = []
+    for word in _TOKEN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if word.isascii() or len(word) < 2:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _batched(items: list[Any], size: int) -> Iterator[list[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def build_index(
+    documents: Iterable[Document],
+    directory: Path = DEFAULT_INDEX_DIR,
+    *,
+    embedder: Optional[Embedder] = None,
+    batch_size: int = 256,
+) -> Path:
+    """Bulk-build the BM25 postings and dense vectors for ``documents`` into ``directory``.
+
+    Embeddings are computed ``batch_size`` documents at a time and written straight into a
+    memory-mapped ``.npy`` file, so the corpus never needs to fit in memory as vectors.
+    """
+
+    if np is None:
+        raise RuntimeError("numpy is required for the local index (pip install numpy)")
+    documents = list(documents)
+    embedder = embedder or HashingEmbedder()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    postings: dict[str, list[tuple[int, int]]] = {}
+    lengths = np.zeros(len(documents), dtype=np.float32)
+    for position, document in enumerate(documents):
+        counts = Counter(tokenize(f"{document.title} {document.text}"))
+        lengths[position] = sum(counts.values())
+        for term, count in counts.items():
+            postings.setdefault(term, []).append((position, count))
+
+    vocabulary: dict[str, list[int]] = {}
+    doc_ids: list[int] = []
+    term_freqs: list[int] = []
+    for term, entries in sorted(postings.items()):
+        vocabulary[term] = [len(doc_ids), len(entries)]
+        doc_ids.extend(position for position, _ in entries)
+        term_freqs.extend(count for _, count in entries)
+    np.save(directory / "postings_docs.npy", np.asarray(doc_ids, dtype=np.int32))
+    np.save(directory / "postings_tf.npy", np.asarray(term_freqs, dtype=np.float32))
+    np.save(directory / "doc_lengths.npy", lengths)
+
+    dim = len(embedder("dimension probe"))
+    vectors = np.lib.format.open_memmap(
+        directory / "vectors.npy", mode="w+", dtype=np.float32, shape=(len(documents), dim)
+    )
+    for batch_number, batch in enumerate(_batched(documents, batch_size)):
+        start = batch_number * batch_size
+        vectors[start:start + len(batch)] = np.stack(
+            [embedder(f"{document.title}\n{document.text}") for document in batch]
+        )
+    vectors.flush()
+    del vectors
+
+    meta = {
+        "documents": [asdict(document) for document in documents],
+        "vocabulary": vocabulary,
+        "average_length": float(lengths.mean()) if len(documents) else 0.0,
+        "dim": dim,
+    }
+    (directory / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return directory
+
+
+class LocalHybridIndex:
+    """Memory-mapped BM25 + dense index answering queries with reciprocal rank fusion."""
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_INDEX_DIR,
+        *,
+        embedder: Optional[Embedder] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for the local index (pip install numpy)")
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        self.documents = [Document(**document) for document in meta["documents"]]
+        self.vocabulary: dict[str, list[int]] = meta["vocabulary"]
+        self.average_length = meta["average_length"] or 1.0
+        self.embedder = embedder or HashingEmbedder(meta["dim"])
+        self._postings_docs = np.load(directory / "postings_docs.npy", mmap_mode="r")
+        self._postings_tf = np.load(directory / "postings_tf.npy", mmap_mode="r")
+        self._lengths = np.load(directory / "doc_lengths.npy", mmap_mode="r")
+        self._vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        self.k1 = k1
+        # Length normalisation does not depend on the query, so compute it once.
+        self._norm = k1 * (1 - b + b * np.asarray(self._lengths) / self.average_length)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def bm25(self, query: str) -> Any:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        count = len(self.documents)
+        for term in set(tokenize(query)):
+            entry = self.vocabulary.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            docs = self._postings_docs[offset:offset + df]
+            tf = self._postings_tf[offset:offset + df]
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            # Each document appears once per posting list, so fancy-index addition is safe.
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        return scores
+
+    def dense(self, query: str) -> Any:
+        return self._vectors @ np.asarray(self.embedder(query), dtype=np.float32)
+
+    def search(self, query: str, top_k: int = 5) -> list[SearchHit]:
+        """Return the ``top_k`` documents by reciprocal rank fusion of BM25 and dense ranks."""
+
+        if not self.documents:
+            return []
+        fused = np.zeros(len(self.documents), dtype=np.float64)
+        for scores, keep in ((self.bm25(query), True), (self.dense(query), False)):
+            ranks = np.empty(len(scores), dtype=np.int64)
+            ranks[np.argsort(-scores, kind="stable")] = np.arange(len(scores))
+            contribution = 1.0 / (_RRF_K + 1 + ranks)
+            if keep:
+                # Documents without any keyword match get no lexical vote.
+                contribution[scores <= 0] = 0.0
+            fused += contribution
+        best = np.argsort(-fused, kind="stable")[:top_k]
+        return [
+            SearchHit(
+                title=self.documents[i].title,
+                url=self.documents[i].url,
+                score=float(fused[i]),
+                content=self.documents[i].text,
+            )
+            for i in best
+        ]
+
+
+def create_local_search_tool(
+    index: LocalHybridIndex, top_k: int = 5, *, on_results: Optional[Callable[[list[SearchHit]], None]] = None
+) -> FunctionTool:
+    """Wrap ``index`` in a function tool the RAG agent can call instead of Azure AI Search.
+
+    ``on_results`` receives the hits of every call, e.g. to build citations with
+    :func:`citations_from_hits`; function tool answers carry no ``url_citation`` annotations.
+    """
+
+    def search_local_documents(query: str) -> str:
+        """Search the local document index and return matching documents with title and URL.
+
+        Parameters
+        ----------
+        query: str
+            Search query in natural language.
+        """
+
+        hits = index.search(query, top_k)
+        if on_results is not None:
+            on_results(hits)
+        return json.dumps([asdict(hit) for hit in hits], ensure_ascii=False)
+
+    return FunctionTool(functions={search_local_documents})
+
+
+def citations_from_hits(hits: Iterable[SearchHit], answer: str) -> list[MessageTextUrlCitationAnnotation]:
+    """URL citations for the retrieved documents ``answer`` cites by URL or title.
+
+    When the answer names none of them, every retrieved document is returned as a source.
+    Documents are de-duplicated by URL, keeping retrieval order.
+    """
+
+    unique = list({hit.url: hit for hit in hits}.values())
+    cited = [hit for hit in unique if hit.url in answer or hit.title in answer] or unique
+    return [
+        MessageTextUrlCitationAnnotation(
+            text=f"【{position}†source】", url_citation=MessageTextUrlCitationDetails(url=hit.url, title=hit.title)
+        )
+        for position, hit in enumerate(cited)
+    ]
+
+
+def _benchmark(index: LocalHybridIndex, queries: int, top_k: int) -> None:
+    samples = [document.title for document in index.documents] or ["agent"]
+    latencies = []
+    for number in range(queries):
+        started = time.perf_counter()
+        hits = index.search(samples[number % len(samples)], top_k)
+        json.dumps([asdict(hit) for hit in hits])
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)]
+    print(f"documents={len(index)} queries={queries} top_k={top_k}")
+    print(f"p50={statistics.median(latencies):.3f}ms p95={p95:.3f}ms max={latencies[-1]:.3f}ms")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local hybrid index for the RAG sample")
+    parser.add_argument("--index-dir", type=Path, default=DEFAULT_INDEX_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Bulk-index document samples")
+    build.add_argument("--source", type=Path, default=DEFAULT_SOURCE)
+    build.add_argument("--batch-size", type=int, default=256)
+    build.add_argument(
+        "--replicate", type=int, default=1, help="Index N copies of each document to benchmark a larger corpus"
+    )
+    query = commands.add_parser("query", help="Run one query")
+    query.add_argument("text")
+    query.add_argument("--top-k", type=int, default=5)
+    bench = commands.add_parser("bench", help="Measure query latency")
+    bench.add_argument("--queries", type=int, default=200)
+    bench.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        documents = parse_document_samples(args.source)
+        if args.replicate > 1:
+            documents = [
+                Document(f"{document.doc_id}-{copy}", document.title, document.url, document.text)
+                for copy in range(args.replicate)
+                for document in documents
+            ]
+        build_index(documents, args.index_dir, batch_size=args.batch_size)
+        print(f"Indexed {len(documents)} documents into {args.index_dir} in {time.perf_counter() - started:.2f}s")
+        return 0
+
+    index = LocalHybridIndex(args.index_dir)
+    if args.command == "query":
+        for hit in index.search(args.text, args.top_k):
+            print(f"{hit.score:.4f}  {hit.title}  ({hit.url})")
+    else:
+        _benchmark(index, args.queries, args.top_k)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
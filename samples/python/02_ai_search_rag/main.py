@@ -1,25 +1,112 @@
 from __future__ import annotations
 
 import logging
+import os
 import sys
-from typing import Optional
+from pathlib import Path
+from typing import Any, Optional
 
 from azure.ai.agents.models import (
     AzureAISearchQueryType,
     AzureAISearchTool,
     MessageRole,
 )
-from azure.ai.projects import AIProjectClient
 from azure.core.exceptions import HttpResponseError
-from azure.identity import DefaultAzureCredential
 
-from ..common import configure_logging, load_config
+from ..common import (
+    AgentRegistry,
+    MessageReader,
+    RunStream,
+    configure_logging,
+    configure_metrics,
+    discard_thread,
+    echo_run,
+    get_metrics,
+    load_config,
+    shared_project_client,
+)
+from ..common.embeddings import project_embedder
+from ..common.metrics import MESSAGE_LIST, THREAD_CREATE
+from .cache import ResponseCache, cache_path_from_env
+from .local_index import LocalHybridIndex, SearchHit, citations_from_hits, create_local_search_tool
 
 _logger = logging.getLogger("ai_search_rag")
 
+QUESTION = "Contoso 製品ラインの保守契約に関する最新の更新点を要約し、引用を明示してください。"
+
+
+def _log_citations(annotations: list) -> None:
+    for citation in annotations:
+        _logger.info("引用: %s (%s)", citation.url_citation.title, citation.url_citation.url)
+
+
+def _local_index_dir() -> Optional[Path]:
+    """``WORKSHOP_RAG_LOCAL_INDEX`` points at a ``local_index`` build to use instead of AI Search."""
+
+    value = os.getenv("WORKSHOP_RAG_LOCAL_INDEX")
+    return Path(value) if value else None
+
+
+def _search_setup(config: Any, local_dir: Optional[Path]) -> dict[str, Any]:
+    """Return agent tool arguments, instructions and local functions for the chosen retriever.
+
+    ``hits`` collects the local search results, from which citations are built.
+    """
+
+    if local_dir is not None:
+        hits: list[SearchHit] = []
+        tool = create_local_search_tool(LocalHybridIndex(local_dir), top_k=5, on_results=hits.extend)
+        return {
+            "tools": tool.definitions,
+            "tool_resources": None,
+            "functions": tool,
+            "hits": hits,
+            "instructions": (
+                "You answer questions using the search_local_documents tool. Always cite the document title and URL in markdown."
+            ),
+        }
+    search_tool = AzureAISearchTool(
+        index_connection_id=config.ai_search_connection_id,
+        index_name=config.ai_search_index_name,
+        query_type=AzureAISearchQueryType.VECTOR_SEMANTIC_HYBRID,
+        top_k=5,
+    )
+    return {
+        "tools": search_tool.definitions,
+        "tool_resources": search_tool.resources,
+        "functions": None,
+        "hits": None,
+        "instructions": (
+            "You answer questions using the Azure AI Search tool. Always cite the document title and URL in markdown."
+        ),
+    }
+
+
+def _open_cache(config: Any) -> Optional[ResponseCache]:
+    """Exact-match answer cache; ``WORKSHOP_RAG_CACHE_SIMILARITY=true`` adds the similarity tier.
+
+    The similarity tier needs a real embedding model (``EMBEDDING_DEPLOYMENT_NAME``): a
+    lexical embedding would answer "... product B ..." with the cached answer for "... product A ...".
+    """
+
+    path = cache_path_from_env()
+    if path is None:
+        return None
+    embedder = None
+    if os.getenv("WORKSHOP_RAG_CACHE_SIMILARITY", "false").lower() in {"1", "true", "yes", "on"}:
+        embedder = project_embedder(config)
+        if embedder is None:
+            _logger.warning(
+                "WORKSHOP_RAG_CACHE_SIMILARITY needs EMBEDDING_DEPLOYMENT_NAME; serving exact matches only "
+                "(類似検索には EMBEDDING_DEPLOYMENT_NAME が必要です。完全一致のみ使用します)"
+            )
+    threshold = float(os.getenv("WORKSHOP_RAG_CACHE_THRESHOLD", "0.92"))
+    return ResponseCache(path, embedder=embedder, threshold=threshold)
+
 
 def main() -> int:
     configure_logging()
+    configure_metrics()
 
     try:
         config = load_config()
@@ -27,70 +114,85 @@ def main() -> int:
         _logger.error("Failed to load configuration (設定の読み込みに失敗しました): %s", exc)
         return 1
 
-    if not config.has_search:
+    local_dir = _local_index_dir()
+    if local_dir is None and not config.has_search:
         _logger.error(
             "AI_SEARCH_CONNECTION_ID and AI_SEARCH_INDEX_NAME must be set (AI_SEARCH_CONNECTION_ID と AI_SEARCH_INDEX_NAME を設定してください)."
         )
         return 1
+    index_name = f"local:{local_dir}" if local_dir is not None else config.ai_search_index_name
+
+    cache = _open_cache(config)
+    cached = cache.lookup(index_name, QUESTION) if cache else None
+    if cached is not None:
+        _logger.info(
+            "Answer served from cache (キャッシュから回答しました) [similarity=%.3f]:\n%s",
+            cached.similarity,
+            cached.text,
+        )
+        _log_citations(cached.url_citation_annotations)
+        cache.close()
+        return 0
 
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
-
-    with AIProjectClient(endpoint=config.project_endpoint, credential=credential) as project_client:
+    with shared_project_client(config.project_endpoint) as project_client:
+        registry = AgentRegistry(project_client.agents, config.project_endpoint)
         agent_id: Optional[str] = None
+        thread = None
         try:
-            search_tool = AzureAISearchTool(
-                index_connection_id=config.ai_search_connection_id,
-                index_name=config.ai_search_index_name,
-                query_type=AzureAISearchQueryType.VECTOR_SEMANTIC_HYBRID,
-                top_k=5,
-            )
+            search = _search_setup(config, local_dir)
 
-            _logger.info("Creating agent for RAG scenario (RAG 用エージェントを作成します)")
-            agent = project_client.agents.create_agent(
+            _logger.info("Preparing agent for RAG scenario (RAG 用エージェントを準備します)")
+            agent_id = registry.acquire(
                 model=config.model_deployment_name,
                 name="workshop-rag-agent",
-                instructions=(
-                    "You answer questions using the Azure AI Search tool. Always cite the document title and URL in markdown."
-                ),
-                tools=search_tool.definitions,
-                tool_resources=search_tool.resources,
+                instructions=search["instructions"],
+                tools=search["tools"],
+                tool_resources=search["tool_resources"],
             )
-            agent_id = agent.id
 
-            thread = project_client.agents.threads.create()
+            with get_metrics().time(THREAD_CREATE, agent_id):
+                thread = project_client.agents.threads.create()
             project_client.agents.messages.create(
                 thread_id=thread.id,
                 role=MessageRole.USER,
-                content=(
-                    "Contoso 製品ラインの保守契約に関する最新の更新点を要約し、引用を明示してください。"
-                ),
+                content=QUESTION,
             )
 
-            run = project_client.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)
+            run = echo_run(
+                RunStream(
+                    project_client.agents, thread_id=thread.id, agent_id=agent_id, functions=search["functions"]
+                )
+            )
             if run.status == "failed":
                 _logger.error("Run failed (実行に失敗しました): %s", run.last_error)
                 return 1
 
-            response = project_client.agents.messages.list(thread_id=thread.id).get_last_message_by_role(
-                MessageRole.AGENT
-            )
+            with get_metrics().time(MESSAGE_LIST, agent_id):
+                response = MessageReader(project_client.agents).latest(thread.id, role=MessageRole.AGENT)
             if response is None:
                 _logger.warning("No response messages found (応答メッセージが見つかりませんでした)")
                 return 0
 
-            for text_message in response.text_messages:
-                _logger.info("回答: %s", text_message.text.value)
-            for citation in response.url_citation_annotations:
-                _logger.info("引用: %s (%s)", citation.url_citation.title, citation.url_citation.url)
+            text = "\n".join(message.text.value for message in response.text_messages)
+            citations = response.url_citation_annotations
+            if not citations and search["hits"]:
+                # Local search is a function tool, so the answer carries no url_citation annotations.
+                citations = citations_from_hits(search["hits"], text)
+            _log_citations(citations)
+            if cache is not None:
+                cache.store(index_name, QUESTION, text, citations)
 
             return 0
         except HttpResponseError as exc:
             _logger.exception("Failed to run RAG scenario (RAG シナリオの実行に失敗しました): %s", exc)
             return 1
         finally:
+            if thread is not None:
+                discard_thread(project_client.agents, thread.id)
             if agent_id:
-                _logger.info("Cleaning up agent (エージェントをクリーンアップします)")
-                project_client.agents.delete_agent(agent_id)
+                registry.release(agent_id)
+            if cache is not None:
+                cache.close()
 
 
 if __name__ == "__main__":
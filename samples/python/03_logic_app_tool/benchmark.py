@@ -0,0 +1,109 @@
+"""Compare Logic App tool call throughput with and without connection pooling.
+
+Runs against the local :mod:`.stand_in` server, so no Azure resources are needed::
+
+    python -m samples.python.03_logic_app_tool.benchmark --calls 500 --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Any, Callable, Optional
+
+import requests
+
+from ..common import AsyncLogicAppClient, LogicAppBatcher, LogicAppClient, LogicAppToolConfig
+from .stand_in import LogicAppStandIn, StandInBehaviour
+
+_sequence = count()
+
+
+def _payload() -> dict[str, Any]:
+    # Distinct bodies so the batcher cannot de-duplicate benchmark calls away.
+    return {"to": "ops@example.com", "subject": "Benchmark", "body": f"Hello #{next(_sequence)}"}
+
+
+def _measure(call: Callable[[], object], calls: int, concurrency: int) -> tuple[float, int]:
+    """Return ``(successful calls/sec, failed calls)``."""
+
+    failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(call) for _ in range(calls)]:
+            if future.exception() is not None:
+                failed += 1
+    return (calls - failed) / (time.perf_counter() - started), failed
+
+
+async def _measure_async(config: LogicAppToolConfig, calls: int, concurrency: int) -> tuple[float, int]:
+    slots = asyncio.Semaphore(concurrency)
+    async with AsyncLogicAppClient(config) as client:
+
+        async def call() -> None:
+            async with slots:
+                await client.post(_payload())
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(call() for _ in range(calls)), return_exceptions=True)
+        failed = sum(isinstance(outcome, Exception) for outcome in outcomes)
+        return (calls - failed) / (time.perf_counter() - started), failed
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Logic App tool client benchmark")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="Stand-in latency per request (s)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of 429 answers")
+    parser.add_argument("--batch-size", type=int, default=10, help="Max payloads per batched trigger")
+    args = parser.parse_args(argv)
+    # Retry warnings would swamp the results table.
+    logging.getLogger(LogicAppClient.__module__).setLevel(logging.ERROR)
+
+    server = LogicAppStandIn(
+        behaviour=StandInBehaviour(latency=args.latency, throttle_rate=args.throttle_rate, retry_after=0.01)
+    ).start()
+    config = LogicAppToolConfig(callback_url=server.url, pool_size=args.concurrency, backoff_factor=0.01)
+    pooled = LogicAppClient(config)
+    batcher = LogicAppBatcher(pooled, max_items=args.batch_size, window=0.01)
+
+    def bare_call() -> None:
+        requests.post(config.callback_url, json=_payload(), timeout=30).raise_for_status()
+
+    results: list[tuple[str, tuple[float, int], int]] = []
+
+    def record(name: str, measure: Callable[[], tuple[float, int]]) -> None:
+        triggers = server.triggers
+        results.append((name, measure(), server.triggers - triggers))
+
+    record("requests.post per call", lambda: _measure(bare_call, args.calls, args.concurrency))
+    record("pooled LogicAppClient", lambda: _measure(lambda: pooled.post(_payload()), args.calls, args.concurrency))
+    record(
+        f"batched (<= {args.batch_size} per trigger)",
+        lambda: _measure(lambda: batcher.submit(_payload()).result(), args.calls, args.concurrency),
+    )
+    try:
+        record("AsyncLogicAppClient", lambda: asyncio.run(_measure_async(config, args.calls, args.concurrency)))
+    except RuntimeError as exc:
+        print(f"Skipping async client: {exc}")
+
+    batcher.close()
+    pooled.close()
+    server.shutdown()
+    server.server_close()
+
+    baseline = results[0][1][0] or 1.0
+    print(f"{'client':<26}{'calls/sec':>12}{'speedup':>10}{'failed':>8}{'triggers':>10}")
+    for name, (rate, failed), triggers in results:
+        print(f"{name:<26}{rate:>12.1f}{rate / baseline:>9.2f}x{failed:>8}{triggers:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,51 @@
 from __future__ import annotations
 
 import logging
+import os
 import sys
 from typing import Optional
 
 import requests
 from azure.ai.agents.models import MessageRole
-from azure.ai.projects import AIProjectClient
 from azure.core.exceptions import HttpResponseError
-from azure.identity import DefaultAzureCredential
 
 from ..common import (
+    AgentRegistry,
     LogicAppToolConfig,
+    RunStream,
+    ToolDispatcher,
+    ToolLimits,
     configure_logging,
+    configure_metrics,
     create_logic_app_function_tool,
+    discard_thread,
+    echo_run,
+    get_metrics,
     load_config,
+    run_deadline,
+    shared_project_client,
 )
+from ..common.metrics import THREAD_CREATE
 
 _logger = logging.getLogger("logic_app_tool")
 
+RUN_BUDGET_SECONDS = 120.0
+# Several notifications in one step are sent in parallel, at most four at a time.
+TOOL_LIMITS = {
+    "send_email_via_logic_app": ToolLimits(timeout=60.0, max_concurrency=4),
+    "check_logic_app_status": ToolLimits(timeout=10.0),
+}
+
+
+def _async_pattern_enabled() -> bool:
+    """``LOGIC_APP_ASYNC_PATTERN=true`` returns a handle instead of waiting on the workflow."""
+
+    return os.getenv("LOGIC_APP_ASYNC_PATTERN", "false").lower() in {"1", "true", "yes", "on"}
+
 
 def main() -> int:
     configure_logging()
+    configure_metrics()
 
     try:
         config = load_config()
@@ -35,48 +59,59 @@ def main() -> int:
         )
         return 1
 
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
-
-    with AIProjectClient(endpoint=config.project_endpoint, credential=credential) as project_client:
+    with shared_project_client(config.project_endpoint) as project_client:
+        registry = AgentRegistry(project_client.agents, config.project_endpoint)
         agent_id: Optional[str] = None
+        thread = None
         try:
+            async_pattern = _async_pattern_enabled()
             tool = create_logic_app_function_tool(
-                LogicAppToolConfig(callback_url=config.logic_app_callback_url)
+                LogicAppToolConfig(callback_url=config.logic_app_callback_url, async_pattern=async_pattern)
             )
-
-            agent = project_client.agents.create_agent(
+            instructions = "You can send operational notifications by calling the send_email_via_logic_app tool."
+            if async_pattern:
+                instructions += (
+                    " The tool returns an operation handle; use check_logic_app_status when the user asks"
+                    " whether a notification was delivered."
+                )
+
+            agent_id = registry.acquire(
                 model=config.model_deployment_name,
                 name="workshop-logic-app-agent",
-                instructions="You can send operational notifications by calling the send_email_via_logic_app tool.",
+                instructions=instructions,
                 tools=tool.definitions,
             )
-            agent_id = agent.id
 
-            thread = project_client.agents.threads.create()
+            with get_metrics().time(THREAD_CREATE, agent_id):
+                thread = project_client.agents.threads.create()
             project_client.agents.messages.create(
                 thread_id=thread.id,
                 role=MessageRole.USER,
                 content="メールで本日の講義の開始時間をリマインドしてください。",
             )
 
-            run = project_client.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)
+            # Tool calls share the run's time budget instead of each waiting a fixed 30 s.
+            with run_deadline(RUN_BUDGET_SECONDS):
+                run = echo_run(
+                    RunStream(
+                        project_client.agents,
+                        thread_id=thread.id,
+                        agent_id=agent_id,
+                        functions=ToolDispatcher(tool, limits=TOOL_LIMITS),
+                    )
+                )
             if run.status == "failed":
                 _logger.error("Logic App integration failed (Logic App 連携実行が失敗しました): %s", run.last_error)
                 return 1
-
-            messages = project_client.agents.messages.list(thread_id=thread.id)
-            for message in messages:
-                if message.role == MessageRole.AGENT:
-                    for text_message in message.text_messages:
-                        _logger.info("Response: %s (応答)", text_message.text.value)
             return 0
         except (HttpResponseError, requests.RequestException) as exc:
             _logger.exception("Logic App tool execution failed (Logic App ツールの実行でエラーが発生しました): %s", exc)
             return 1
         finally:
+            if thread is not None:
+                discard_thread(project_client.agents, thread.id)
             if agent_id:
-                _logger.info("Deleting agent (エージェントを削除します)")
-                project_client.agents.delete_agent(agent_id)
+                registry.release(agent_id)
 
 
 if __name__ == "__main__":
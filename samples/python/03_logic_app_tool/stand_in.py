@@ -0,0 +1,149 @@
+"""Local stand-in for a Logic App HTTP trigger.
+
+Accepts POSTs on any path, answers with HTTP/1.1 keep-alive, and can simulate latency,
+throttling (429 with ``Retry-After``) and server errors so tool clients can be exercised
+offline. Accepted calls get a ``Location`` that answers 202 for ``run_duration`` seconds
+and 200 afterwards, like a workflow using the asynchronous response pattern::
+
+    python -m samples.python.03_logic_app_tool.stand_in --port 8765 --latency 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+@dataclass(slots=True)
+class StandInBehaviour:
+    latency: float = 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: float = 0.05
+    status: int = 202
+    run_duration: float = 0.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "LogicAppStandIn"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length) or b"null")
+        behaviour = self.server.behaviour
+        if behaviour.latency:
+            threading.Event().wait(behaviour.latency)
+
+        roll = random.random()
+        if roll < behaviour.throttle_rate:
+            self._reply(429, {"error": "throttled"}, {"Retry-After": f"{behaviour.retry_after:g}"})
+            return
+        if roll < behaviour.throttle_rate + behaviour.error_rate:
+            self._reply(503, {"error": "unavailable"})
+            return
+
+        with self.server.lock:
+            self.server.triggers += 1
+            run_id = self.server.triggers
+            self.server.started_at[run_id] = time.monotonic()
+            if isinstance(payload, list):
+                self.server.received.extend(payload)
+            else:
+                self.server.received.append(payload)
+        self._reply(behaviour.status, {"status": "queued"}, {"Location": self._location(run_id)})
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        """Serve the async-pattern status URL handed out in ``Location``."""
+
+        try:
+            run_id = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+            started_at = self.server.started_at[run_id]
+        except (ValueError, KeyError):
+            self._reply(404, {"error": "unknown run"})
+            return
+        remaining = started_at + self.server.behaviour.run_duration - time.monotonic()
+        if remaining > 0:
+            self._reply(202, {"status": "running"}, {"Location": self._location(run_id), "Retry-After": "1"})
+        else:
+            self._reply(200, {"status": "succeeded", "run": run_id})
+
+    def _location(self, run_id: int) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/runs/{run_id}"
+
+    def _reply(self, status: int, body: dict, headers: Optional[dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002 - stdlib signature
+        return
+
+
+class LogicAppStandIn(ThreadingHTTPServer):
+    """Threaded HTTP server recording every payload it accepts in :attr:`received`.
+
+    Array bodies (batched calls) count as one trigger in :attr:`triggers` and add each
+    item to :attr:`received`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, behaviour: Optional[StandInBehaviour] = None) -> None:
+        super().__init__((host, port), _Handler)
+        self.behaviour = behaviour or StandInBehaviour()
+        self.received: list = []
+        self.triggers = 0
+        self.started_at: dict[int, float] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/workflows/stand-in/triggers/manual/invoke"
+
+    def start(self) -> "LogicAppStandIn":
+        threading.Thread(target=self.serve_forever, name="logic-app-stand-in", daemon=True).start()
+        return self
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per request")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--run-duration", type=float, default=0.0, help="Seconds the status URL reports running")
+    args = parser.parse_args(argv)
+
+    behaviour = StandInBehaviour(
+        args.latency, args.throttle_rate, args.error_rate, run_duration=args.run_duration
+    )
+    server = LogicAppStandIn(args.host, args.port, behaviour)
+    print(f"Logic App stand-in listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
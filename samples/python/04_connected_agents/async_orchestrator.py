@@ -0,0 +1,208 @@
+"""asyncio-based Connected Agents orchestrator with parallel research fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from ..common import AsyncRunStream, UsageAccountant, get_metrics, load_config
+from ..common.metrics import THREAD_CREATE
+from .workflow import (
+    ResearchRequest,
+    WorkflowArtifacts,
+    WorkflowResult,
+    build_analysis_prompt,
+    build_research_prompt,
+    build_writing_prompt,
+    merge_research_json,
+    split_research_request,
+)
+
+_logger = logging.getLogger("connected_agents.async")
+
+
+class AsyncConnectedAgentsOrchestrator:
+    """Run research → analysis → writing with the research phase fanned out.
+
+    The request is split into sub-topics (see :func:`split_research_request`) that are
+    researched concurrently, bounded by ``max_concurrency``. Their JSON is merged before the
+    analysis and writing phases run. When a run spends the request's ``token_budget``, the
+    research runs still in flight are cancelled on the service instead of running to the end.
+
+    Parameters
+    ----------
+    client:
+        An async ``AIProjectClient`` (or the offline fake). When omitted, one is opened with
+        :func:`~samples.python.common.open_async_project_client` (on the process-wide
+        credential) for the duration of :meth:`run`.
+    max_concurrency:
+        Maximum number of agent runs in flight at once.
+    max_subtopics:
+        Maximum number of research sub-topics per request.
+    report_path:
+        Where to write the final report. ``None`` skips writing.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        *,
+        max_concurrency: int = 4,
+        max_subtopics: int = 4,
+        report_path: Optional[Path] = Path("connected_agents_report.md"),
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_subtopics = max_subtopics
+        self.report_path = report_path
+
+        if client is None:
+            self.config = load_config()
+            research = self.config.connected_research_agent_id
+            analysis = self.config.connected_analysis_agent_id
+            writing = self.config.connected_writing_agent_id
+        else:
+            research = analysis = writing = None
+        self.research_agent_id = research or "research-agent"
+        self.analysis_agent_id = analysis or "analysis-agent"
+        self.writing_agent_id = writing or "writing-agent"
+
+    async def run(self, request: ResearchRequest) -> WorkflowResult:
+        if self.client is not None:
+            return await self._run_workflow(self.client, request)
+
+        from ..common import open_async_project_client
+
+        # The shared CachingCredential means no credential chain or token request per workflow.
+        async with open_async_project_client(self.config.project_endpoint) as client:
+            return await self._run_workflow(client, request)
+
+    async def _run_workflow(self, client: Any, request: ResearchRequest) -> WorkflowResult:
+        artifacts = WorkflowArtifacts()
+        usage = UsageAccountant(request.token_budget)
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        def result(success: bool, message: str, **content: Optional[str]) -> WorkflowResult:
+            return WorkflowResult(success, message, artifacts=artifacts, token_usage=usage.phases, **content)
+
+        in_flight: set[asyncio.Task] = set()
+
+        async def limited(thread_name: str, agent_id: str, prompt: str) -> tuple[Optional[str], Optional[str]]:
+            async with slots:
+                if usage.exhausted:
+                    # Queued behind the run that used up the budget: do not start another one.
+                    return None, None
+                outcome = await self._run_agent(client, agent_id, prompt, thread_name, usage)
+            if usage.exhausted:
+                # Stop the sibling runs still going rather than let each of them finish.
+                for task in in_flight:
+                    if task is not asyncio.current_task():
+                        task.cancel()
+            return outcome
+
+        try:
+            parts = split_research_request(request, self.max_subtopics)
+            tasks = [
+                asyncio.create_task(limited("research", self.research_agent_id, build_research_prompt(part)))
+                for part in parts
+            ]
+            in_flight.update(tasks)
+            gathered = await asyncio.gather(*tasks, return_exceptions=True)
+            in_flight.clear()
+            outcomes: list[tuple[Optional[str], Optional[str]]] = []
+            for outcome in gathered:
+                if isinstance(outcome, asyncio.CancelledError):
+                    outcomes.append((None, None))
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    outcomes.append(outcome)
+            artifacts.research_thread = ", ".join(thread for thread, _ in outcomes if thread) or None
+            research_parts = [content for _, content in outcomes if content]
+            if not research_parts:
+                return result(False, "Research phase failed")
+            if len(research_parts) < len(parts):
+                _logger.warning(
+                    "%d of %d research sub-topics failed or were skipped; continuing with partial research",
+                    len(parts) - len(research_parts),
+                    len(parts),
+                )
+            research = merge_research_json(research_parts)
+            if usage.exhausted:
+                return result(
+                    False,
+                    f"Token budget exhausted before the analysis phase ({usage.describe()})",
+                    research_content=research,
+                )
+
+            artifacts.analysis_thread, analysis = await limited(
+                "analysis", self.analysis_agent_id, build_analysis_prompt(research)
+            )
+            if not analysis:
+                return result(False, "Analysis phase failed", research_content=research)
+            if usage.exhausted:
+                return result(
+                    False,
+                    f"Token budget exhausted before the writing phase ({usage.describe()})",
+                    research_content=research,
+                    analysis_content=analysis,
+                )
+
+            artifacts.writing_thread, report = await limited(
+                "writing", self.writing_agent_id, build_writing_prompt(analysis, request.output_format)
+            )
+            if not report:
+                return result(False, "Writing phase failed", research_content=research, analysis_content=analysis)
+
+            if self.report_path is not None:
+                self.report_path.write_text(report, encoding="utf-8")
+                artifacts.report_path = self.report_path
+
+            return result(
+                True,
+                "Workflow completed",
+                research_content=research,
+                analysis_content=analysis,
+                final_report=report,
+            )
+        except Exception as exc:  # pragma: no cover - demo scenario
+            return result(False, f"Unexpected error: {exc}")
+
+    async def _run_agent(
+        self, client: Any, agent_id: str, prompt: str, thread_name: str, usage: UsageAccountant
+    ) -> tuple[Optional[str], Optional[str]]:
+        with get_metrics().time(THREAD_CREATE, agent_id):
+            thread = await client.agents.threads.create()
+        await client.agents.messages.create(thread_id=thread.id, role="user", content=prompt)
+        stream = AsyncRunStream(client.agents, thread_id=thread.id, agent_id=agent_id)
+        try:
+            async for _ in stream:
+                pass
+        except asyncio.CancelledError:
+            await self._cancel_run(client, thread.id, stream.run)
+            usage.record(thread_name, stream.run)
+            raise
+        run = stream.run
+        usage.record(thread_name, run)
+
+        if run is None or run.status != "completed":
+            _logger.error("Run failed for %s: %s", thread_name, getattr(run, "last_error", None))
+            return thread.id, None
+
+        return thread.id, stream.text or None
+
+    async def _cancel_run(self, client: Any, thread_id: str, run: Any) -> None:
+        """Cancel ``run`` on the service so it stops consuming tokens (best effort)."""
+
+        if run is None or run.status in {"completed", "failed", "cancelled", "expired"}:
+            return
+        try:
+            await client.agents.runs.cancel(thread_id=thread_id, run_id=run.id)
+        except Exception as exc:  # noqa: BLE001 - the workflow is already stopping
+            _logger.warning("Could not cancel run %s (実行をキャンセルできませんでした): %s", run.id, exc)
+        else:
+            _logger.info("Cancelled run %s after the token budget was spent (予算超過のため実行をキャンセルしました)", run.id)
@@ -0,0 +1,162 @@
+"""Batch helpers for running many Connected Agents workflows with one shared client."""
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from ..common.usage import TokenUsage
+from .workflow import ResearchRequest, WorkflowResult
+
+PHASES = ("research", "analysis", "writing")
+
+_REQUEST_FIELDS = {item.name for item in fields(ResearchRequest)}
+_INT_FIELDS = {"sources_required", "token_budget"}
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def _coerce_request(row: dict[str, Any], defaults: dict[str, Any]) -> ResearchRequest:
+    values = dict(defaults)
+    for key, value in row.items():
+        if key not in _REQUEST_FIELDS or value in (None, ""):
+            continue
+        if key in _INT_FIELDS:
+            value = int(value)
+        elif key == "subtopics" and isinstance(value, str):
+            value = [item.strip() for item in value.split(";") if item.strip()]
+        values[key] = value
+    if not values.get("topic"):
+        raise ValueError(f"Row without a topic: {row!r}")
+    return ResearchRequest(**values)
+
+
+def load_requests(path: Path, **defaults: Any) -> Iterator[ResearchRequest]:
+    """Yield research requests from a JSONL or CSV file.
+
+    JSONL lines may be a bare string (the topic) or an object with ``ResearchRequest`` fields.
+    CSV files need a ``topic`` column; other columns matching ``ResearchRequest`` fields are
+    applied per row, and ``subtopics`` is split on ``;``. ``defaults`` fill in missing fields.
+    """
+
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                yield _coerce_request(row, defaults)
+        return
+
+    with path.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({exc})") from exc
+            row = {"topic": item} if isinstance(item, str) else item
+            yield _coerce_request(row, defaults)
+
+
+def report_path_for(output_dir: Path, index: int, topic: str) -> Path:
+    """Return a stable, file-system safe report path for the ``index``-th topic."""
+
+    slug = _SLUG.sub("-", topic.lower()).strip("-")[:60] or "report"
+    return output_dir / f"{index:04d}-{slug}.md"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; returns ``nan`` for an empty list."""
+
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass(slots=True)
+class BatchStats:
+    """Thread-safe accumulator for batch throughput and per-phase latency."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    succeeded: int = 0
+    failed: int = 0
+    phase_durations: dict[str, list[float]] = field(default_factory=lambda: {phase: [] for phase in PHASES})
+    workflow_durations: list[float] = field(default_factory=list)
+    token_usage: dict[str, TokenUsage] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, result: WorkflowResult, duration: float) -> None:
+        with self._lock:
+            if result.success:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.workflow_durations.append(duration)
+            for phase, seconds in result.phase_durations.items():
+                self.phase_durations.setdefault(phase, []).append(seconds)
+            for phase, usage in result.token_usage.items():
+                self.token_usage.setdefault(phase, TokenUsage()).add(usage)
+
+    @property
+    def total_usage(self) -> TokenUsage:
+        total = TokenUsage()
+        with self._lock:
+            for usage in self.token_usage.values():
+                total.add(usage)
+        return total
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def reports_per_minute(self) -> float:
+        elapsed = self.elapsed
+        return self.succeeded / elapsed * 60 if elapsed > 0 else 0.0
+
+
+def run_batch(
+    run_one: Callable[[ResearchRequest, Path], WorkflowResult],
+    research_requests: Iterable[ResearchRequest],
+    output_dir: Path,
+    workers: int,
+    on_result: Optional[Callable[[int, ResearchRequest, WorkflowResult], None]] = None,
+) -> BatchStats:
+    """Run ``run_one`` for every request on a bounded worker pool and collect statistics.
+
+    At most ``2 * workers`` workflows are queued ahead of completion so very large input
+    files are not materialised as futures up front.
+    """
+
+    stats = BatchStats()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def task(index: int, request: ResearchRequest) -> tuple[int, ResearchRequest, WorkflowResult]:
+        started = time.perf_counter()
+        result = run_one(request, report_path_for(output_dir, index, request.topic))
+        stats.record(result, time.perf_counter() - started)
+        return index, request, result
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        pending = set()
+        for index, request in enumerate(research_requests, start=1):
+            pending.add(executor.submit(task, index, request))
+            if len(pending) >= workers * 2:
+                done = next(as_completed(pending))
+                pending.remove(done)
+                if on_result:
+                    on_result(*done.result())
+        for future in as_completed(pending):
+            if on_result:
+                on_result(*future.result())
+
+    return stats
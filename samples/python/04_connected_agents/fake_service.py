@@ -0,0 +1,214 @@
+"""In-process stand-in for the async Azure AI Agent Service client.
+
+Only the calls used by :mod:`.async_orchestrator` are implemented. Every run sleeps for a
+configurable latency so sequential and parallel orchestration can be compared offline
+without an Azure project.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import random
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Optional
+
+_ids = itertools.count(1)
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{next(_ids):06d}"
+
+
+@dataclass(slots=True)
+class FakeLatency:
+    """Run latency model in seconds: ``base`` plus uniform jitter of ``jitter``."""
+
+    base: float = 0.5
+    jitter: float = 0.1
+    per_agent: dict[str, float] = field(default_factory=dict)
+
+    def sample(self, agent_id: str) -> float:
+        base = self.per_agent.get(agent_id, self.base)
+        return max(0.0, base + random.uniform(-self.jitter, self.jitter))
+
+
+def _text_message(role: str, text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=_new_id("msg"),
+        role=role,
+        content=[SimpleNamespace(text=SimpleNamespace(value=text))],
+    )
+
+
+def _fake_answer(agent_id: str, prompt: str) -> str:
+    if "research" in agent_id:
+        topic = next(
+            (line.split(":", 1)[1].strip() for line in prompt.splitlines() if line.strip().startswith("Topic:")),
+            "unknown",
+        )
+        slug = abs(hash(topic)) % 10_000
+        return json.dumps(
+            {
+                "summary": f"Findings about {topic}.",
+                "sources": [{"title": f"Source on {topic}", "url": f"https://example.com/{slug}", "insight": "..."}],
+                "statistics": [f"{slug % 100}% of respondents mention {topic}"],
+                "viewpoints": [f"Optimistic view on {topic}"],
+                "gaps": [],
+            }
+        )
+    if "analysis" in agent_id:
+        return json.dumps(
+            {
+                "themes": ["adoption", "risk"],
+                "strengths": [],
+                "weaknesses": [],
+                "contradictions": [],
+                "implications": [],
+                "recommendations": ["Run a pilot"],
+            }
+        )
+    return "# Report\n\nGenerated offline by the fake agent service."
+
+
+class _FakeThreads:
+    def __init__(self, service: "FakeAsyncProjectClient") -> None:
+        self._service = service
+
+    async def create(self, **_: object) -> SimpleNamespace:
+        await asyncio.sleep(self._service.control_latency)
+        thread_id = _new_id("thread")
+        self._service.threads[thread_id] = []
+        return SimpleNamespace(id=thread_id)
+
+
+class _FakeMessages:
+    def __init__(self, service: "FakeAsyncProjectClient") -> None:
+        self._service = service
+
+    async def create(self, thread_id: str, role: str, content: str, **_: object) -> SimpleNamespace:
+        await asyncio.sleep(self._service.control_latency)
+        message = _text_message(str(role), content)
+        self._service.threads[thread_id].append(message)
+        return message
+
+    async def _iterate(self, thread_id: str, order: str) -> AsyncIterator[SimpleNamespace]:
+        await asyncio.sleep(self._service.control_latency)
+        messages = self._service.threads[thread_id]
+        for message in reversed(messages) if order == "desc" else messages:
+            yield message
+
+    def list(self, thread_id: str, order: str = "asc", **_: object) -> AsyncIterator[SimpleNamespace]:
+        return self._iterate(thread_id, order)
+
+
+class _FakeRunStream:
+    def __init__(self, events: AsyncIterator[tuple[str, Any, None]]) -> None:
+        self._events = events
+
+    async def __aenter__(self) -> AsyncIterator[tuple[str, Any, None]]:
+        return self._events
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self._events.aclose()
+
+
+class _FakeRuns:
+    def __init__(self, service: "FakeAsyncProjectClient") -> None:
+        self._service = service
+
+    async def _events(self, thread_id: str, agent_id: str) -> AsyncIterator[tuple[str, Any, None]]:
+        service = self._service
+        run = SimpleNamespace(
+            id=_new_id("run"), thread_id=thread_id, agent_id=agent_id, status="queued", last_error=None, usage=None
+        )
+        yield "thread.run.created", run, None
+
+        prompt = service.threads[thread_id][-1].content[0].text.value
+        answer = _fake_answer(agent_id, prompt)
+        chunk_size = max(1, len(answer) // 8)
+        chunks = [answer[i : i + chunk_size] for i in range(0, len(answer), chunk_size)]
+
+        async with service._run_slots:
+            service.active_runs += 1
+            service.peak_active_runs = max(service.peak_active_runs, service.active_runs)
+            try:
+                latency = service.latency.sample(agent_id)
+                # Roughly a third of the run is spent before the first token appears.
+                await asyncio.sleep(latency * 0.3)
+                run.status = "in_progress"
+                yield "thread.run.in_progress", run, None
+                for chunk in chunks:
+                    yield "thread.message.delta", SimpleNamespace(text=chunk), None
+                    await asyncio.sleep(latency * 0.7 / len(chunks))
+            finally:
+                service.active_runs -= 1
+
+        service.threads[thread_id].append(_text_message("assistant", answer))
+        service.run_count += 1
+        run.status = "completed"
+        # Roughly four characters per token, like English text with the GPT tokenizers.
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(answer) // 4
+        run.usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+        yield "thread.run.completed", run, None
+        yield "done", "[DONE]", None
+
+    async def cancel(self, thread_id: str, run_id: str, **_: object) -> SimpleNamespace:
+        self._service.cancelled_runs += 1
+        return SimpleNamespace(id=run_id, thread_id=thread_id, status="cancelling")
+
+    async def stream(self, thread_id: str, agent_id: str, **_: object) -> _FakeRunStream:
+        return _FakeRunStream(self._events(thread_id, agent_id))
+
+    async def create_and_process(self, thread_id: str, agent_id: str, **_: object) -> SimpleNamespace:
+        run = None
+        async for event_type, event_data, _ in self._events(thread_id, agent_id):
+            if event_type.startswith("thread.run."):
+                run = event_data
+        return run
+
+
+class FakeAsyncProjectClient:
+    """Minimal async ``AIProjectClient`` look-alike exposing ``client.agents.*``.
+
+    Parameters
+    ----------
+    latency:
+        Latency model applied to each run.
+    control_latency:
+        Delay applied to thread and message calls.
+    max_parallel_runs:
+        Service-side cap on simultaneously processed runs.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[FakeLatency] = None,
+        control_latency: float = 0.01,
+        max_parallel_runs: int = 64,
+    ) -> None:
+        self.latency = latency or FakeLatency()
+        self.control_latency = control_latency
+        self.threads: dict[str, list[SimpleNamespace]] = {}
+        self.run_count = 0
+        self.cancelled_runs = 0
+        self.active_runs = 0
+        self.peak_active_runs = 0
+        self._run_slots = asyncio.Semaphore(max_parallel_runs)
+        self.agents = SimpleNamespace(
+            threads=_FakeThreads(self),
+            messages=_FakeMessages(self),
+            runs=_FakeRuns(self),
+        )
+
+    async def __aenter__(self) -> "FakeAsyncProjectClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
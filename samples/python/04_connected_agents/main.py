@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-import textwrap
-from dataclasses import dataclass, field
+import asyncio
+import statistics
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import typer
 from rich.console import Console
@@ -13,213 +14,287 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-
-from ..common import configure_logging, load_config
+from ..common import (
+    AgentThreadPool,
+    MessageReader,
+    RunPollScheduler,
+    RunStream,
+    TokenPricing,
+    TokenUsage,
+    UsageAccountant,
+    configure_logging,
+    configure_metrics,
+    configure_profiling,
+    get_metrics,
+    load_config,
+    shared_project_client,
+)
+from ..common.metrics import MESSAGE_LIST, THREAD_CREATE
+from .batch import PHASES, BatchStats, load_requests, percentile, run_batch
+from .workflow import (
+    ResearchRequest,
+    WorkflowArtifacts,
+    WorkflowResult,
+    build_analysis_prompt,
+    build_research_prompt,
+    build_writing_prompt,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - azure.ai.projects is slow to import; clients.py loads it on use
+    from azure.ai.projects import AIProjectClient
 
 app = typer.Typer(help="Connected Agents orchestration demo")
 console = Console()
 
 
-@dataclass(slots=True)
-class ResearchRequest:
-    topic: str
-    scope: str = "comprehensive"
-    time_period: Optional[str] = None
-    language: str = "English"
-    depth: str = "moderate"
-    sources_required: int = 5
-    output_format: str = "business_report"
-
-
-@dataclass(slots=True)
-class WorkflowArtifacts:
-    research_thread: Optional[str] = None
-    analysis_thread: Optional[str] = None
-    writing_thread: Optional[str] = None
-    report_path: Optional[Path] = None
-
-
-@dataclass(slots=True)
-class WorkflowResult:
-    success: bool
-    message: str
-    research_content: Optional[str] = None
-    analysis_content: Optional[str] = None
-    final_report: Optional[str] = None
-    artifacts: WorkflowArtifacts = field(default_factory=WorkflowArtifacts)
+@app.callback()
+def _options(
+    profile: bool = typer.Option(
+        False, "--profile", help="Profile agent service calls and write a flamegraph report at exit"
+    ),
+) -> None:
+    if profile:
+        configure_profiling(True)
 
 
 class ConnectedAgentsOrchestrator:
-    def __init__(self) -> None:
+    """Run research → analysis → writing one phase after another.
+
+    Parameters
+    ----------
+    client:
+        The ``AIProjectClient`` to use. When omitted, the process-wide client for the
+        configured endpoint is used, so every orchestrator shares one credential and pool.
+    show_progress:
+        Render the Rich spinner while phases run. Disable it when running from a worker pool.
+    scheduler:
+        When given, runs are polled through this shared :class:`RunPollScheduler` instead of
+        being streamed, for deployments where streaming is not available.
+    thread_pool:
+        When given, threads are taken from this :class:`AgentThreadPool` and deleted in the
+        background after each phase instead of being created inline and left behind.
+    """
+
+    def __init__(
+        self,
+        client: Optional[AIProjectClient] = None,
+        *,
+        show_progress: bool = True,
+        scheduler: Optional[RunPollScheduler] = None,
+        thread_pool: Optional[AgentThreadPool] = None,
+    ) -> None:
         configure_logging()
+        configure_metrics()
         self.config = load_config()
-        self.credential = DefaultAzureCredential()
-        self.artifacts = WorkflowArtifacts()
-        self.client: Optional[AIProjectClient] = None
+        self.client = client
+        self.show_progress = show_progress
+        self.scheduler = scheduler
+        self.thread_pool = thread_pool
 
         self.research_agent_id = self.config.connected_research_agent_id or "research-agent"
         self.analysis_agent_id = self.config.connected_analysis_agent_id or "analysis-agent"
         self.writing_agent_id = self.config.connected_writing_agent_id or "writing-agent"
 
-    def run(self, request: ResearchRequest) -> WorkflowResult:
+    def run(
+        self, request: ResearchRequest, report_path: Optional[Path] = Path("connected_agents_report.md")
+    ) -> WorkflowResult:
+        if self.client is not None:
+            return self._run_workflow(self.client, request, report_path)
+        with shared_project_client(self.config.project_endpoint) as client:
+            return self._run_workflow(client, request, report_path)
+
+    def _run_workflow(
+        self, client: AIProjectClient, request: ResearchRequest, report_path: Optional[Path]
+    ) -> WorkflowResult:
+        artifacts = WorkflowArtifacts()
+        durations: dict[str, float] = {}
+        usage = UsageAccountant(request.token_budget)
+
+        def result(success: bool, message: str, **content: Optional[str]) -> WorkflowResult:
+            return WorkflowResult(
+                success,
+                message,
+                artifacts=artifacts,
+                phase_durations=durations,
+                token_usage=usage.phases,
+                **content,
+            )
+
+        def budget_exhausted(phase: str, **content: Optional[str]) -> Optional[WorkflowResult]:
+            if not usage.exhausted:
+                return None
+            return result(False, f"Token budget exhausted before the {phase} phase ({usage.describe()})", **content)
+
         try:
-            with AIProjectClient(endpoint=self.config.project_endpoint, credential=self.credential) as client:
-                self.client = client
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    transient=True,
-                ) as progress:
-                    research_task = progress.add_task("Gathering research", start=False)
-                    analysis_task = progress.add_task("Synthesizing insights", start=False)
-                    writing_task = progress.add_task("Composing report", start=False)
-
-                    progress.start_task(research_task)
-                    research = self._run_agent(
-                        thread_name="research",
-                        agent_id=self.research_agent_id,
-                        prompt=self._build_research_prompt(request),
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                transient=True,
+                disable=not self.show_progress,
+            ) as progress:
+                research_task = progress.add_task("Gathering research", start=False)
+                analysis_task = progress.add_task("Synthesizing insights", start=False)
+                writing_task = progress.add_task("Composing report", start=False)
+
+                progress.start_task(research_task)
+                research = self._run_agent(
+                    client,
+                    artifacts,
+                    durations,
+                    usage,
+                    thread_name="research",
+                    agent_id=self.research_agent_id,
+                    prompt=self._build_research_prompt(request),
+                )
+                progress.update(research_task, completed=100)
+
+                if not research:
+                    return result(False, "Research phase failed")
+                stopped = budget_exhausted("analysis", research_content=research)
+                if stopped is not None:
+                    return stopped
+
+                progress.start_task(analysis_task)
+                analysis = self._run_agent(
+                    client,
+                    artifacts,
+                    durations,
+                    usage,
+                    thread_name="analysis",
+                    agent_id=self.analysis_agent_id,
+                    prompt=self._build_analysis_prompt(research),
+                )
+                progress.update(analysis_task, completed=100)
+
+                if not analysis:
+                    return result(False, "Analysis phase failed", research_content=research)
+                stopped = budget_exhausted("writing", research_content=research, analysis_content=analysis)
+                if stopped is not None:
+                    return stopped
+
+                progress.start_task(writing_task)
+                report = self._run_agent(
+                    client,
+                    artifacts,
+                    durations,
+                    usage,
+                    thread_name="writing",
+                    agent_id=self.writing_agent_id,
+                    prompt=self._build_writing_prompt(analysis, request.output_format),
+                )
+                progress.update(writing_task, completed=100)
+
+                if not report:
+                    return result(
+                        False, "Writing phase failed", research_content=research, analysis_content=analysis
                     )
-                    progress.update(research_task, completed=100)
 
-                    if not research:
-                        return WorkflowResult(False, "Research phase failed", artifacts=self.artifacts)
+                if report_path is not None:
+                    report_path.parent.mkdir(parents=True, exist_ok=True)
+                    report_path.write_text(report, encoding="utf-8")
+                    artifacts.report_path = report_path
 
-                    progress.start_task(analysis_task)
-                    analysis = self._run_agent(
-                        thread_name="analysis",
-                        agent_id=self.analysis_agent_id,
-                        prompt=self._build_analysis_prompt(research),
-                    )
-                    progress.update(analysis_task, completed=100)
-
-                    if not analysis:
-                        return WorkflowResult(
-                            False,
-                            "Analysis phase failed",
-                            research_content=research,
-                            artifacts=self.artifacts,
-                        )
-
-                    progress.start_task(writing_task)
-                    report = self._run_agent(
-                        thread_name="writing",
-                        agent_id=self.writing_agent_id,
-                        prompt=self._build_writing_prompt(analysis, request.output_format),
-                    )
-                    progress.update(writing_task, completed=100)
-
-                    if not report:
-                        return WorkflowResult(
-                            False,
-                            "Writing phase failed",
-                            research_content=research,
-                            analysis_content=analysis,
-                            artifacts=self.artifacts,
-                        )
-
-                    path = Path("connected_agents_report.md")
-                    path.write_text(report, encoding="utf-8")
-                    self.artifacts.report_path = path
-
-                    return WorkflowResult(
-                        True,
-                        "Workflow completed",
-                        research_content=research,
-                        analysis_content=analysis,
-                        final_report=report,
-                        artifacts=self.artifacts,
-                    )
+                return result(
+                    True,
+                    "Workflow completed",
+                    research_content=research,
+                    analysis_content=analysis,
+                    final_report=report,
+                )
 
         except Exception as exc:  # pragma: no cover - demo scenario
-            return WorkflowResult(False, f"Unexpected error: {exc}", artifacts=self.artifacts)
+            return result(False, f"Unexpected error: {exc}")
+
+    def _run_agent(
+        self,
+        client: AIProjectClient,
+        artifacts: WorkflowArtifacts,
+        durations: dict[str, float],
+        usage: UsageAccountant,
+        thread_name: str,
+        agent_id: str,
+        prompt: str,
+    ) -> Optional[str]:
+        started = time.perf_counter()
+        thread_id = None
+        try:
+            if self.thread_pool is not None:
+                thread_id = self.thread_pool.acquire()
+            else:
+                with get_metrics().time(THREAD_CREATE, agent_id):
+                    thread_id = client.agents.threads.create().id
+            setattr(artifacts, f"{thread_name}_thread", thread_id)
+
+            client.agents.messages.create(thread_id=thread_id, role="user", content=prompt)
+            if self.scheduler is not None:
+                return self._poll_agent(client, thread_id, thread_name, agent_id, usage)
+
+            stream = RunStream(client.agents, thread_id=thread_id, agent_id=agent_id)
+            for _ in stream:
+                pass
+            run = stream.run
+            usage.record(thread_name, run)
+
+            if run is None or run.status != "completed":
+                console.log(f"Run failed for {thread_name}: {getattr(run, 'last_error', None)}")
+                return None
+
+            return stream.text or None
         finally:
-            self.client = None
-
-    def _run_agent(self, thread_name: str, agent_id: str, prompt: str) -> Optional[str]:
-        if not hasattr(self, "client") or self.client is None:
-            raise RuntimeError("Client is not initialized")
-        thread = self.client.agents.threads.create()
-        setattr(self.artifacts, f"{thread_name}_thread", thread.id)
+            durations[thread_name] = time.perf_counter() - started
+            if self.thread_pool is not None and thread_id is not None:
+                self.thread_pool.release(thread_id)
 
-        self.client.agents.messages.create(thread_id=thread.id, role="user", content=prompt)
-        run = self.client.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent_id)
+    def _poll_agent(
+        self, client: AIProjectClient, thread_id: str, thread_name: str, agent_id: str, usage: UsageAccountant
+    ) -> Optional[str]:
+        run = client.agents.runs.create(thread_id=thread_id, agent_id=agent_id)
+        run = self.scheduler.wait(client.agents, thread_id, run.id)
+        usage.record(thread_name, run)
 
         if run.status != "completed":
             console.log(f"Run failed for {thread_name}: {run.last_error}")
             return None
 
-        messages = list(self.client.agents.messages.list(thread.id, order="desc", limit=1))
-        if messages and messages[0].role == "assistant":
-            return messages[0].content[0].text.value
-        return None
-
-    @staticmethod
-    def _build_research_prompt(request: ResearchRequest) -> str:
-        return textwrap.dedent(
-            f"""
-            You are a research specialist. Investigate the topic below and return structured JSON.
-
-            Topic: {request.topic}
-            Scope: {request.scope}
-            Time period: {request.time_period or "recent developments"}
-            Language: {request.language}
-            Depth: {request.depth}
-            Minimum sources: {request.sources_required}
-
-            Return a JSON object with keys: summary, sources (list with title/url/insight),
-            statistics, viewpoints, gaps.
-            """
-        ).strip()
-
-    @staticmethod
-    def _build_analysis_prompt(research_content: str) -> str:
-        return textwrap.dedent(
-            f"""
-            You are an analysis specialist. You will receive JSON from the research agent.
-            Produce a JSON object containing:
-            - themes (list)
-            - strengths
-            - weaknesses
-            - contradictions
-            - implications
-            - recommendations
-
-            Research JSON:
-            {research_content}
-            """
-        ).strip()
-
-    @staticmethod
-    def _build_writing_prompt(analysis_content: str, format_name: str) -> str:
-        format_hints = {
-            "business_report": "Executive summary, key findings, recommendations",
-            "academic_paper": "Abstract, introduction, methodology, results, conclusion",
-            "blog_post": "Hook, narrative flow, key takeaways, call to action",
-        }
-        hint = format_hints.get(format_name, format_hints["business_report"])
-        return textwrap.dedent(
-            f"""
-            You are a writing specialist. Create a polished document using the structure:
-            {hint}
-
-            Analysis JSON:
-            {analysis_content}
-            """
-        ).strip()
+        with get_metrics().time(MESSAGE_LIST, agent_id):
+            message = MessageReader(client.agents).latest(thread_id)
+        return message.content[0].text.value if message is not None else None
+
+    _build_research_prompt = staticmethod(build_research_prompt)
+    _build_analysis_prompt = staticmethod(build_analysis_prompt)
+    _build_writing_prompt = staticmethod(build_writing_prompt)
+
+
+def _usage_cells(usage: Optional[TokenUsage], pricing: Optional[TokenPricing]) -> list[str]:
+    if usage is None or not usage.runs:
+        return ["-"] * (4 if pricing else 3)
+    cells = [f"{usage.prompt_tokens:,}", f"{usage.completion_tokens:,}", f"{usage.total_tokens:,}"]
+    if pricing:
+        cells.append(f"{usage.cost(pricing):.4f}")
+    return cells
 
 
 def _render_summary(result: WorkflowResult) -> None:
+    pricing = TokenPricing.from_env()
     table = Table(title="Connected Agents workflow summary", show_lines=True)
     table.add_column("Phase")
     table.add_column("Status")
     table.add_column("Thread ID")
-
-    table.add_row("Research", "✅" if result.research_content else "❌", result.artifacts.research_thread or "-")
-    table.add_row("Analysis", "✅" if result.analysis_content else "❌", result.artifacts.analysis_thread or "-")
-    table.add_row("Writing", "✅" if result.final_report else "❌", result.artifacts.writing_thread or "-")
+    table.add_column("Prompt tokens", justify="right")
+    table.add_column("Completion tokens", justify="right")
+    table.add_column("Total tokens", justify="right")
+    if pricing:
+        table.add_column("Cost", justify="right")
+
+    phases = (
+        ("Research", result.research_content, result.artifacts.research_thread),
+        ("Analysis", result.analysis_content, result.artifacts.analysis_thread),
+        ("Writing", result.final_report, result.artifacts.writing_thread),
+    )
+    for name, content, thread_id in phases:
+        usage = result.token_usage.get(name.lower())
+        table.add_row(name, "✅" if content else "❌", thread_id or "-", *_usage_cells(usage, pricing))
+    table.add_row("Total", "", "", *_usage_cells(result.total_usage, pricing))
 
     console.print(table)
 
@@ -227,23 +302,184 @@ def _render_summary(result: WorkflowResult) -> None:
         console.print(f"[bold green]Report saved to[/]: {result.artifacts.report_path}")
 
 
+def _render_result(result: WorkflowResult) -> None:
+    _render_summary(result)
+
+    if result.final_report:
+        console.print(Panel(result.final_report, title="Final report", expand=False))
+    else:
+        console.print(f"[red]{result.message}[/red]")
+
+
 @app.command(help="Run the full multi-agent workflow")
 def run(
     topic: str = typer.Option(..., prompt=True, help="Research topic"),
     sources: int = typer.Option(5, min=1, max=12, help="Minimum number of sources"),
     depth: str = typer.Option("moderate", help="Research depth"),
     output: str = typer.Option("business_report", help="Output format"),
+    token_budget: Optional[int] = typer.Option(
+        None, min=1, help="Stop before the next agent run once the workflow has used this many tokens"
+    ),
 ) -> None:
-    request = ResearchRequest(topic=topic, sources_required=sources, depth=depth, output_format=output)
+    request = ResearchRequest(
+        topic=topic, sources_required=sources, depth=depth, output_format=output, token_budget=token_budget
+    )
     orchestrator = ConnectedAgentsOrchestrator()
 
     result = orchestrator.run(request)
-    _render_summary(result)
+    _render_result(result)
+
+
+@app.command(help="Run the workflow for every topic in a JSONL or CSV file")
+def batch(
+    input_file: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSONL or CSV file with topics"),
+    output_dir: Path = typer.Option(Path("reports"), help="Directory for one report per topic"),
+    workers: int = typer.Option(4, min=1, help="Number of workflows running at once"),
+    sources: int = typer.Option(5, min=1, max=12, help="Default minimum number of sources"),
+    depth: str = typer.Option("moderate", help="Default research depth"),
+    output: str = typer.Option("business_report", help="Default output format"),
+    poll: bool = typer.Option(
+        False, "--poll/--stream", help="Poll run status through one adaptive scheduler instead of streaming"
+    ),
+    token_budget: Optional[int] = typer.Option(
+        None, min=1, help="Default per-workflow token budget (a token_budget column overrides it)"
+    ),
+) -> None:
+    configure_logging()
+    configure_metrics()
+    config = load_config()
+    research_requests = load_requests(
+        input_file, sources_required=sources, depth=depth, output_format=output, token_budget=token_budget
+    )
+
+    scheduler = RunPollScheduler() if poll else None
+    with shared_project_client(config.project_endpoint, pool_size=workers) as client:
+        thread_pool = AgentThreadPool(client.agents, size=workers)
+        orchestrator = ConnectedAgentsOrchestrator(
+            client, show_progress=False, scheduler=scheduler, thread_pool=thread_pool
+        )
+
+        def on_result(index: int, request: ResearchRequest, result: WorkflowResult) -> None:
+            tokens = f"{result.total_usage.total_tokens:,} tokens"
+            if result.success:
+                console.print(f"[green]✅ #{index}[/] {request.topic} → {result.artifacts.report_path} ({tokens})")
+            else:
+                console.print(f"[red]❌ #{index}[/] {request.topic}: {result.message} ({tokens})")
 
-    if result.final_report:
-        console.print(Panel(result.final_report, title="Final report", expand=False))
-    else:
-        console.print(f"[red]{result.message}[/red]")
+        try:
+            stats = run_batch(orchestrator.run, research_requests, output_dir, workers, on_result=on_result)
+        finally:
+            thread_pool.close()
+            if scheduler is not None:
+                scheduler.close()
+
+    _render_batch_stats(stats, workers)
+    if scheduler is not None:
+        console.print(f"Status polls: {scheduler.poll_count} (throttled: {scheduler.throttled_count})")
+    if stats.failed:
+        raise typer.Exit(code=1)
+
+
+def _render_batch_stats(stats: BatchStats, workers: int) -> None:
+    table = Table(title=f"Batch summary ({workers} workers)")
+    table.add_column("Phase")
+    table.add_column("Runs", justify="right")
+    table.add_column("p50 (s)", justify="right")
+    table.add_column("p95 (s)", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Tokens / run", justify="right")
+    for phase in (*PHASES, "workflow"):
+        values = stats.workflow_durations if phase == "workflow" else stats.phase_durations.get(phase, [])
+        usage = stats.total_usage if phase == "workflow" else stats.token_usage.get(phase, TokenUsage())
+        table.add_row(
+            phase.capitalize(),
+            str(len(values)),
+            f"{percentile(values, 50):.2f}",
+            f"{percentile(values, 95):.2f}",
+            f"{usage.total_tokens:,}",
+            f"{usage.total_tokens / usage.runs:,.0f}" if usage.runs else "-",
+        )
+    console.print(table)
+    pricing = TokenPricing.from_env()
+    if pricing:
+        console.print(f"Estimated cost: {stats.total_usage.cost(pricing):.4f}")
+    console.print(
+        f"Succeeded: {stats.succeeded}  Failed: {stats.failed}  "
+        f"Elapsed: {stats.elapsed:.1f}s  Throughput: {stats.reports_per_minute:.2f} reports/min"
+    )
+
+
+@app.command("run-parallel", help="Run the workflow with sub-topic research fanned out in parallel")
+def run_parallel(
+    topic: str = typer.Option(..., prompt=True, help="Research topic"),
+    subtopic: list[str] = typer.Option([], "--subtopic", help="Sub-topic to research (repeatable)"),
+    sources: int = typer.Option(5, min=1, max=12, help="Minimum number of sources"),
+    depth: str = typer.Option("moderate", help="Research depth"),
+    output: str = typer.Option("business_report", help="Output format"),
+    concurrency: int = typer.Option(4, min=1, help="Maximum number of agent runs in flight"),
+    token_budget: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="Once the workflow has used this many tokens, cancel the research runs in flight and start no more",
+    ),
+) -> None:
+    from .async_orchestrator import AsyncConnectedAgentsOrchestrator
+
+    configure_logging()
+    configure_metrics()
+    request = ResearchRequest(
+        topic=topic,
+        sources_required=sources,
+        depth=depth,
+        output_format=output,
+        subtopics=subtopic,
+        token_budget=token_budget,
+    )
+    orchestrator = AsyncConnectedAgentsOrchestrator(max_concurrency=concurrency)
+
+    result = asyncio.run(orchestrator.run(request))
+    _render_result(result)
+
+
+@app.command(help="Compare sequential and parallel research fan-out against an offline fake service")
+def benchmark(
+    subtopics: int = typer.Option(4, min=1, help="Number of research sub-topics"),
+    concurrency: int = typer.Option(4, min=1, help="Concurrency limit for the parallel run"),
+    latency: float = typer.Option(0.5, min=0.0, help="Simulated seconds per agent run"),
+    iterations: int = typer.Option(3, min=1, help="Workflows per measurement"),
+) -> None:
+    from .async_orchestrator import AsyncConnectedAgentsOrchestrator
+    from .fake_service import FakeAsyncProjectClient, FakeLatency
+
+    facets = [f"facet {index + 1}" for index in range(subtopics)]
+
+    async def measure(max_concurrency: int) -> list[float]:
+        durations = []
+        for _ in range(iterations):
+            client = FakeAsyncProjectClient(latency=FakeLatency(base=latency, jitter=latency * 0.1))
+            orchestrator = AsyncConnectedAgentsOrchestrator(
+                client, max_concurrency=max_concurrency, max_subtopics=subtopics, report_path=None
+            )
+            started = time.perf_counter()
+            # Explicit facets: without them the request falls back to the four default facets.
+            request = ResearchRequest(topic="Offline benchmark", subtopics=facets)
+            result = await orchestrator.run(request)
+            durations.append(time.perf_counter() - started)
+            if not result.success:
+                raise RuntimeError(result.message)
+        return durations
+
+    sequential = statistics.median(asyncio.run(measure(1)))
+    parallel = statistics.median(asyncio.run(measure(concurrency)))
+
+    table = Table(title=f"Fan-out benchmark ({subtopics} sub-topics, {latency:.2f}s per run)")
+    table.add_column("Mode")
+    table.add_column("Concurrency", justify="right")
+    table.add_column("Median seconds", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_row("Sequential", "1", f"{sequential:.2f}", "1.00x")
+    table.add_row("Parallel", str(concurrency), f"{parallel:.2f}", f"{sequential / parallel:.2f}x")
+    console.print(table)
 
 
 @app.command(help="Show currently configured agent IDs")
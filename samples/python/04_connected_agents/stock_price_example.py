@@ -5,17 +5,28 @@ import sys
 from typing import Optional
 
 from azure.ai.agents.models import ConnectedAgentTool, MessageRole
-from azure.ai.projects import AIProjectClient
 from azure.core.exceptions import HttpResponseError
-from azure.identity import DefaultAzureCredential
 
-from ..common import configure_logging, load_config
+from ..common import (
+    AgentRegistry,
+    MessageReader,
+    RunStream,
+    configure_logging,
+    configure_metrics,
+    discard_thread,
+    echo_run,
+    get_metrics,
+    load_config,
+    shared_project_client,
+)
+from ..common.metrics import MESSAGE_LIST, THREAD_CREATE
 
 _logger = logging.getLogger("connected_agents")
 
 
 def main() -> int:
     configure_logging()
+    configure_metrics()
 
     try:
         config = load_config()
@@ -23,49 +34,49 @@ def main() -> int:
         _logger.error("Failed to load configuration (設定取得に失敗しました): %s", exc)
         return 1
 
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
-
-    with AIProjectClient(endpoint=config.project_endpoint, credential=credential) as project_client:
+    with shared_project_client(config.project_endpoint) as project_client:
+        registry = AgentRegistry(project_client.agents, config.project_endpoint)
         main_agent_id: Optional[str] = None
         child_agent_id: Optional[str] = None
+        thread = None
         try:
             _logger.info(
-                "Creating sub-agent for stock prices (株価を回答するサブエージェントを作成します)"
+                "Preparing sub-agent for stock prices (株価を回答するサブエージェントを準備します)"
             )
-            stock_agent = project_client.agents.create_agent(
+            child_agent_id = registry.acquire(
                 model=config.model_deployment_name,
                 name="stock_price_bot",
                 instructions="When asked about stock prices, respond with the last known closing price and include the retrieval date.",
             )
-            child_agent_id = stock_agent.id
 
             connected_tool = ConnectedAgentTool(
-                id=stock_agent.id,
-                name=stock_agent.name,
+                id=child_agent_id,
+                name="stock_price_bot",
                 description="Fetches the latest available stock price information for a given company ticker.",
             )
 
-            main_agent = project_client.agents.create_agent(
+            main_agent_id = registry.acquire(
                 model=config.model_deployment_name,
                 name="workshop-coordinator-agent",
                 instructions="You orchestrate specialist agents. When a user asks about stock prices, delegate to the stock_price_bot.",
                 tools=connected_tool.definitions,
             )
-            main_agent_id = main_agent.id
 
-            thread = project_client.agents.threads.create()
+            with get_metrics().time(THREAD_CREATE, main_agent_id):
+                thread = project_client.agents.threads.create()
             project_client.agents.messages.create(
                 thread_id=thread.id,
                 role=MessageRole.USER,
                 content="MSFT の直近の株価を教えてください。出典も含めてください。",
             )
 
-            run = project_client.agents.runs.create_and_process(thread_id=thread.id, agent_id=main_agent.id)
+            run = echo_run(RunStream(project_client.agents, thread_id=thread.id, agent_id=main_agent_id))
             if run.status == "failed":
                 _logger.error("Run failed (実行が失敗しました): %s", run.last_error)
                 return 1
 
-            response = project_client.agents.messages.list(thread_id=thread.id).get_last_message_by_role(MessageRole.AGENT)
+            with get_metrics().time(MESSAGE_LIST, main_agent_id):
+                response = MessageReader(project_client.agents).latest(thread.id, role=MessageRole.AGENT)
             if response:
                 for text_message in response.text_messages:
                     _logger.info("Response: %s (応答)", text_message.text.value)
@@ -79,12 +90,12 @@ def main() -> int:
             )
             return 1
         finally:
+            if thread is not None:
+                discard_thread(project_client.agents, thread.id)
             if main_agent_id:
-                _logger.info("Deleting main agent (メイン エージェントを削除します)")
-                project_client.agents.delete_agent(main_agent_id)
+                registry.release(main_agent_id)
             if child_agent_id:
-                _logger.info("Deleting sub agent (サブ エージェントを削除します)")
-                project_client.agents.delete_agent(child_agent_id)
+                registry.release(child_agent_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+"""Workflow data types and prompt builders shared by the Connected Agents orchestrators."""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import textwrap
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ..common.usage import TokenUsage
+
+DEFAULT_SUBTOPIC_FACETS = (
+    "market landscape and adoption",
+    "technology and innovation",
+    "regulation and policy",
+    "risks and open challenges",
+)
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class ResearchRequest:
+    topic: str
+    scope: str = "comprehensive"
+    time_period: Optional[str] = None
+    language: str = "English"
+    depth: str = "moderate"
+    sources_required: int = 5
+    output_format: str = "business_report"
+    subtopics: list[str] = field(default_factory=list)
+    # Stop before the next agent run once the workflow has used this many tokens.
+    token_budget: Optional[int] = None
+
+
+@dataclass(slots=True)
+class WorkflowArtifacts:
+    research_thread: Optional[str] = None
+    analysis_thread: Optional[str] = None
+    writing_thread: Optional[str] = None
+    report_path: Optional[Path] = None
+
+
+@dataclass(slots=True)
+class WorkflowResult:
+    success: bool
+    message: str
+    research_content: Optional[str] = None
+    analysis_content: Optional[str] = None
+    final_report: Optional[str] = None
+    artifacts: WorkflowArtifacts = field(default_factory=WorkflowArtifacts)
+    phase_durations: dict[str, float] = field(default_factory=dict)
+    token_usage: dict[str, TokenUsage] = field(default_factory=dict)
+
+    @property
+    def total_usage(self) -> TokenUsage:
+        total = TokenUsage()
+        for usage in self.token_usage.values():
+            total.add(usage)
+        return total
+
+
+def split_research_request(request: ResearchRequest, max_parts: int = 4) -> list[ResearchRequest]:
+    """Split a request into sub-topic requests that can be researched independently.
+
+    Explicit ``request.subtopics`` win; otherwise :data:`DEFAULT_SUBTOPIC_FACETS` are used.
+    The minimum number of sources is spread across the parts so the merged result still
+    honours ``sources_required``.
+    """
+
+    facets = list(request.subtopics) or list(DEFAULT_SUBTOPIC_FACETS)
+    facets = facets[: max(1, max_parts)]
+    sources_per_part = max(1, math.ceil(request.sources_required / len(facets)))
+    return [
+        replace(
+            request,
+            topic=f"{request.topic} — {facet}",
+            sources_required=sources_per_part,
+            subtopics=[],
+        )
+        for facet in facets
+    ]
+
+
+def _parse_research_json(content: str) -> Optional[dict[str, Any]]:
+    text = _JSON_FENCE.sub("", content.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def merge_research_json(parts: Iterable[str]) -> str:
+    """Merge the JSON documents returned by parallel research runs into one document.
+
+    Lists are concatenated (sources are de-duplicated by URL), summaries are joined, and
+    parts that are not valid JSON are kept verbatim under ``notes`` so nothing is lost.
+    """
+
+    merged: dict[str, Any] = {
+        "summary": [],
+        "sources": [],
+        "statistics": [],
+        "viewpoints": [],
+        "gaps": [],
+    }
+    notes: list[str] = []
+    seen_urls: set[str] = set()
+
+    for content in parts:
+        data = _parse_research_json(content)
+        if data is None:
+            notes.append(content)
+            continue
+        if data.get("summary"):
+            merged["summary"].append(data["summary"])
+        for source in _as_list(data.get("sources")):
+            url = source.get("url") if isinstance(source, dict) else None
+            if url and url in seen_urls:
+                continue
+            if url:
+                seen_urls.add(url)
+            merged["sources"].append(source)
+        for key in ("statistics", "viewpoints", "gaps"):
+            value = data.get(key)
+            if isinstance(value, dict):
+                merged[key].append(value)
+            else:
+                merged[key].extend(_as_list(value))
+
+    merged["summary"] = "\n\n".join(str(item) for item in merged["summary"])
+    if notes:
+        merged["notes"] = notes
+    return json.dumps(merged, ensure_ascii=False, indent=2)
+
+
+def build_research_prompt(request: ResearchRequest) -> str:
+    return textwrap.dedent(
+        f"""
+        You are a research specialist. Investigate the topic below and return structured JSON.
+
+        Topic: {request.topic}
+        Scope: {request.scope}
+        Time period: {request.time_period or "recent developments"}
+        Language: {request.language}
+        Depth: {request.depth}
+        Minimum sources: {request.sources_required}
+
+        Return a JSON object with keys: summary, sources (list with title/url/insight),
+        statistics, viewpoints, gaps.
+        """
+    ).strip()
+
+
+def build_analysis_prompt(research_content: str) -> str:
+    return textwrap.dedent(
+        f"""
+        You are an analysis specialist. You will receive JSON from the research agent.
+        Produce a JSON object containing:
+        - themes (list)
+        - strengths
+        - weaknesses
+        - contradictions
+        - implications
+        - recommendations
+
+        Research JSON:
+        {research_content}
+        """
+    ).strip()
+
+
+def build_writing_prompt(analysis_content: str, format_name: str) -> str:
+    format_hints = {
+        "business_report": "Executive summary, key findings, recommendations",
+        "academic_paper": "Abstract, introduction, methodology, results, conclusion",
+        "blog_post": "Hook, narrative flow, key takeaways, call to action",
+    }
+    hint = format_hints.get(format_name, format_hints["business_report"])
+    return textwrap.dedent(
+        f"""
+        You are a writing specialist. Create a polished document using the structure:
+        {hint}
+
+        Analysis JSON:
+        {analysis_content}
+        """
+    ).strip()
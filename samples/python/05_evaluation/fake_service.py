@@ -0,0 +1,227 @@
+"""In-process stand-in for the thread, message, run and run-step listings of the Agent Service.
+
+Only the calls made by ``AIAgentConverter`` and :mod:`.incremental` are implemented. Items
+are real ``azure.ai.agents`` models built from service-shaped JSON, list calls page like the
+service (``limit``/``after`` with ``ItemPaged``), and every request sleeps ``latency``
+seconds and is counted, so conversion strategies can be compared offline.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from azure.ai.agents.models import RunStep, ThreadMessage, ThreadRun
+from azure.core.paging import ItemPaged
+
+_EPOCH = 1_735_689_600
+_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "lookup_policy",
+            "description": "Look up a travel policy section.",
+            "parameters": {"type": "object", "properties": {"topic": {"type": "string"}}, "required": ["topic"]},
+        },
+    }
+]
+
+
+def _message(
+    thread_id: str, number: int, role: str, text: str, run_id: Optional[str], created_at: int
+) -> ThreadMessage:
+    return ThreadMessage(
+        {
+            "id": f"msg_{number:06d}",
+            "object": "thread.message",
+            "thread_id": thread_id,
+            "created_at": created_at,
+            "status": "completed",
+            "role": role,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "run_id": run_id,
+            "attachments": [],
+            "metadata": {},
+        }
+    )
+
+
+class FakeThread:
+    """A synthetic conversation of ``turns`` user/assistant exchanges, one run per turn.
+
+    Every run makes one function tool call. ``visible_turns`` controls how much of the
+    conversation the service exposes, so a test can grow the thread turn by turn.
+    """
+
+    def __init__(
+        self, thread_id: str = "thread_fake", turns: int = 500, instructions: str = "Answer travel questions."
+    ) -> None:
+        self.thread_id = thread_id
+        self.visible_turns = turns
+        self.messages: list[ThreadMessage] = []
+        self.runs: list[ThreadRun] = []
+        self.steps: dict[str, list[RunStep]] = {}
+        for turn in range(turns):
+            run_id = f"run_{turn:06d}"
+            created = _EPOCH + turn * 10
+            question = f"Question {turn}: what is the policy for trip {turn}?"
+            self.messages.append(_message(thread_id, 2 * turn, "user", question, None, created))
+            self.runs.append(
+                ThreadRun(
+                    {
+                        "id": run_id,
+                        "object": "thread.run",
+                        "thread_id": thread_id,
+                        "agent_id": "agent_fake",
+                        "status": "completed",
+                        "model": "gpt-4o-mini",
+                        "instructions": instructions,
+                        "tools": _TOOLS,
+                        "created_at": created + 1,
+                    }
+                )
+            )
+            self.steps[run_id] = [
+                RunStep(
+                    {
+                        "id": f"step_{turn:06d}",
+                        "object": "thread.run.step",
+                        "type": "tool_calls",
+                        "run_id": run_id,
+                        "thread_id": thread_id,
+                        "status": "completed",
+                        "step_details": {
+                            "type": "tool_calls",
+                            "tool_calls": [
+                                {
+                                    "id": f"call_{turn:06d}",
+                                    "type": "function",
+                                    "function": {
+                                        "name": "lookup_policy",
+                                        "arguments": json.dumps({"topic": f"trip {turn}"}),
+                                        "output": json.dumps({"section": turn, "approved": turn % 3 != 0}),
+                                    },
+                                }
+                            ],
+                        },
+                        "created_at": created + 2,
+                        "completed_at": created + 3,
+                    }
+                )
+            ]
+            answer = f"Answer {turn}: see section {turn}."
+            self.messages.append(_message(thread_id, 2 * turn + 1, "assistant", answer, run_id, created + 4))
+
+        # Model attribute access deserialises on every read, so look positions up by ID.
+        self.positions = {item.id: index for items in (self.messages, self.runs) for index, item in enumerate(items)}
+        self.positions.update((step.id, 0) for steps in self.steps.values() for step in steps)
+
+    def visible_runs(self) -> list[ThreadRun]:
+        return self.runs[: self.visible_turns]
+
+    def visible_messages(self) -> list[ThreadMessage]:
+        return self.messages[: 2 * self.visible_turns]
+
+
+def _paged(
+    items: Callable[[], list[Any]],
+    positions: dict[str, int],
+    limit: Optional[int],
+    order: Optional[str],
+    before: Optional[str],
+    on_request: Callable[[], None],
+) -> ItemPaged:
+    page_size = limit or 20
+
+    def position(item_id: str, count: int) -> int:
+        index = positions[item_id]
+        return count - 1 - index if order == "desc" else index
+
+    def get_next(after: Optional[str] = None) -> list[Any]:
+        on_request()
+        listed = items()
+        if order == "desc":
+            listed = listed[::-1]
+        start = position(after, len(listed)) + 1 if after is not None else 0
+        end = position(before, len(listed)) if before is not None else len(listed)
+        return listed[start:min(end, start + page_size)]
+
+    def extract_data(page: list[Any]) -> tuple[Optional[str], Any]:
+        has_more = len(page) == page_size
+        return (page[-1].id if page and has_more else None), iter(page)
+
+    return ItemPaged(get_next, extract_data)
+
+
+class FakeAgentsClient:
+    """``project_client.agents`` look-alike serving :class:`FakeThread` objects."""
+
+    def __init__(self, threads: list[FakeThread], latency: float = 0.002) -> None:
+        self.threads = {thread.thread_id: thread for thread in threads}
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(list=self._list_messages)
+        self.runs = SimpleNamespace(list=self._list_runs, get=self._get_run)
+        self.run_steps = SimpleNamespace(list=self._list_run_steps)
+
+    def _request(self, name: str) -> None:
+        with self._lock:
+            self.requests[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _list_messages(
+        self,
+        thread_id: str,
+        *,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+        before: Optional[str] = None,
+        **_: Any,
+    ) -> ItemPaged:
+        thread = self.threads[thread_id]
+        return _paged(
+            thread.visible_messages, thread.positions, limit, order, before, lambda: self._request("messages.list")
+        )
+
+    def _list_runs(
+        self,
+        thread_id: str,
+        *,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+        before: Optional[str] = None,
+        **_: Any,
+    ) -> ItemPaged:
+        thread = self.threads[thread_id]
+        return _paged(thread.visible_runs, thread.positions, limit, order, before, lambda: self._request("runs.list"))
+
+    def _get_run(self, thread_id: str, run_id: str, **_: Any) -> ThreadRun:
+        self._request("runs.get")
+        thread = self.threads[thread_id]
+        return thread.runs[thread.positions[run_id]]
+
+    def _list_run_steps(
+        self,
+        thread_id: str,
+        run_id: str,
+        *,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+        before: Optional[str] = None,
+        **_: Any,
+    ) -> ItemPaged:
+        thread = self.threads[thread_id]
+        steps = thread.steps[run_id]
+        return _paged(lambda: steps, thread.positions, limit, order, before, lambda: self._request("run_steps.list"))
+
+
+def fake_project_client(threads: list[FakeThread], latency: float = 0.002) -> SimpleNamespace:
+    """An object with an ``agents`` attribute, enough for ``AIAgentConverter``."""
+
+    return SimpleNamespace(agents=FakeAgentsClient(threads, latency))
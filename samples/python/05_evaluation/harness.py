@@ -0,0 +1,464 @@
+"""Parallel, batched evaluation over a JSONL dataset of prompts or existing runs.
+
+Each dataset line is either ``{"id": ..., "prompt": ...}`` (a run is generated with the
+evaluation agent) or ``{"id": ..., "thread_id": ..., "run_id": ...}`` (an existing run is
+evaluated). Items flow through generation, ``AIAgentConverter`` conversion and evaluation on
+a worker pool; the evaluators of an item run in parallel, and judge calls are rate limited.
+Results are written as one row per item (Parquet or CSV) plus aggregate scores::
+
+    python -m samples.python.05_evaluation.harness dataset.jsonl --output results.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib.metadata
+import json
+import logging
+import math
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from azure.ai.evaluation import AIAgentConverter, ContentSafetyEvaluator, IntentResolutionEvaluator
+from azure.ai.projects import AIProjectClient
+
+from ..common import (
+    AgentRegistry,
+    RunStream,
+    configure_logging,
+    configure_metrics,
+    configure_profiling,
+    discard_thread,
+    get_credential,
+    get_metrics,
+    load_config,
+    shared_project_client,
+)
+from ..common.http import TokenBucket
+from ..common.metrics import THREAD_CREATE
+from .incremental import IncrementalAgentConverter
+from .main import _load_judge_model_config
+from .result_cache import EvaluatorResultCache, cache_path_from_env, config_hash, content_hash
+
+try:  # pragma: no cover - optional dependency
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None  # type: ignore[assignment]
+
+_logger = logging.getLogger("evaluation_harness")
+
+AGENT_INSTRUCTIONS = (
+    "Answer travel questions for Contoso employees. If information is missing, clearly state the limitation."
+)
+
+
+@dataclass(slots=True)
+class DatasetItem:
+    item_id: str
+    prompt: Optional[str] = None
+    thread_id: Optional[str] = None
+    run_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class EvaluatorSpec:
+    """An evaluator plus the rate limiter guarding the service it calls.
+
+    ``config`` and ``judge`` identify what produced a result; together with the converted
+    input they form the result cache key, so changing either re-scores every item.
+    """
+
+    name: str
+    evaluator: Callable[..., dict]
+    limiter: Optional[TokenBucket] = None
+    config: dict[str, Any] = field(default_factory=dict)
+    judge: str = ""
+    config_hash: str = field(init=False, default="")
+
+    def __post_init__(self) -> None:
+        self.config_hash = config_hash({"class": type(self.evaluator).__name__, **self.config})
+
+
+@dataclass(slots=True)
+class ItemResult:
+    item_id: str
+    thread_id: Optional[str] = None
+    run_id: Optional[str] = None
+    status: str = "pending"
+    error: Optional[str] = None
+    cache_hits: int = 0
+    scores: dict[str, Any] = field(default_factory=dict)
+    durations: dict[str, float] = field(default_factory=dict)
+
+    def row(self) -> dict[str, Any]:
+        return {
+            "id": self.item_id,
+            "thread_id": self.thread_id,
+            "run_id": self.run_id,
+            "status": self.status,
+            "error": self.error,
+            "cache_hits": self.cache_hits,
+            **{f"seconds_{phase}": round(value, 3) for phase, value in self.durations.items()},
+            **self.scores,
+        }
+
+
+def load_dataset(path: Path) -> Iterator[DatasetItem]:
+    with path.open(encoding="utf-8") as stream:
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            if not record.get("prompt") and not (record.get("thread_id") and record.get("run_id")):
+                raise ValueError(f"{path}:{number}: expected 'prompt' or 'thread_id' and 'run_id'")
+            yield DatasetItem(
+                item_id=str(record.get("id", number)),
+                prompt=record.get("prompt"),
+                thread_id=record.get("thread_id"),
+                run_id=record.get("run_id"),
+            )
+
+
+def _flatten_scores(name: str, output: dict[str, Any]) -> dict[str, Any]:
+    """Keep scalar evaluator outputs as ``<evaluator>.<key>`` columns."""
+
+    return {
+        f"{name}.{key}": value
+        for key, value in output.items()
+        if isinstance(value, (str, int, float, bool)) or value is None
+    }
+
+
+class EvaluationHarness:
+    """Generate, convert and evaluate dataset items concurrently.
+
+    Parameters
+    ----------
+    project_client:
+        Shared ``AIProjectClient`` for runs and conversion.
+    agent_id:
+        Agent used for items that carry a prompt.
+    evaluators:
+        Evaluators to apply to every converted item.
+    workers:
+        Items processed at once (generation + conversion).
+    evaluator_workers:
+        Evaluator calls in flight across all items.
+    converter_factory:
+        Builds one converter per worker thread; defaults to ``AIAgentConverter``.
+    cache:
+        Optional :class:`EvaluatorResultCache`; hits skip the evaluator (and its judge call).
+    """
+
+    def __init__(
+        self,
+        project_client: Any,
+        agent_id: Optional[str],
+        evaluators: list[EvaluatorSpec],
+        *,
+        workers: int = 8,
+        evaluator_workers: int = 8,
+        converter_factory: Optional[Callable[[], Any]] = None,
+        keep_threads: bool = False,
+        cache: Optional[EvaluatorResultCache] = None,
+    ) -> None:
+        self.project_client = project_client
+        self.agent_id = agent_id
+        self.evaluators = evaluators
+        self.workers = workers
+        self.keep_threads = keep_threads
+        self.cache = cache
+        self._converter_factory = converter_factory or (lambda: AIAgentConverter(project_client))
+        self._local = threading.local()
+        self._evaluator_pool = ThreadPoolExecutor(max_workers=evaluator_workers, thread_name_prefix="evaluator")
+
+    def _converter(self) -> Any:
+        converter = getattr(self._local, "converter", None)
+        if converter is None:
+            converter = self._local.converter = self._converter_factory()
+        return converter
+
+    def _generate(self, item: DatasetItem, result: ItemResult) -> None:
+        agents = self.project_client.agents
+        with get_metrics().time(THREAD_CREATE, self.agent_id):
+            thread = agents.threads.create()
+        result.thread_id = thread.id
+        agents.messages.create(thread_id=thread.id, role="user", content=item.prompt)
+        stream = RunStream(agents, thread_id=thread.id, agent_id=self.agent_id)
+        for _ in stream:
+            pass
+        result.run_id = stream.run.id
+        if stream.run.status != "completed":
+            raise RuntimeError(f"Run ended with status {stream.run.status}: {stream.run.last_error}")
+
+    def _evaluate(self, spec: EvaluatorSpec, converted: dict[str, Any], digest: str) -> tuple[dict[str, Any], bool]:
+        """Return the evaluator output and whether it came from the cache."""
+
+        if self.cache is not None:
+            cached = self.cache.get(spec.name, spec.config_hash, spec.judge, digest)
+            if cached is not None:
+                return cached, True
+        if spec.limiter is not None:
+            spec.limiter.acquire()
+        output = spec.evaluator(**converted)
+        if self.cache is not None:
+            self.cache.put(spec.name, spec.config_hash, spec.judge, digest, output)
+        return output, False
+
+    def process(self, item: DatasetItem) -> ItemResult:
+        result = ItemResult(item.item_id, thread_id=item.thread_id, run_id=item.run_id)
+        generated = False
+        try:
+            if item.prompt and not item.run_id:
+                started = time.perf_counter()
+                self._generate(item, result)
+                generated = True
+                result.durations["generate"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            converted = self._converter().convert(result.thread_id, result.run_id)
+            result.durations["convert"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            digest = content_hash(converted)
+            futures: dict[str, Future] = {
+                spec.name: self._evaluator_pool.submit(self._evaluate, spec, converted, digest)
+                for spec in self.evaluators
+            }
+            errors = []
+            for name, future in futures.items():
+                try:
+                    output, cached = future.result()
+                    result.scores.update(_flatten_scores(name, output))
+                    result.cache_hits += cached
+                except Exception as exc:  # noqa: BLE001 - recorded per evaluator
+                    errors.append(f"{name}: {exc}")
+            result.durations["evaluate"] = time.perf_counter() - started
+            result.status = "failed" if errors else "completed"
+            result.error = "; ".join(errors) or None
+        except Exception as exc:  # noqa: BLE001 - one bad item must not stop the dataset
+            _logger.warning("Item %s failed (評価に失敗しました): %s", item.item_id, exc)
+            result.status = "failed"
+            result.error = str(exc)
+        finally:
+            if generated and not self.keep_threads and result.thread_id:
+                discard_thread(self.project_client.agents, result.thread_id)
+        return result
+
+    def run(self, items: Iterator[DatasetItem], on_result: Optional[Callable[[ItemResult], None]] = None) -> list[ItemResult]:
+        """Process ``items`` with at most ``2 * workers`` queued; results keep dataset order."""
+
+        results: list[ItemResult] = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="eval-item") as pool:
+            pending: list[Future] = []
+            for item in items:
+                pending.append(pool.submit(self.process, item))
+                while len(pending) >= 2 * self.workers:
+                    results.append(self._collect(pending.pop(0), on_result))
+            while pending:
+                results.append(self._collect(pending.pop(0), on_result))
+        return results
+
+    @staticmethod
+    def _collect(future: Future, on_result: Optional[Callable[[ItemResult], None]]) -> ItemResult:
+        result = future.result()
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    def close(self) -> None:
+        self._evaluator_pool.shutdown(wait=True)
+
+
+def aggregate(results: list[ItemResult]) -> dict[str, Any]:
+    """Mean of numeric score columns, pass rate of ``*_result`` columns and phase timings."""
+
+    summary: dict[str, Any] = {
+        "items": len(results),
+        "completed": sum(result.status == "completed" for result in results),
+        "failed": sum(result.status == "failed" for result in results),
+        "cache_hits": sum(result.cache_hits for result in results),
+    }
+    columns: dict[str, list[Any]] = {}
+    for result in results:
+        for key, value in {**result.scores, **{f"seconds_{k}": v for k, v in result.durations.items()}}.items():
+            columns.setdefault(key, []).append(value)
+    for key, values in sorted(columns.items()):
+        numbers = [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool) and not math.isnan(v)]
+        if numbers:
+            summary[f"mean.{key}"] = round(statistics.fmean(numbers), 4)
+        elif key.endswith("_result"):
+            passed = sum(str(value).lower() == "pass" for value in values)
+            summary[f"pass_rate.{key}"] = round(passed / len(values), 4)
+    return summary
+
+
+def write_results(results: list[ItemResult], output: Path) -> Path:
+    """Write one row per item; ``.parquet`` needs pandas + pyarrow, anything else is CSV."""
+
+    rows = [result.row() for result in results]
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix == ".parquet":
+        if pd is None:
+            raise RuntimeError("pandas and pyarrow are required for Parquet output; use a .csv path instead")
+        pd.DataFrame(rows).to_parquet(output, index=False)
+        return output
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with output.open("w", newline="", encoding="utf-8") as stream:
+        writer = csv.DictWriter(stream, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return output
+
+
+def _sdk_version() -> str:
+    try:
+        return importlib.metadata.version("azure-ai-evaluation")
+    except importlib.metadata.PackageNotFoundError:  # pragma: no cover - source checkouts
+        return "unknown"
+
+
+def build_evaluators(config: Any, credential: Any, judge_rpm: float) -> list[EvaluatorSpec]:
+    limiter = TokenBucket(judge_rpm / 60.0, burst=max(1.0, judge_rpm / 60.0 * 5))
+    model_config = _load_judge_model_config()
+    intent = IntentResolutionEvaluator(model_config=model_config)
+    safety_project = config.evaluation_project_endpoint or config.project_endpoint
+    # Prompts and thresholds ship with the SDK, so its version is part of the config.
+    version = _sdk_version()
+    return [
+        EvaluatorSpec(
+            "intent_resolution",
+            intent,
+            limiter=limiter,
+            config={"sdk": version, "threshold": getattr(intent, "threshold", None)},
+            judge=f"{model_config['azure_endpoint']}/{model_config['azure_deployment']}",
+        ),
+        EvaluatorSpec(
+            "content_safety",
+            ContentSafetyEvaluator(azure_ai_project=safety_project, credential=credential),
+            config={"sdk": version},
+            judge=safety_project,
+        ),
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parallel evaluation harness")
+    parser.add_argument("dataset", type=Path, help="JSONL with prompts or thread_id/run_id pairs")
+    parser.add_argument("--output", type=Path, default=Path("evaluation_results.csv"), help=".csv or .parquet")
+    parser.add_argument("--workers", type=int, default=8, help="Items generated/converted at once")
+    parser.add_argument("--evaluator-workers", type=int, default=8, help="Evaluator calls in flight")
+    parser.add_argument("--judge-rpm", type=float, default=60.0, help="Judge deployment requests per minute")
+    parser.add_argument("--keep-threads", action="store_true", help="Keep generated threads for inspection")
+    parser.add_argument(
+        "--full-conversion",
+        action="store_true",
+        help="Convert every run from scratch with AIAgentConverter instead of the incremental converter",
+    )
+    parser.add_argument(
+        "--cache", type=Path, default=None, help="Evaluator result cache (SQLite; default WORKSHOP_EVAL_CACHE)"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the evaluators")
+    parser.add_argument(
+        "--invalidate",
+        action="append",
+        default=[],
+        metavar="EVALUATOR",
+        help="Drop cached results of an evaluator before running ('all' clears the cache); repeatable",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile agent service calls and write a flamegraph report at exit"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    configure_metrics()
+    if args.profile:
+        configure_profiling(True)
+    # Resolved only now: configure_logging loads .env, which may set WORKSHOP_EVAL_CACHE.
+    cache_path = args.cache if args.cache is not None else cache_path_from_env()
+    cache = None
+    if cache_path is not None and not args.no_cache:
+        cache = EvaluatorResultCache(cache_path)
+        if args.invalidate:
+            removed = cache.invalidate(None if "all" in args.invalidate else args.invalidate)
+            _logger.info("Invalidated %d cached results (キャッシュを %d 件削除しました)", removed, removed)
+    try:
+        config = load_config()
+        items = list(load_dataset(args.dataset))
+    except (EnvironmentError, ValueError) as exc:
+        _logger.error("Failed to prepare evaluation (評価の準備に失敗しました): %s", exc)
+        return 1
+
+    credential = get_credential()
+    with shared_project_client(config.project_endpoint) as project_client:
+        registry = AgentRegistry(project_client.agents, config.project_endpoint)
+        agent_id = None
+        harness = None
+        try:
+            evaluators = build_evaluators(config, credential, args.judge_rpm)
+            if any(item.prompt and not item.run_id for item in items):
+                agent_id = registry.acquire(
+                    model=config.model_deployment_name, name="workshop-eval-agent", instructions=AGENT_INSTRUCTIONS
+                )
+            converter_factory = None
+            if not args.full_conversion:
+                # One shared instance, so runs of the same thread reuse its converted history.
+                shared_converter = IncrementalAgentConverter(project_client)
+                converter_factory = lambda: shared_converter  # noqa: E731
+            harness = EvaluationHarness(
+                project_client,
+                agent_id,
+                evaluators,
+                workers=args.workers,
+                evaluator_workers=args.evaluator_workers,
+                keep_threads=args.keep_threads,
+                converter_factory=converter_factory,
+                cache=cache,
+            )
+            started = time.perf_counter()
+            done = 0
+
+            def progress(result: ItemResult) -> None:
+                nonlocal done
+                done += 1
+                if done % 25 == 0 or done == len(items):
+                    _logger.info("Evaluated %d/%d items (%d/%d 件を評価しました)", done, len(items), done, len(items))
+
+            results = harness.run(iter(items), on_result=progress)
+            elapsed = time.perf_counter() - started
+        except EnvironmentError as exc:
+            _logger.error("Failed to run evaluation (評価の実行に失敗しました): %s", exc)
+            return 1
+        finally:
+            if harness is not None:
+                harness.close()
+            if cache is not None:
+                cache.close()
+            if agent_id:
+                registry.release(agent_id)
+
+    write_results(results, args.output)
+    summary = aggregate(results)
+    summary["elapsed_seconds"] = round(elapsed, 2)
+    summary["items_per_minute"] = round(len(results) / elapsed * 60, 1) if elapsed else None
+    if cache is not None:
+        summary["cache_hit_rate"] = round(cache.hit_rate, 4)
+    summary_path = args.output.with_suffix(".summary.json")
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    _logger.info("Results: %s, summary: %s (結果を書き出しました)", args.output, summary_path)
+    _logger.info("結果: %s", json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
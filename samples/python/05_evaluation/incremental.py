@@ -0,0 +1,197 @@
+"""Incremental ``AIAgentConverter`` for evaluating many runs of long threads.
+
+``AIAgentConverter.convert`` lists the whole thread and the run steps of every earlier run
+on each call, so evaluating every run of an N-turn thread costs O(N²) requests.
+:class:`IncrementalAgentConverter` keeps the converted history per thread: each call only
+pages through messages and runs newer than the last ID it has seen, fetches run steps for
+runs it has not converted yet, and builds the evaluator input for run N from the cached
+prefix. Output is identical to ``AIAgentConverter.convert`` for completed runs::
+
+    python -m samples.python.05_evaluation.incremental --turns 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from azure.ai.evaluation import AIAgentConverter
+from azure.ai.evaluation._converters._models import EvaluatorData, SystemMessage
+
+_PAGE_SIZE = 100
+
+
+@dataclass(slots=True)
+class ThreadHistory:
+    """Converted history of one thread, in the order the service returned it."""
+
+    messages: list[Any] = field(default_factory=list)
+    typed: list[list[Any]] = field(default_factory=list)
+    last_message_id: Optional[str] = None
+    run_ids: list[str] = field(default_factory=list)
+    last_run_id: Optional[str] = None
+    # Messages up to and including a run end at ``run_end[run_id]`` (exclusive index).
+    run_end: dict[str, int] = field(default_factory=dict)
+    open_run: Optional[str] = None
+    tool_calls: dict[str, list[Any]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class IncrementalAgentConverter(AIAgentConverter):
+    """Drop-in ``AIAgentConverter`` that caches converted history per thread.
+
+    Only completed runs should be converted: their messages and run steps no longer
+    change, which is what makes the cached prefix reusable.
+
+    Parameters
+    ----------
+    project_client:
+        ``AIProjectClient`` (or anything with a compatible ``agents`` attribute).
+    max_threads:
+        Histories kept in memory; the least recently converted thread is dropped first.
+    """
+
+    def __init__(self, project_client: Any, *, max_threads: int = 64) -> None:
+        super().__init__(project_client)
+        self.max_threads = max_threads
+        self._histories: OrderedDict[str, ThreadHistory] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _history(self, thread_id: str) -> ThreadHistory:
+        with self._lock:
+            history = self._histories.get(thread_id)
+            if history is None:
+                history = self._histories[thread_id] = ThreadHistory()
+                while len(self._histories) > self.max_threads:
+                    self._histories.popitem(last=False)
+            self._histories.move_to_end(thread_id)
+            return history
+
+    def forget(self, thread_id: str) -> None:
+        with self._lock:
+            self._histories.pop(thread_id, None)
+
+    def _append_message(self, history: ThreadHistory, message: Any) -> None:
+        # Mirrors AIAgentConverter._filter_messages_up_to_run_id: a run's prefix ends at the
+        # first message after the run's first message that belongs to something else.
+        position = len(history.messages)
+        history.messages.append(message)
+        history.typed.append(AIAgentConverter._extract_typed_messages([message]))
+        history.last_message_id = message.id
+        run_id = message.run_id
+        if run_id is not None and run_id == history.open_run:
+            history.run_end[run_id] = position + 1
+        elif run_id is not None and run_id not in history.run_end:
+            history.run_end[run_id] = position + 1
+            history.open_run = run_id
+        else:
+            history.open_run = None
+
+    def _refresh(self, thread_id: str, history: ThreadHistory, need_runs: bool) -> None:
+        agents = self.project_client.agents
+        pages = agents.messages.list(thread_id=thread_id, limit=_PAGE_SIZE, order="asc").by_page(
+            continuation_token=history.last_message_id
+        )
+        for page in pages:
+            for message in page:
+                self._append_message(history, message)
+        if need_runs:
+            pages = agents.runs.list(thread_id=thread_id, limit=_PAGE_SIZE, order="asc").by_page(
+                continuation_token=history.last_run_id
+            )
+            for page in pages:
+                for run in page:
+                    history.run_ids.append(run.id)
+                    history.last_run_id = run.id
+
+    def _ensure_tool_calls(self, thread_id: str, history: ThreadHistory, run_ids: list[str]) -> None:
+        missing = [run_id for run_id in run_ids if run_id not in history.tool_calls]
+        if not missing:
+            return
+        if len(missing) == 1:
+            history.tool_calls[missing[0]] = self._fetch_tool_calls(thread_id, missing[0])
+            return
+        with ThreadPoolExecutor(max_workers=self._MAX_WORKERS) as executor:
+            fetched = executor.map(lambda run_id: self._fetch_tool_calls(thread_id, run_id), missing)
+            history.tool_calls.update(zip(missing, fetched))
+
+    def convert(self, thread_id: str, run_id: str, exclude_tool_calls_previous_runs: bool = False) -> dict:
+        thread_run = self._data_retriever._get_run(thread_id=thread_id, run_id=run_id)
+        history = self._history(thread_id)
+        with history.lock:
+            if run_id not in history.run_end or (
+                not exclude_tool_calls_previous_runs and run_id not in history.run_ids
+            ):
+                self._refresh(thread_id, history, need_runs=not exclude_tool_calls_previous_runs)
+
+            end = history.run_end.get(run_id, len(history.messages))
+            final_messages = [typed for messages in history.typed[:end] for typed in messages]
+
+            runs = [run_id]
+            if not exclude_tool_calls_previous_runs:
+                runs = AIAgentConverter._filter_run_ids_up_to_run_id(history.run_ids, run_id, include_run_id=False)
+                runs.append(run_id)
+            self._ensure_tool_calls(thread_id, history, runs)
+            for previous in runs:
+                final_messages.extend(history.tool_calls[previous])
+
+        final_messages = AIAgentConverter._sort_messages(final_messages)
+        if thread_run.instructions:
+            final_messages.insert(0, SystemMessage(content=thread_run.instructions))
+        query, responses = AIAgentConverter._break_into_query_responses(final_messages, run_id)
+        result = EvaluatorData(
+            query=query,
+            response=responses,
+            tool_definitions=AIAgentConverter._extract_function_tool_definitions(thread_run),
+        )
+        # Same dict as json.loads(result.to_json()) without the string round trip.
+        return result.model_dump(mode="json", exclude_none=True)
+
+
+def _convert_every_run(converter: AIAgentConverter, thread: Any, step: int) -> tuple[float, list[dict]]:
+    """Grow ``thread`` one turn at a time and convert each new run, like a regression sweep."""
+
+    outputs = []
+    started = time.perf_counter()
+    total = len(thread.runs)
+    for turn in range(1, total + 1):
+        thread.visible_turns = turn
+        if turn % step == 0 or turn == total:
+            outputs.append(converter.convert(thread.thread_id, thread.runs[turn - 1].id))
+    return time.perf_counter() - started, outputs
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from .fake_service import FakeThread, fake_project_client
+
+    parser = argparse.ArgumentParser(description="Benchmark incremental conversion on a synthetic thread")
+    parser.add_argument("--turns", type=int, default=500, help="Turns (runs) in the synthetic thread")
+    parser.add_argument("--latency", type=float, default=0.002, help="Simulated seconds per service request")
+    parser.add_argument("--step", type=int, default=1, help="Convert every Nth run (1 = every run)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, factory in (
+        ("AIAgentConverter", AIAgentConverter),
+        ("IncrementalAgentConverter", IncrementalAgentConverter),
+    ):
+        thread = FakeThread(turns=args.turns)
+        project_client = fake_project_client([thread], latency=args.latency)
+        elapsed, outputs = _convert_every_run(factory(project_client), thread, args.step)
+        results[name] = (elapsed, sum(project_client.agents.requests.values()), outputs)
+        print(f"{name:<26} {elapsed:8.2f}s  {results[name][1]:7d} requests  {dict(project_client.agents.requests)}")
+
+    baseline, incremental = results["AIAgentConverter"], results["IncrementalAgentConverter"]
+    identical = baseline[2] == incremental[2]
+    print(f"speedup {baseline[0] / incremental[0]:.1f}x, outputs identical: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
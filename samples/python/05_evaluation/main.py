@@ -12,11 +12,21 @@ from azure.ai.evaluation import (
     IntentResolutionEvaluator,
 )
 from azure.ai.evaluation._model_configurations import AzureOpenAIModelConfiguration
-from azure.ai.projects import AIProjectClient
 from azure.core.exceptions import HttpResponseError
-from azure.identity import DefaultAzureCredential
 
-from ..common import configure_logging, load_config
+from ..common import (
+    AgentRegistry,
+    RunStream,
+    configure_logging,
+    configure_metrics,
+    discard_thread,
+    echo_run,
+    get_credential,
+    get_metrics,
+    load_config,
+    shared_project_client,
+)
+from ..common.metrics import THREAD_CREATE
 
 _logger = logging.getLogger("evaluation_sample")
 
@@ -37,6 +47,7 @@ def _load_judge_model_config() -> AzureOpenAIModelConfiguration:
 
 def main() -> int:
     configure_logging()
+    configure_metrics()
 
     try:
         config = load_config()
@@ -44,29 +55,31 @@ def main() -> int:
         _logger.error("Failed to load configuration (設定の読み込みに失敗しました): %s", exc)
         return 1
 
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
+    credential = get_credential()
 
-    with AIProjectClient(endpoint=config.project_endpoint, credential=credential) as project_client:
+    with shared_project_client(config.project_endpoint) as project_client:
+        registry = AgentRegistry(project_client.agents, config.project_endpoint)
         agent_id: Optional[str] = None
+        thread = None
         try:
-            _logger.info("Creating agent for evaluation (評価対象のエージェントを作成します)")
-            agent = project_client.agents.create_agent(
+            _logger.info("Preparing agent for evaluation (評価対象のエージェントを準備します)")
+            agent_id = registry.acquire(
                 model=config.model_deployment_name,
                 name="workshop-eval-agent",
                 instructions=(
                     "Answer travel questions for Contoso employees. If information is missing, clearly state the limitation."
                 ),
             )
-            agent_id = agent.id
 
-            thread = project_client.agents.threads.create()
+            with get_metrics().time(THREAD_CREATE, agent_id):
+                thread = project_client.agents.threads.create()
             project_client.agents.messages.create(
                 thread_id=thread.id,
                 role="user",
                 content="ロンドン出張に必要な社内承認フローを教えて。",
             )
 
-            run = project_client.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)
+            run = echo_run(RunStream(project_client.agents, thread_id=thread.id, agent_id=agent_id))
             if run.status == "failed":
                 _logger.error("Agent run failed (エージェント実行が失敗しました): %s", run.last_error)
                 return 1
@@ -94,9 +107,10 @@ def main() -> int:
             _logger.exception("Failed to run evaluation sample (評価サンプルの実行に失敗しました): %s", exc)
             return 1
         finally:
+            if thread is not None:
+                discard_thread(project_client.agents, thread.id)
             if agent_id:
-                _logger.info("Deleting evaluation agent (評価用エージェントを削除します)")
-                project_client.agents.delete_agent(agent_id)
+                registry.release(agent_id)
 
 
 if __name__ == "__main__":
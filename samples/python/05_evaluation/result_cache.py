@@ -0,0 +1,190 @@
+"""Persistent cache of evaluator results.
+
+A result is keyed by the evaluator name, a fingerprint of its configuration (class,
+thresholds, ``azure-ai-evaluation`` version), the judge deployment and a hash of the
+``AIAgentConverter.convert`` output with per-run IDs and timestamps removed (see
+:func:`normalize_conversation`). Re-running a dataset after a change therefore only calls
+the judge for conversations whose content actually changed, even when they were
+regenerated in new threads. Results live in SQLite so several harness workers can read and
+write concurrently.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+_DEFAULT_CACHE_PATH = Path.home() / ".cache" / "azure-ai-agent-workshop" / "evaluation-cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    evaluator TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    judge TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_evaluator ON results (evaluator);
+"""
+
+
+def cache_path_from_env() -> Optional[Path]:
+    """``WORKSHOP_EVAL_CACHE`` overrides the cache file; ``off`` disables the cache."""
+
+    value = os.getenv("WORKSHOP_EVAL_CACHE", str(_DEFAULT_CACHE_PATH))
+    if value.lower() in {"", "0", "false", "no", "off"}:
+        return None
+    return Path(value)
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Set on each message (and content item) by the service; they differ on every regenerated run.
+_VOLATILE_KEYS = frozenset({"createdAt", "created_at", "completed_at", "run_id", "thread_id", "message_id", "id"})
+
+
+def normalize_conversation(converted: dict[str, Any]) -> dict[str, Any]:
+    """``AIAgentConverter.convert`` output without the IDs and timestamps of a particular run.
+
+    Only the message and content envelopes the converter builds are stripped; roles, text, tool
+    names and the tool definitions are kept, and tool ``arguments`` and results are kept
+    verbatim (an ``id`` there is data, not a run ID). Tool call IDs are replaced by their order
+    of appearance, so calls still pair with their results.
+    """
+
+    call_numbers: dict[str, int] = {}
+
+    def envelope(value: dict[str, Any]) -> dict[str, Any]:
+        normalized = {}
+        for key, item in value.items():
+            if key in _VOLATILE_KEYS:
+                continue
+            if key == "tool_call_id" and isinstance(item, str):
+                item = call_numbers.setdefault(item, len(call_numbers))
+            normalized[key] = item
+        return normalized
+
+    def message(value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        normalized = envelope(value)
+        if isinstance(normalized.get("content"), list):
+            normalized["content"] = [
+                envelope(item) if isinstance(item, dict) else item for item in normalized["content"]
+            ]
+        return normalized
+
+    return {
+        key: [message(item) for item in value] if key in {"query", "response"} and isinstance(value, list) else value
+        for key, value in converted.items()
+    }
+
+
+def content_hash(converted: dict[str, Any]) -> str:
+    """Hash of the evaluator input of ``AIAgentConverter.convert``, see :func:`normalize_conversation`."""
+
+    return _digest(normalize_conversation(converted))
+
+
+def config_hash(config: dict[str, Any]) -> str:
+    return _digest(config)
+
+
+class EvaluatorResultCache:
+    """SQLite-backed store of evaluator outputs.
+
+    Each thread gets its own connection; writes are serialised by SQLite (WAL mode), so the
+    cache can be shared by every worker of the evaluation harness.
+    """
+
+    def __init__(self, path: Path = _DEFAULT_CACHE_PATH) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Each connection stays on its thread; the flag only lets close() run elsewhere.
+            connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def key(evaluator: str, config: str, judge: str, content: str) -> str:
+        return hashlib.sha256(f"{evaluator}\n{config}\n{judge}\n{content}".encode("utf-8")).hexdigest()
+
+    def get(self, evaluator: str, config: str, judge: str, content: str) -> Optional[dict[str, Any]]:
+        """Return the cached output, counting a hit or a miss."""
+
+        row = self._connection().execute(
+            "SELECT result FROM results WHERE key = ?", (self.key(evaluator, config, judge, content),)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, evaluator: str, config: str, judge: str, content: str, result: dict[str, Any]) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(evaluator, config, judge, content),
+                    evaluator,
+                    config,
+                    judge,
+                    content,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    time.time(),
+                ),
+            )
+
+    def invalidate(self, evaluators: Optional[Iterable[str]] = None) -> int:
+        """Delete the results of ``evaluators`` (all results when ``None``); returns rows removed."""
+
+        with self._connection() as connection:
+            if evaluators is None:
+                return connection.execute("DELETE FROM results").rowcount
+            names = list(evaluators)
+            placeholders = ", ".join("?" for _ in names)
+            return connection.execute(f"DELETE FROM results WHERE evaluator IN ({placeholders})", names).rowcount
+
+    def counts(self) -> dict[str, int]:
+        rows = self._connection().execute("SELECT evaluator, COUNT(*) FROM results GROUP BY evaluator").fetchall()
+        return dict(rows)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
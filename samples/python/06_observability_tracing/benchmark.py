@@ -0,0 +1,131 @@
+"""Measure per-request tracing overhead: off, head+tail sampled, full, and the old synchronous export.
+
+Each simulated request creates the spans the sample emits (``agent-run`` with thread setup,
+tool calls and message listing). A configurable share of requests fail or are slow, so tail
+sampling has something to keep. The exporter serialises spans and sleeps to mimic a network
+round trip::
+
+    python -m samples.python.06_observability_tracing.benchmark --requests 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+from typing import Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import Status, StatusCode
+
+from .tracing import TracingSettings, create_sampler, create_span_processor, pipeline_stats
+
+
+class SimulatedExporter(SpanExporter):
+    """Serialise spans like a real exporter and sleep ``latency`` seconds per export call."""
+
+    def __init__(self, latency: float = 0.005) -> None:
+        self.latency = latency
+        self.spans = 0
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            span.to_json()
+        self.spans += len(spans)
+        time.sleep(self.latency)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        return
+
+
+def _request(tracer: trace.Tracer, rng: random.Random, failure_rate: float, slow_rate: float) -> None:
+    slow = rng.random() < slow_rate
+    # Pretend slow runs started long ago instead of actually sleeping.
+    start_time = time.time_ns() - 30_000_000_000 if slow else None
+    with tracer.start_as_current_span("agent-run", start_time=start_time) as run_span:
+        run_span.set_attribute("gen_ai.agent.id", "asst_benchmark")
+        with tracer.start_as_current_span("thread-setup") as span:
+            span.set_attribute("gen_ai.thread.id", "thread_benchmark")
+        for number in range(3):
+            with tracer.start_as_current_span("execute_tool") as span:
+                span.set_attribute("gen_ai.tool.name", f"tool_{number}")
+        with tracer.start_as_current_span("read-messages") as span:
+            span.set_attribute("gen_ai.message.count", 4)
+        if rng.random() < failure_rate:
+            run_span.set_status(Status(StatusCode.ERROR, "run failed"))
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _measure(provider: trace.TracerProvider, requests: int, args: argparse.Namespace) -> list[float]:
+    tracer = provider.get_tracer("benchmark")
+    rng = random.Random(args.seed)
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        _request(tracer, rng, args.failure_rate, args.slow_rate)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tracing overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--ratio", type=float, default=0.1, help="Head sampling ratio for the sampled mode")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--slow-rate", type=float, default=0.01)
+    parser.add_argument("--export-latency", type=float, default=0.005, help="Seconds per export call")
+    parser.add_argument(
+        "--sync-requests", type=int, default=300, help="Requests for the synchronous mode, which pays export latency"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    modes = {
+        "off": None,
+        "sampled (head)": TracingSettings(sample_ratio=args.ratio, tail_sampling=False),
+        "sampled (head+tail)": TracingSettings(sample_ratio=args.ratio, tail_sampling=True, slow_threshold=10.0),
+        "full": TracingSettings(sample_ratio=1.0),
+        "full (synchronous)": "simple",
+    }
+    baseline = None
+    print(f"{'mode':<22}{'mean µs':>10}{'p50 µs':>10}{'p99 µs':>10}{'overhead µs':>13}  pipeline")
+    for name, settings in modes.items():
+        exporter = SimulatedExporter(args.export_latency)
+        processor = None
+        if settings is None:
+            provider: trace.TracerProvider = trace.NoOpTracerProvider()
+        elif settings == "simple":
+            provider = TracerProvider()
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+        else:
+            sampler = create_sampler(settings.sample_ratio, tail_sampling=settings.tail_sampling)
+            provider = TracerProvider(sampler=sampler)
+            processor = create_span_processor(exporter, settings)
+            provider.add_span_processor(processor)
+
+        latencies = _measure(provider, args.sync_requests if settings == "simple" else args.requests, args)
+        if isinstance(provider, TracerProvider):
+            provider.shutdown()
+        mean = statistics.fmean(latencies)
+        baseline = mean if baseline is None else baseline
+        details = pipeline_stats(processor) if processor is not None else {}
+        details["spans_exported"] = exporter.spans
+        print(
+            f"{name:<22}{mean:>10.1f}{statistics.median(latencies):>10.1f}{_percentile(latencies, 0.99):>10.1f}"
+            f"{mean - baseline:>13.1f}  {details}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
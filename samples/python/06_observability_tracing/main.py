@@ -3,31 +3,33 @@ from __future__ import annotations
 import logging
 import os
 import sys
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
 from azure.ai.agents.models import CodeInterpreterTool, MessageRole
-from azure.ai.agents.telemetry import AIAgentsInstrumentor
-from azure.ai.projects import AIProjectClient
 from azure.core.exceptions import HttpResponseError
-from azure.core.settings import settings
-from azure.core.tracing.ext.opentelemetry_span import OpenTelemetrySpan
-from azure.identity import DefaultAzureCredential
 
+# Only the OpenTelemetry API is imported up front; it is a no-op until a provider is set.
+# The SDK, the exporters and the instrumentation load in _configure_tracing.
 from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import (
-    BatchSpanProcessor,
-    ConsoleSpanExporter,
-    SimpleSpanProcessor,
+from opentelemetry.trace import Status, StatusCode
+
+from ..common import (
+    AgentRegistry,
+    MessageReader,
+    RunStream,
+    configure_logging,
+    configure_metrics,
+    discard_thread,
+    echo_run,
+    get_metrics,
+    load_config,
+    pretty_print_messages,
+    shared_project_client,
 )
+from ..common.metrics import MESSAGE_LIST, THREAD_CREATE
 
-try:  # pragma: no cover - optional dependency
-    from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
-except ImportError:  # pragma: no cover - optional dependency
-    AzureMonitorTraceExporter = None  # type: ignore[assignment]
-
-from ..common import configure_logging, load_config, pretty_print_messages
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .tracing import TracingSettings
 
 _logger = logging.getLogger("observability_tracing")
 
@@ -35,12 +37,32 @@ _logger = logging.getLogger("observability_tracing")
 def _configure_tracing(
     app_insights_connection_string: Optional[str],
     enable_content_recording: bool,
+    tracing_settings: Optional[TracingSettings] = None,
 ) -> Callable[[], None]:
     """Configure OpenTelemetry exporters and instrument the Azure AI Agents SDK.
 
+    Spans are head sampled (and tail sampled for failed or slow runs) per ``tracing_settings``
+    and exported through a bounded batch processor off the request thread.
+
     Returns a callable that should be invoked to gracefully shut down tracing.
     """
 
+    from azure.ai.agents.telemetry import AIAgentsInstrumentor
+    from azure.core.settings import settings
+    from azure.core.tracing.ext.opentelemetry_span import OpenTelemetrySpan
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SpanExporter
+
+    from .tracing import TracingSettings, create_sampler, create_span_processor, pipeline_stats
+
+    try:  # pragma: no cover - optional dependency
+        from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
+    except ImportError:  # pragma: no cover - optional dependency
+        AzureMonitorTraceExporter = None  # type: ignore[assignment,misc]
+
+    tracing_settings = tracing_settings or TracingSettings.from_env()
+
     resource = Resource.create(
         {
             "service.name": "workshop-agent-tracing",
@@ -49,33 +71,40 @@ def _configure_tracing(
         }
     )
 
-    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider = TracerProvider(
+        resource=resource,
+        sampler=create_sampler(tracing_settings.sample_ratio, tail_sampling=tracing_settings.tail_sampling),
+    )
 
-    span_processor = None
+    exporter: Optional[SpanExporter] = None
     if app_insights_connection_string and AzureMonitorTraceExporter is not None:
         try:
             exporter = AzureMonitorTraceExporter.from_connection_string(
                 app_insights_connection_string
             )
-            span_processor = BatchSpanProcessor(exporter)
             _logger.info("Application Insights exporter configured for tracing output")
         except Exception as exc:  # pragma: no cover - defensive
             _logger.warning(
                 "Failed to configure Azure Monitor exporter (%s). Falling back to console exporter.",
                 exc,
             )
-            span_processor = None
+            exporter = None
     elif app_insights_connection_string and AzureMonitorTraceExporter is None:
         _logger.warning(
             "Azure Monitor exporter package is missing; traces will be emitted to the console instead."
         )
 
-    if span_processor is None:
-        console_exporter = ConsoleSpanExporter()
-        span_processor = SimpleSpanProcessor(console_exporter)
+    if exporter is None:
+        exporter = ConsoleSpanExporter()
         _logger.info("Console span exporter enabled (stdout)")
 
+    span_processor = create_span_processor(exporter, tracing_settings)
     tracer_provider.add_span_processor(span_processor)
+    _logger.info(
+        "Sampling %.0f%% of traces%s",
+        tracing_settings.sample_ratio * 100,
+        " plus failed and slow runs" if tracing_settings.tail_sampling and tracing_settings.sample_ratio < 1.0 else "",
+    )
     trace.set_tracer_provider(tracer_provider)
 
     # Wire Azure Core to use OpenTelemetry spans and enable agent instrumentation.
@@ -86,10 +115,17 @@ def _configure_tracing(
     def shutdown() -> None:
         instrumentor.uninstrument()
         tracer_provider.shutdown()
+        _logger.info("Tracing pipeline: %s", pipeline_stats(span_processor))
 
     return shutdown
 
 
+def _tracing_disabled() -> bool:
+    """``OTEL_SDK_DISABLED=true`` runs the sample without loading the OpenTelemetry SDK."""
+
+    return os.getenv("OTEL_SDK_DISABLED", "false").lower() in {"1", "true", "yes", "on"}
+
+
 def _should_record_content() -> bool:
     flag = os.getenv("ENABLE_AGENT_TRACE_CONTENT", "false").lower()
     return flag in {"1", "true", "yes", "on"}
@@ -97,6 +133,7 @@ def _should_record_content() -> bool:
 
 def main() -> int:
     configure_logging()
+    configure_metrics()
 
     try:
         config = load_config()
@@ -107,10 +144,14 @@ def main() -> int:
     connection_string = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING")
 
     try:
-        shutdown_tracing = _configure_tracing(
-            app_insights_connection_string=connection_string,
-            enable_content_recording=_should_record_content(),
-        )
+        if _tracing_disabled():
+            _logger.info("Tracing disabled (OTEL_SDK_DISABLED); spans are not recorded")
+            shutdown_tracing: Callable[[], None] = lambda: None
+        else:
+            shutdown_tracing = _configure_tracing(
+                app_insights_connection_string=connection_string,
+                enable_content_recording=_should_record_content(),
+            )
     except ModuleNotFoundError as exc:
         _logger.error(
             "Tracing dependencies are missing. Install the tracing extras via 'pip install -r requirements.txt'. (%s)",
@@ -118,7 +159,6 @@ def main() -> int:
         )
         return 1
 
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
     tracer = trace.get_tracer("samples.python.observability_tracing")
 
     exit_code = 0
@@ -126,11 +166,13 @@ def main() -> int:
         with tracer.start_as_current_span("observability-sample") as sample_span:
             sample_span.set_attribute("workshop.module", "Day2-Observability")
             try:
-                with AIProjectClient(endpoint=config.project_endpoint, credential=credential) as project_client:
-                    agent = None
+                with shared_project_client(config.project_endpoint) as project_client:
+                    registry = AgentRegistry(project_client.agents, config.project_endpoint)
+                    agent_id = None
+                    thread = None
                     try:
-                        _logger.info("Creating an agent instrumented for tracing")
-                        agent = project_client.agents.create_agent(
+                        _logger.info("Preparing an agent instrumented for tracing")
+                        agent_id = registry.acquire(
                             model=config.model_deployment_name,
                             name="workshop-observability-agent",
                             instructions=(
@@ -141,20 +183,28 @@ def main() -> int:
                         )
 
                         with tracer.start_as_current_span("thread-setup"):
-                            thread = project_client.agents.threads.create()
+                            with get_metrics().time(THREAD_CREATE, agent_id):
+                                thread = project_client.agents.threads.create()
                             project_client.agents.messages.create(
                                 thread_id=thread.id,
                                 role=MessageRole.USER,
                                 content="Graph the function y = 2x^2 - 5x + 3 and summarise the vertex.",
                             )
 
-                        with tracer.start_as_current_span("agent-run"):
-                            run = project_client.agents.runs.create_and_process(
+                        with tracer.start_as_current_span("agent-run") as run_span:
+                            stream = RunStream(
+                                project_client.agents,
                                 thread_id=thread.id,
-                                agent_id=agent.id,
+                                agent_id=agent_id,
                                 additional_instructions="Address the audience as Observability Team.",
                             )
-                            if run.status != "succeeded":
+                            run = echo_run(stream)
+                            ttft = stream.metrics.time_to_first_token
+                            if ttft is not None:
+                                run_span.set_attribute("workshop.time_to_first_token_ms", ttft * 1000)
+                            if run.status != "completed":
+                                # Failed runs are always exported, even when head sampling dropped the trace.
+                                run_span.set_status(Status(StatusCode.ERROR, f"run {run.status}"))
                                 _logger.error(
                                     "Agent run did not complete successfully (status=%s, error=%s)",
                                     run.status,
@@ -164,15 +214,17 @@ def main() -> int:
 
                         if exit_code == 0:
                             with tracer.start_as_current_span("read-messages"):
-                                messages = project_client.agents.messages.list(thread_id=thread.id)
-                                pretty_print_messages(messages)
+                                with get_metrics().time(MESSAGE_LIST, agent_id):
+                                    reader = MessageReader(project_client.agents)
+                                    pretty_print_messages(reader.new_messages(thread.id))
                     finally:
-                        if agent is not None:
-                            _logger.info("Cleaning up created agent")
+                        if thread is not None:
+                            discard_thread(project_client.agents, thread.id)
+                        if agent_id is not None:
                             try:
-                                project_client.agents.delete_agent(agent.id)
+                                registry.release(agent_id)
                             except Exception as exc:  # pragma: no cover - defensive cleanup
-                                _logger.warning("Failed to delete agent cleanly: %s", exc)
+                                _logger.warning("Failed to release agent cleanly: %s", exc)
             except HttpResponseError as exc:
                 sample_span.record_exception(exc)
                 _logger.exception("Azure AI Agent Service operation failed: %s", exc)
@@ -0,0 +1,321 @@
+"""Sampling and export pipeline for the tracing sample.
+
+* Head sampling keeps ``ratio`` of new traces and follows the parent's decision for child
+  spans (``ParentBased(TraceIdRatioBased)``).
+* Tail sampling additionally keeps every trace that failed or whose root span took at least
+  ``slow_threshold`` seconds. Head-dropped traces are then recorded in-process (not exported)
+  so :class:`TailSamplingProcessor` can decide when the local root span ends.
+* Every exporter sits behind :class:`BoundedBatchSpanProcessor`: spans are queued and
+  exported from a background thread, and when the queue is full new spans are dropped and
+  counted instead of blocking the request thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_OFF,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    StaticSampler,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import StatusCode
+
+_logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(slots=True)
+class TracingSettings:
+    """Sampling and batching knobs, read from ``TRACE_*`` environment variables."""
+
+    sample_ratio: float = 1.0
+    tail_sampling: bool = True
+    slow_threshold: float = 10.0
+    max_queue_size: int = 2048
+    max_export_batch_size: int = 512
+    schedule_delay: float = 5.0
+    max_pending_traces: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "TracingSettings":
+        return cls(
+            sample_ratio=min(1.0, max(0.0, float(os.getenv("TRACE_SAMPLE_RATIO", "1.0")))),
+            tail_sampling=_env_flag("TRACE_TAIL_SAMPLING", "true"),
+            slow_threshold=float(os.getenv("TRACE_SLOW_THRESHOLD_MS", "10000")) / 1000,
+            max_queue_size=int(os.getenv("TRACE_MAX_QUEUE_SIZE", "2048")),
+            max_export_batch_size=int(os.getenv("TRACE_MAX_EXPORT_BATCH_SIZE", "512")),
+            schedule_delay=float(os.getenv("TRACE_SCHEDULE_DELAY_MS", "5000")) / 1000,
+        )
+
+
+class _RecordUnsampled(Sampler):
+    """Turn ``inner``'s DROP into RECORD_ONLY so the span can still be tail sampled."""
+
+    def __init__(self, inner: Sampler) -> None:
+        self._inner = inner
+
+    def should_sample(
+        self, parent_context: Optional[Context], trace_id: int, name: str, *args: Any, **kwargs: Any
+    ) -> SamplingResult:
+        result = self._inner.should_sample(parent_context, trace_id, name, *args, **kwargs)
+        if result.decision is Decision.DROP:
+            return SamplingResult(Decision.RECORD_ONLY, result.attributes, result.trace_state)
+        return result
+
+    def get_description(self) -> str:
+        return f"RecordUnsampled{{{self._inner.get_description()}}}"
+
+
+def create_sampler(ratio: float, *, tail_sampling: bool) -> Sampler:
+    """Parent-based ratio sampler; with ``tail_sampling`` unsampled local traces are recorded.
+
+    Spans whose remote parent was not sampled are always dropped: the caller decided.
+    """
+
+    if not tail_sampling:
+        return ParentBased(TraceIdRatioBased(ratio))
+    return ParentBased(
+        _RecordUnsampled(TraceIdRatioBased(ratio)),
+        local_parent_not_sampled=StaticSampler(Decision.RECORD_ONLY),
+        remote_parent_not_sampled=ALWAYS_OFF,
+    )
+
+
+class BoundedBatchSpanProcessor(SpanProcessor):
+    """Queue ended spans and export them in batches from a background thread.
+
+    ``on_end`` never blocks: when ``max_queue_size`` spans are waiting, the span is dropped
+    and counted in :attr:`dropped`. :meth:`stats` reports queue depth (current and peak),
+    exported and dropped spans, and export failures, so back-pressure is visible.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        *,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay: float = 5.0,
+    ) -> None:
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_export_batch_size = max_export_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped = 0
+        self.exported = 0
+        self.export_failures = 0
+        self.export_seconds = 0.0
+        self.max_queue_depth = 0
+        self._queue: deque[ReadableSpan] = deque()
+        self._condition = threading.Condition()
+        self._flush_requests: list[threading.Event] = []
+        self._shutdown = False
+        self._worker = threading.Thread(target=self._run, name="span-export", daemon=True)
+        self._worker.start()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        return
+
+    def on_end(self, span: ReadableSpan) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            if len(self._queue) >= self.max_queue_size:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+            depth = len(self._queue)
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            if depth >= self.max_export_batch_size:
+                self._condition.notify()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict[str, float]:
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "exported": self.exported,
+                "dropped": self.dropped,
+                "export_failures": self.export_failures,
+                "export_seconds": round(self.export_seconds, 3),
+            }
+
+    def _take_batch(self) -> list[ReadableSpan]:
+        count = min(len(self._queue), self.max_export_batch_size)
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _export(self, batch: list[ReadableSpan]) -> None:
+        started = time.perf_counter()
+        try:
+            result = self.exporter.export(batch)
+        except Exception as exc:  # noqa: BLE001 - an exporter must never kill the worker
+            _logger.warning("Span export failed: %s", exc)
+            result = SpanExportResult.FAILURE
+        with self._condition:
+            self.export_seconds += time.perf_counter() - started
+            if result is SpanExportResult.SUCCESS:
+                self.exported += len(batch)
+            else:
+                self.export_failures += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._queue) < self.max_export_batch_size and not self._flush_requests and not self._shutdown:
+                    self._condition.wait(self.schedule_delay)
+                flushes, self._flush_requests = self._flush_requests, []
+                shutting_down = self._shutdown
+                batch = self._take_batch()
+            while batch:
+                self._export(batch)
+                with self._condition:
+                    # Keep draining full batches; partial ones wait for the next tick unless flushing.
+                    full = len(self._queue) >= self.max_export_batch_size
+                    batch = self._take_batch() if full or flushes or shutting_down else []
+            for event in flushes:
+                event.set()
+            if shutting_down:
+                return
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        event = threading.Event()
+        with self._condition:
+            if self._shutdown:
+                return True
+            self._flush_requests.append(event)
+            self._condition.notify()
+        return event.wait(timeout_millis / 1000)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify()
+        self._worker.join()
+        self.exporter.shutdown()
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """Forward a trace to ``downstream`` when it was head sampled, failed, or was slow.
+
+    Spans are buffered per trace until the local root span ends; then the whole trace is
+    forwarded or discarded. At most ``max_pending_traces`` traces are buffered; beyond that
+    the oldest is discarded and counted in :attr:`evicted`.
+    """
+
+    def __init__(
+        self, downstream: SpanProcessor, *, slow_threshold: float = 10.0, max_pending_traces: int = 1024
+    ) -> None:
+        self.downstream = downstream
+        self.slow_threshold = slow_threshold
+        self.max_pending_traces = max_pending_traces
+        self.kept = {"head": 0, "error": 0, "slow": 0}
+        self.discarded = 0
+        self.evicted = 0
+        self._pending: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._decided: OrderedDict[int, bool] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        return
+
+    def _reason(self, root: ReadableSpan, spans: Sequence[ReadableSpan]) -> Optional[str]:
+        if root.context.trace_flags.sampled:
+            return "head"
+        if any(span.status.status_code is StatusCode.ERROR for span in spans):
+            return "error"
+        if (root.end_time - root.start_time) / 1e9 >= self.slow_threshold:
+            return "slow"
+        return None
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        is_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            decided = self._decided.get(trace_id)
+            if decided is not None:
+                # A straggler that ended after its root: follow the trace's decision.
+                forward = [span] if decided else []
+            else:
+                spans = self._pending.setdefault(trace_id, [])
+                spans.append(span)
+                forward = []
+                if is_root:
+                    del self._pending[trace_id]
+                    reason = self._reason(span, spans)
+                    self._decided[trace_id] = reason is not None
+                    if len(self._decided) > 4 * self.max_pending_traces:
+                        self._decided.popitem(last=False)
+                    if reason is None:
+                        self.discarded += 1
+                    else:
+                        self.kept[reason] += 1
+                        forward = spans
+                elif len(self._pending) > self.max_pending_traces:
+                    self._pending.popitem(last=False)
+                    self.evicted += 1
+        for item in forward:
+            self.downstream.on_end(item)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **{f"kept_{reason}": count for reason, count in self.kept.items()},
+                "discarded": self.discarded,
+                "evicted": self.evicted,
+                "pending_traces": len(self._pending),
+            }
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.downstream.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self.downstream.shutdown()
+
+
+def create_span_processor(exporter: SpanExporter, settings: TracingSettings) -> SpanProcessor:
+    """Wrap ``exporter`` in a bounded batch processor, behind tail sampling when it applies."""
+
+    batch = BoundedBatchSpanProcessor(
+        exporter,
+        max_queue_size=settings.max_queue_size,
+        max_export_batch_size=settings.max_export_batch_size,
+        schedule_delay=settings.schedule_delay,
+    )
+    if not settings.tail_sampling or settings.sample_ratio >= 1.0:
+        return batch
+    return TailSamplingProcessor(
+        batch, slow_threshold=settings.slow_threshold, max_pending_traces=settings.max_pending_traces
+    )
+
+
+def pipeline_stats(processor: SpanProcessor) -> dict[str, Any]:
+    """Back-pressure and sampling counters of a processor built by :func:`create_span_processor`."""
+
+    if isinstance(processor, TailSamplingProcessor):
+        return {**processor.stats(), **pipeline_stats(processor.downstream)}
+    if isinstance(processor, BoundedBatchSpanProcessor):
+        return processor.stats()
+    return {}
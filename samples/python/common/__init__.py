@@ -1,6 +1,120 @@
-"""Shared utilities for Azure AI Agent workshop Python samples."""
+"""Shared utilities for Azure AI Agent workshop Python samples.
 
-from .config import WorkshopConfig, load_config
-from .logging import configure_logging
-from .logic_app import LogicAppToolConfig, create_logic_app_function_tool
-from .threads import pretty_print_messages
+Names are imported from their submodule on first access (module ``__getattr__``), so a
+sample only pays for the helpers it uses: importing ``load_config`` does not load
+``requests``, the Agents models or OpenTelemetry.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+_EXPORTS = {
+    "AgentRegistry": "agents",
+    "AsyncCredentialAdapter": "clients",
+    "get_credential": "clients",
+    "get_project_client": "clients",
+    "open_async_project_client": "clients",
+    "open_project_client": "clients",
+    "shared_project_client": "clients",
+    "warm_up": "clients",
+    "WorkshopConfig": "config",
+    "load_config": "config",
+    "remaining_budget": "deadline",
+    "run_deadline": "deadline",
+    "configure_logging": "logging",
+    "AsyncLogicAppClient": "logic_app",
+    "LogicAppBatcher": "logic_app",
+    "LogicAppClient": "logic_app",
+    "LogicAppOperation": "logic_app",
+    "LogicAppStatusTracker": "logic_app",
+    "LogicAppToolConfig": "logic_app",
+    "create_async_logic_app_function_tool": "logic_app",
+    "create_logic_app_function_tool": "logic_app",
+    "get_logic_app_batcher": "logic_app",
+    "get_logic_app_client": "logic_app",
+    "get_logic_app_tracker": "logic_app",
+    "AgentMetrics": "metrics",
+    "configure_metrics": "metrics",
+    "get_metrics": "metrics",
+    "configure_profiling": "profiling",
+    "AsyncRunStream": "runs",
+    "PollPolicy": "runs",
+    "RunEvent": "runs",
+    "RunMetrics": "runs",
+    "RunPollScheduler": "runs",
+    "RunStream": "runs",
+    "async_wait_for_run": "runs",
+    "echo_run": "runs",
+    "wait_for_run": "runs",
+    "ToolDispatcher": "tools",
+    "ToolLimits": "tools",
+    "AgentThreadPool": "threads",
+    "MessageReader": "threads",
+    "discard_thread": "threads",
+    "pretty_print_messages": "threads",
+    "TokenPricing": "usage",
+    "TokenUsage": "usage",
+    "UsageAccountant": "usage",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
+
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .agents import AgentRegistry
+    from .clients import (
+        AsyncCredentialAdapter,
+        get_credential,
+        get_project_client,
+        open_async_project_client,
+        open_project_client,
+        shared_project_client,
+        warm_up,
+    )
+    from .config import WorkshopConfig, load_config
+    from .deadline import remaining_budget, run_deadline
+    from .logging import configure_logging
+    from .logic_app import (
+        AsyncLogicAppClient,
+        LogicAppBatcher,
+        LogicAppClient,
+        LogicAppOperation,
+        LogicAppStatusTracker,
+        LogicAppToolConfig,
+        create_async_logic_app_function_tool,
+        create_logic_app_function_tool,
+        get_logic_app_batcher,
+        get_logic_app_client,
+        get_logic_app_tracker,
+    )
+    from .metrics import AgentMetrics, configure_metrics, get_metrics
+    from .profiling import configure_profiling
+    from .runs import (
+        AsyncRunStream,
+        PollPolicy,
+        RunEvent,
+        RunMetrics,
+        RunPollScheduler,
+        RunStream,
+        async_wait_for_run,
+        echo_run,
+        wait_for_run,
+    )
+    from .tools import ToolDispatcher, ToolLimits
+    from .threads import AgentThreadPool, MessageReader, discard_thread, pretty_print_messages
+    from .usage import TokenPricing, TokenUsage, UsageAccountant
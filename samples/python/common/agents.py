@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from .metrics import AGENT_CREATE, AGENT_NAME, MODEL, get_metrics
+
+_logger = logging.getLogger(__name__)
+
+HASH_METADATA_KEY = "workshop_definition_hash"
+_DEFAULT_INDEX_PATH = Path.home() / ".cache" / "azure-ai-agent-workshop" / "agents.json"
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def definition_key(
+    model: str,
+    name: str,
+    instructions: Optional[str],
+    tools: Optional[list[Any]] = None,
+    tool_resources: Optional[Any] = None,
+) -> str:
+    """Return a stable hash of everything that defines an agent's behaviour."""
+
+    payload = {
+        "model": model,
+        "name": name,
+        "instructions": instructions or "",
+        # FunctionTool builds definitions from a set, so their order is not stable.
+        "tools": sorted(_jsonable(tools or []), key=lambda tool: json.dumps(tool, sort_keys=True, default=str)),
+        "tool_resources": _jsonable(tool_resources),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def reuse_agents_enabled() -> bool:
+    flag = os.getenv("WORKSHOP_REUSE_AGENTS", "true").lower()
+    return flag in {"1", "true", "yes", "on"}
+
+
+@dataclass(slots=True)
+class AgentRecord:
+    agent_id: str
+    name: str
+    created_at: float
+    last_used_at: float
+
+
+class AgentRegistry:
+    """Reuse agents across runs instead of creating and deleting one per invocation.
+
+    Agents are keyed by :func:`definition_key`. :meth:`acquire` returns the ID of a matching
+    agent from the local index file, or from the project's agent list (matched through the
+    ``workshop_definition_hash`` metadata entry), and only creates an agent on a miss. IDs
+    from the index are checked with ``get_agent`` once per registry; agents deleted outside
+    it (e.g. in the portal) are forgotten and recreated instead of failing every run.
+    :meth:`release` marks the agent as used and runs :meth:`collect_garbage`, which deletes
+    agents that were idle for longer than ``ttl`` seconds or exceed ``max_agents`` (least
+    recently used first).
+
+    When reuse is disabled (``WORKSHOP_REUSE_AGENTS=false`` or ``enabled=False``), acquire
+    always creates a new agent and release deletes it, matching the one-shot behaviour.
+
+    Parameters
+    ----------
+    agents_client:
+        ``project_client.agents``.
+    endpoint:
+        Project endpoint; the index is namespaced by it so projects never share agent IDs.
+    index_path:
+        JSON index file. Defaults to ``WORKSHOP_AGENT_REGISTRY`` or
+        ``~/.cache/azure-ai-agent-workshop/agents.json``.
+    """
+
+    def __init__(
+        self,
+        agents_client: Any,
+        endpoint: str,
+        *,
+        index_path: Optional[Path] = None,
+        ttl: float = 7 * 24 * 3600,
+        max_agents: int = 32,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self._client = agents_client
+        self._endpoint = endpoint
+        self._path = index_path or Path(os.getenv("WORKSHOP_AGENT_REGISTRY", _DEFAULT_INDEX_PATH))
+        self.ttl = ttl
+        self.max_agents = max_agents
+        self.enabled = reuse_agents_enabled() if enabled is None else enabled
+        self._lock = threading.RLock()
+        self._records: dict[str, AgentRecord] = self._load() if self.enabled else {}
+        self._remote: Optional[dict[str, Any]] = None
+        self._verified: set[str] = set()
+
+    def acquire(
+        self,
+        *,
+        model: str,
+        name: str,
+        instructions: Optional[str] = None,
+        tools: Optional[list[Any]] = None,
+        tool_resources: Optional[Any] = None,
+        **create_kwargs: Any,
+    ) -> str:
+        """Return the ID of an agent matching the definition, creating one only on a miss."""
+
+        if not self.enabled:
+            return self._create(model, name, instructions, tools, tool_resources, None, create_kwargs)
+
+        key = definition_key(model, name, instructions, tools, tool_resources)
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None and not self._expired(record) and self._exists(record.agent_id):
+                _logger.info("Reusing cached agent (キャッシュ済みエージェントを再利用します): %s", record.agent_id)
+                record.last_used_at = time.time()
+                self._save()
+                get_metrics().describe_agent(record.agent_id, name, model)
+                return record.agent_id
+
+            agent = self._find_remote(key)
+            if agent is not None:
+                _logger.info("Reusing existing agent (既存エージェントを再利用します): %s", agent.id)
+                agent_id = agent.id
+            else:
+                agent_id = self._create(model, name, instructions, tools, tool_resources, key, create_kwargs)
+
+            self._verified.add(agent_id)
+            now = time.time()
+            self._records[key] = AgentRecord(agent_id=agent_id, name=name, created_at=now, last_used_at=now)
+            self._save()
+            get_metrics().describe_agent(agent_id, name, model)
+            return agent_id
+
+    def release(self, agent_id: str) -> None:
+        """Return an agent after use: delete it when reuse is off, otherwise run GC."""
+
+        if not self.enabled:
+            _logger.info("Deleting agent (エージェントを削除します): %s", agent_id)
+            self._delete(agent_id)
+            return
+        with self._lock:
+            for record in self._records.values():
+                if record.agent_id == agent_id:
+                    record.last_used_at = time.time()
+            self._save()
+        self.collect_garbage()
+
+    def forget(self, agent_id: str) -> None:
+        """Drop an agent from the index, e.g. after it was deleted outside the registry."""
+
+        with self._lock:
+            self._records = {key: record for key, record in self._records.items() if record.agent_id != agent_id}
+            self._verified.discard(agent_id)
+            if self._remote is not None:
+                self._remote = {key: agent for key, agent in self._remote.items() if agent.id != agent_id}
+            self._save()
+
+    def collect_garbage(self, now: Optional[float] = None) -> list[str]:
+        """Delete idle agents past ``ttl`` and the least recently used beyond ``max_agents``."""
+
+        now = time.time() if now is None else now
+        with self._lock:
+            by_recency = sorted(self._records.items(), key=lambda item: item[1].last_used_at, reverse=True)
+            stale = [
+                (key, record)
+                for position, (key, record) in enumerate(by_recency)
+                if position >= self.max_agents or self._expired(record, now)
+            ]
+            for key, record in stale:
+                _logger.info("Deleting stale agent (古いエージェントを削除します): %s", record.agent_id)
+                self._delete(record.agent_id)
+                del self._records[key]
+            if stale:
+                self._save()
+        return [record.agent_id for _, record in stale]
+
+    def _exists(self, agent_id: str) -> bool:
+        # The index can outlive its agents (deleted in the portal or by another registry), so
+        # check each cached ID once per registry before handing it out.
+        if agent_id in self._verified:
+            return True
+        try:
+            self._client.get_agent(agent_id)
+        except ResourceNotFoundError:
+            _logger.warning("Cached agent no longer exists (キャッシュ済みエージェントが存在しません): %s", agent_id)
+            self.forget(agent_id)
+            return False
+        self._verified.add(agent_id)
+        return True
+
+    def _expired(self, record: AgentRecord, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) - record.last_used_at > self.ttl
+
+    def _create(
+        self,
+        model: str,
+        name: str,
+        instructions: Optional[str],
+        tools: Optional[list[Any]],
+        tool_resources: Optional[Any],
+        key: Optional[str],
+        create_kwargs: dict[str, Any],
+    ) -> str:
+        metadata = dict(create_kwargs.pop("metadata", None) or {})
+        if key:
+            metadata[HASH_METADATA_KEY] = key
+        _logger.info("Creating agent (エージェントを作成します) [name=%s, model=%s]", name, model)
+        with get_metrics().time(AGENT_CREATE, **{AGENT_NAME: name, MODEL: model}):
+            agent = self._client.create_agent(
+                model=model,
+                name=name,
+                instructions=instructions,
+                tools=tools,
+                tool_resources=tool_resources,
+                metadata=metadata or None,
+                **create_kwargs,
+            )
+        get_metrics().describe_agent(agent.id, name, model)
+        return agent.id
+
+    def _find_remote(self, key: str) -> Optional[Any]:
+        if self._remote is None:
+            self._remote = {}
+            for agent in self._client.list_agents():
+                remote_key = (getattr(agent, "metadata", None) or {}).get(HASH_METADATA_KEY)
+                if remote_key:
+                    self._remote[remote_key] = agent
+        return self._remote.get(key)
+
+    def _delete(self, agent_id: str) -> None:
+        try:
+            self._client.delete_agent(agent_id)
+        except ResourceNotFoundError:
+            pass
+
+    def _load(self) -> dict[str, AgentRecord]:
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            _logger.warning("Ignoring unreadable agent index %s: %s", self._path, exc)
+            return {}
+        return {key: AgentRecord(**record) for key, record in data.get(self._endpoint, {}).items()}
+
+    def _save(self) -> None:
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        data[self._endpoint] = {key: asdict(record) for key, record in self._records.items()}
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self._path)
@@ -0,0 +1,466 @@
+"""Process-wide credential and ``AIProjectClient`` instances.
+
+The first request of a fresh process pays for the credential chain probing (including the
+managed identity endpoint timeout on machines without one), the token request, DNS and the
+TLS handshake. :func:`get_credential` and :func:`get_project_client` pay those costs once per
+process and share the results between samples, orchestrators and worker threads:
+
+* one :class:`CachingCredential` (wrapping ``DefaultAzureCredential``) whose tokens are kept
+  in memory and, when ``WORKSHOP_TOKEN_CACHE`` opts in, in a user-only file so the next
+  process skips the chain entirely while the token is valid. A background thread refreshes
+  tokens ``refresh_margin`` seconds before they expire, so requests never wait for a refresh;
+* one client per endpoint on a pooled transport (``WORKSHOP_HTTP_POOL_SIZE``);
+* with ``WORKSHOP_WARM_UP=true`` (or :func:`warm_up`), a token and ``connections`` pooled
+  connections are acquired in the background as soon as the client is created.
+
+Azure SDK clients are safe to use from several threads at once, so sharing is safe.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from azure.core.credentials import AccessToken
+
+from .profiling import configure_profiling
+
+_logger = logging.getLogger(__name__)
+
+_DEFAULT_TOKEN_CACHE = Path.home() / ".cache" / "azure-ai-agent-workshop" / "tokens.json"
+
+
+# Settings that decide which identity (and authority) DefaultAzureCredential signs in with.
+_IDENTITY_ENV = (
+    "AZURE_AUTHORITY_HOST",
+    "AZURE_TENANT_ID",
+    "AZURE_CLIENT_ID",
+    "AZURE_CLIENT_CERTIFICATE_PATH",
+    "AZURE_FEDERATED_TOKEN_FILE",
+    "AZURE_USERNAME",
+    "IDENTITY_ENDPOINT",
+    "MSI_ENDPOINT",
+)
+
+
+def token_cache_path_from_env() -> Optional[Path]:
+    """Token cache file from ``WORKSHOP_TOKEN_CACHE``; off unless set.
+
+    The file holds bearer tokens in plain text (mode 0600), so it is opt-in: ``on`` uses
+    ``~/.cache/azure-ai-agent-workshop/tokens.json``, any other value is taken as the path.
+    """
+
+    value = os.getenv("WORKSHOP_TOKEN_CACHE", "off")
+    if value.lower() in {"", "0", "false", "no", "off"}:
+        return None
+    if value.lower() in {"1", "true", "yes", "on"}:
+        return _DEFAULT_TOKEN_CACHE
+    return Path(value)
+
+
+def identity_fingerprint() -> str:
+    """Hash of the settings that select the signed-in identity and authority.
+
+    Covers the ``AZURE_*`` environment used by ``DefaultAzureCredential`` and the Azure CLI
+    profile (``az login`` / ``az account set``), so a cached token is never handed to a
+    process that would sign in as someone else.
+    """
+
+    parts = [f"{name}={os.getenv(name, '')}" for name in _IDENTITY_ENV]
+    profile = Path(os.getenv("AZURE_CONFIG_DIR", Path.home() / ".azure")) / "azureProfile.json"
+    try:
+        parts.append(hashlib.sha256(profile.read_bytes()).hexdigest())
+    except OSError:
+        parts.append("")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def pool_size_from_env() -> int:
+    """``WORKSHOP_HTTP_POOL_SIZE``, the HTTP connection pool size of shared clients (default 16)."""
+
+    return int(os.getenv("WORKSHOP_HTTP_POOL_SIZE", "16"))
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in {"1", "true", "yes", "on"}
+
+
+class CachingCredential:
+    """Token credential that caches tokens per scope and refreshes them ahead of expiry.
+
+    Parameters
+    ----------
+    credential:
+        The credential that actually acquires tokens, usually ``DefaultAzureCredential``.
+    cache_path:
+        JSON file (created with mode 0600) used to reuse tokens across processes. ``None``
+        keeps tokens in memory only.
+    identity:
+        Identifies who ``credential`` signs in as (see :func:`identity_fingerprint`). It is part
+        of every cache key, so tokens cached for another identity or authority are never used.
+    refresh_margin:
+        Refresh a token in the background once it expires within this many seconds. Must be
+        larger than the five-minute window in which azure-core asks for a new token. Tokens
+        issued with less lifetime than that are refreshed at most once a minute, from five
+        minutes before expiry, and never again when the upstream credential returns the same
+        token.
+    """
+
+    def __init__(
+        self,
+        credential: Any,
+        cache_path: Optional[Path] = None,
+        *,
+        identity: str = "",
+        refresh_margin: float = 600.0,
+    ) -> None:
+        self._credential = credential
+        self.cache_path = cache_path
+        self.identity = identity
+        self.refresh_margin = refresh_margin
+        self.fetches = 0
+        self._tokens: dict[str, AccessToken] = self._load()
+        self._not_before: dict[str, float] = {}
+        self._requests: dict[str, tuple[tuple[str, ...], dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._refresher: Optional[threading.Thread] = None
+
+    def _key(self, scopes: tuple[str, ...], kwargs: dict[str, Any]) -> str:
+        tenant = kwargs.get("tenant_id") or ""
+        return hashlib.sha256(json.dumps([sorted(scopes), tenant, self.identity]).encode("utf-8")).hexdigest()
+
+    def cached_token(self, *scopes: str, claims: Optional[str] = None, **kwargs: Any) -> Optional[AccessToken]:
+        """The cached token for ``scopes`` if it is valid for another 30 seconds; never blocks on I/O."""
+
+        if claims:
+            # A claims challenge needs a fresh token; never answer it from the cache.
+            return None
+        key = self._key(scopes, kwargs)
+        token = self._tokens.get(key)
+        if token is None or token.expires_on - time.time() <= 30:
+            return None
+        if key not in self._requests:
+            # Loaded from the cache file: have the refresher keep it fresh from now on.
+            with self._lock:
+                self._requests[key] = (scopes, kwargs)
+                self._start_refresher()
+                self._wake.notify()
+        return token
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, **kwargs: Any) -> AccessToken:
+        if claims:
+            return self._credential.get_token(*scopes, claims=claims, **kwargs)
+        token = self.cached_token(*scopes, **kwargs)
+        if token is not None:
+            return token
+        key = self._key(scopes, kwargs)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - time.time() <= 30:
+                token = self._fetch(key, scopes, kwargs)
+        return token
+
+    def _fetch(self, key: str, scopes: tuple[str, ...], kwargs: dict[str, Any]) -> AccessToken:
+        previous = self._tokens.get(key)
+        token = self._credential.get_token(*scopes, **kwargs)
+        with self._lock:
+            self.fetches += 1
+            self._tokens[key] = token
+            self._not_before[key] = self._next_refresh(previous, token)
+            self._requests[key] = (scopes, kwargs)
+            self._save()
+            self._start_refresher()
+            self._wake.notify()
+        return token
+
+    def _start_refresher(self) -> None:
+        if self._refresher is None and not self._closed:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+            self._refresher.start()
+
+    def _next_refresh(self, previous: Optional[AccessToken], token: AccessToken) -> float:
+        # Earliest time the refresher may replace ``token``. Without this, a token issued with
+        # less lifetime than ``refresh_margin`` is due again the moment it arrives.
+        now = time.time()
+        if previous is not None and token.expires_on <= previous.expires_on:
+            # The upstream credential handed back its cached token: leave it to get_token,
+            # which renews it 30 seconds before expiry.
+            return math.inf
+        if token.expires_on - now > self.refresh_margin:
+            return 0.0
+        return max(now + 60.0, token.expires_on - 300.0)
+
+    def _due_at(self, key: str) -> float:
+        return max(self._tokens[key].expires_on - self.refresh_margin, self._not_before.get(key, 0.0))
+
+    def _refresh_loop(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.time()
+                due = [key for key in self._requests if self._due_at(key) <= now]
+                if not due:
+                    next_due = min((self._due_at(key) for key in self._requests), default=now + 3600)
+                    self._wake.wait(min(max(1.0, next_due - now), 3600.0))
+                    continue
+            for key in due:
+                scopes, kwargs = self._requests[key]
+                try:
+                    self._fetch(key, scopes, kwargs)
+                    _logger.debug("Refreshed token for %s", scopes)
+                except Exception as exc:  # noqa: BLE001 - the next request retries synchronously
+                    _logger.warning("Background token refresh failed (トークンの更新に失敗しました): %s", exc)
+                    with self._lock:
+                        self._wake.wait(30.0)
+
+    def _load(self) -> dict[str, AccessToken]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        now = time.time()
+        return {
+            key: AccessToken(item["token"], int(item["expires_on"]))
+            for key, item in data.items()
+            if item.get("expires_on", 0) > now + 60
+        }
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        payload = {key: {"token": token.token, "expires_on": token.expires_on} for key, token in self._tokens.items()}
+        # Bearer tokens are secrets: the file is readable by the current user only.
+        descriptor = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+        os.replace(tmp_path, self.cache_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+        close = getattr(self._credential, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "CachingCredential":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None  # Shared: closed at interpreter exit, not by individual users.
+
+
+class AsyncCredentialAdapter:
+    """``azure.core`` async credential that answers from a sync :class:`CachingCredential`.
+
+    Lets async clients share the process-wide token (and its cache file) with sync clients.
+    Cache hits are answered on the event loop without a thread hop; a miss runs the
+    credential chain on a worker thread so the event loop is never blocked.
+    """
+
+    def __init__(self, credential: CachingCredential) -> None:
+        self._credential = credential
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        import asyncio
+
+        token = self._credential.cached_token(*scopes, **kwargs)
+        if token is not None:
+            return token
+        return await asyncio.to_thread(self._credential.get_token, *scopes, **kwargs)
+
+    async def close(self) -> None:
+        return None  # The wrapped credential is shared and closed at interpreter exit.
+
+    async def __aenter__(self) -> "AsyncCredentialAdapter":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+
+def create_pooled_transport(pool_size: int, **kwargs: Any) -> Any:
+    """Create an HTTP transport whose connection pool is large enough for ``pool_size`` workers.
+
+    ``kwargs`` go to ``RequestsTransport`` (for example ``connection_verify``).
+    """
+
+    import requests
+    from azure.core.pipeline.transport import RequestsTransport
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return RequestsTransport(session=session, session_owner=True, **kwargs)
+
+
+def create_async_pooled_transport(pool_size: int, **kwargs: Any) -> Any:
+    """``aiohttp`` counterpart of :func:`create_pooled_transport` for ``azure.ai.projects.aio``.
+
+    Must be called with a running event loop; ``kwargs`` go to ``AioHttpTransport``.
+    """
+
+    import aiohttp
+    from azure.core.pipeline.transport import AioHttpTransport
+
+    connector = aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=30)
+    session = aiohttp.ClientSession(connector=connector)
+    return AioHttpTransport(session=session, session_owner=True, **kwargs)
+
+
+def open_async_project_client(
+    endpoint: str, credential: Any = None, *, pool_size: Optional[int] = None, **kwargs: Any
+) -> Any:
+    """Create an async ``AIProjectClient`` on a pooled ``aiohttp`` transport.
+
+    ``credential`` defaults to the process-wide credential behind an
+    :class:`AsyncCredentialAdapter` and ``pool_size`` to :func:`pool_size_from_env`. With
+    profiling on, its HTTP calls are recorded. The caller owns the client and closes it.
+    """
+
+    from azure.ai.projects.aio import AIProjectClient
+
+    if credential is None:
+        credential = AsyncCredentialAdapter(get_credential())
+    kwargs.setdefault("transport", create_async_pooled_transport(pool_size or pool_size_from_env()))
+    profiler = configure_profiling()
+    if profiler is not None:
+        kwargs["per_retry_policies"] = [*kwargs.get("per_retry_policies", []), profiler.async_policy()]
+    return AIProjectClient(endpoint=endpoint, credential=credential, **kwargs)
+
+
+def open_project_client(endpoint: str, credential: Any, **kwargs: Any) -> Any:
+    """Create a new ``AIProjectClient``; with profiling on, its agent calls are recorded."""
+
+    from azure.ai.projects import AIProjectClient
+
+    profiler = configure_profiling()
+    if profiler is None:
+        return AIProjectClient(endpoint=endpoint, credential=credential, **kwargs)
+    kwargs["per_retry_policies"] = [*kwargs.get("per_retry_policies", []), profiler.policy()]
+    client = AIProjectClient(endpoint=endpoint, credential=profiler.wrap_credential(credential), **kwargs)
+    profiler.instrument(client.agents)
+    return client
+
+
+_lock = threading.Lock()
+_credential: Optional[CachingCredential] = None
+_clients: dict[str, Any] = {}
+
+
+def get_credential() -> CachingCredential:
+    """The process-wide credential."""
+
+    global _credential
+    with _lock:
+        if _credential is None:
+            from azure.identity import DefaultAzureCredential
+
+            _credential = CachingCredential(
+                DefaultAzureCredential(exclude_interactive_browser_credential=False),
+                token_cache_path_from_env(),
+                identity=identity_fingerprint(),
+            )
+        return _credential
+
+
+def get_project_client(endpoint: str, *, pool_size: Optional[int] = None, **kwargs: Any) -> Any:
+    """The shared ``AIProjectClient`` for ``endpoint``, created on first use.
+
+    ``pool_size`` and ``kwargs`` only apply to the call that creates the client. Do not close
+    the returned client (or use it in a ``with`` block); use :func:`shared_project_client`.
+    """
+
+    with _lock:
+        client = _clients.get(endpoint)
+    if client is not None:
+        return client
+    credential = get_credential()
+    with _lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            pool_size = pool_size or pool_size_from_env()
+            kwargs.setdefault("transport", create_pooled_transport(pool_size))
+            client = _clients[endpoint] = open_project_client(endpoint, credential, **kwargs)
+            if _env_flag("WORKSHOP_WARM_UP"):
+                warm_up(client, credential, connections=min(pool_size, 4), background=True)
+    return client
+
+
+@contextmanager
+def shared_project_client(endpoint: str, **kwargs: Any) -> Iterator[Any]:
+    """``with``-friendly :func:`get_project_client` that leaves the shared client open."""
+
+    yield get_project_client(endpoint, **kwargs)
+
+
+def warm_up(
+    client: Any, credential: Any = None, *, connections: int = 2, background: bool = False
+) -> Optional[threading.Thread]:
+    """Acquire a token and open ``connections`` pooled connections with cheap list calls.
+
+    With ``background`` the work runs on a daemon thread (returned) so start-up continues;
+    requests issued meanwhile simply wait on the same token and connection pool.
+    """
+
+    def run() -> None:
+        started = time.perf_counter()
+        try:
+            if credential is not None:
+                credential.get_token("https://ai.azure.com/.default")
+            with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="warm-up") as executor:
+                list(executor.map(lambda _: next(iter(client.agents.list_agents(limit=1)), None), range(connections)))
+        except Exception as exc:  # noqa: BLE001 - warm-up is best effort
+            _logger.warning("Client warm-up failed (ウォームアップに失敗しました): %s", exc)
+            return
+        _logger.info(
+            "Client warmed up in %.2fs (クライアントのウォームアップ完了) [connections=%d]",
+            time.perf_counter() - started,
+            connections,
+        )
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="client-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def close_clients() -> None:
+    """Close every shared client and the shared credential."""
+
+    global _credential
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        credential, _credential = _credential, None
+    for client in clients:
+        client.close()
+    if credential is not None:
+        credential.close()
+
+
+atexit.register(close_clients)
@@ -0,0 +1,253 @@
+"""Cold-start benchmark for credential and client creation.
+
+Runs the same requests against a local HTTPS stand-in for the Agent Service and a local
+managed identity token endpoint (the App Service ``IDENTITY_ENDPOINT`` protocol), both with
+configurable latency, and compares:
+
+* ``per-call`` – a new ``DefaultAzureCredential`` and ``AIProjectClient`` per request, which
+  is what every sample did before :mod:`.clients`;
+* ``shared`` – one :class:`~.clients.CachingCredential` and pooled client for the process;
+* ``shared+cache`` – the same in a "second process" that finds the token in the cache file;
+* ``shared+warm-up`` – :func:`~.clients.warm_up` runs in the background while the process
+  does ``--startup`` seconds of other start-up work before its first request.
+
+::
+
+    python -m samples.python.common.cold_start --requests 20 --token-latency 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from .clients import CachingCredential, create_pooled_transport, open_project_client, warm_up
+
+_EMPTY_LIST = {"object": "list", "data": [], "first_id": None, "last_id": None, "has_more": False}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StandIn"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        threading.Event().wait(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+        body: dict[str, Any] = _EMPTY_LIST
+        if self.server.is_token_endpoint:
+            body = {
+                "access_token": f"stand-in-token-{time.time_ns()}",
+                "expires_on": str(int(time.time()) + 3600),
+                "resource": "https://ai.azure.com",
+                "token_type": "Bearer",
+            }
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server signature
+        return
+
+
+class _StandIn(ThreadingHTTPServer):
+    """HTTP(S) server that answers every GET after ``latency`` seconds.
+
+    With an ``ssl_context`` each new connection first waits ``handshake`` seconds, standing
+    in for the DNS lookup and TCP/TLS round trips of a real endpoint.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, latency: float, *, handshake: float = 0.0, ssl_context: Optional[ssl.SSLContext] = None
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.handshake = handshake
+        self.ssl_context = ssl_context
+        self.is_token_endpoint = ssl_context is None
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def finish_request(self, request: Any, client_address: Any) -> None:
+        with self.lock:
+            self.connections += 1
+        if self.ssl_context is not None:
+            threading.Event().wait(self.handshake)
+            request = self.ssl_context.wrap_socket(request, server_side=True)
+        super().finish_request(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        scheme = "http" if self.ssl_context is None else "https"
+        return f"{scheme}://{host}:{port}"
+
+    def start(self) -> "_StandIn":
+        threading.Thread(target=self.serve_forever, name="cold-start-stand-in", daemon=True).start()
+        return self
+
+
+def self_signed_certificate(
+    directory: Path, valid_for: datetime.timedelta = datetime.timedelta(hours=1)
+) -> tuple[Path, Path]:
+    """Write a self-signed certificate and key for ``127.0.0.1`` to ``directory``."""
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + valid_for)
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "stand-in.pem", directory / "stand-in.key"
+    cert_path.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    )
+    return cert_path, key_path
+
+
+@contextmanager
+def managed_identity_env(token_url: str) -> Iterator[None]:
+    """Point ``ManagedIdentityCredential`` (and so ``DefaultAzureCredential``) at ``token_url``."""
+
+    names = ("IDENTITY_ENDPOINT", "IDENTITY_HEADER", "AZURE_CLIENT_ID", "AZURE_CLIENT_SECRET", "AZURE_TENANT_ID")
+    saved = {name: os.environ.pop(name, None) for name in names}
+    os.environ["IDENTITY_ENDPOINT"] = f"{token_url}/msi/token"
+    os.environ["IDENTITY_HEADER"] = "stand-in"
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+
+
+@dataclass(slots=True)
+class ScenarioResult:
+    name: str
+    first_request: float
+    total: float
+    token_requests: int
+    connections: int
+
+
+def _first_and_total(requests: int, call: Callable[[], None], before_first: Callable[[], None]) -> tuple[float, float]:
+    started = time.perf_counter()
+    before_first()
+    first_started = time.perf_counter()
+    call()
+    first = time.perf_counter() - first_started
+    for _ in range(requests - 1):
+        call()
+    return first, time.perf_counter() - started
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20, help="Requests per scenario")
+    parser.add_argument("--token-latency", type=float, default=0.3, help="Seconds per token request")
+    parser.add_argument("--handshake", type=float, default=0.05, help="Seconds per new HTTPS connection")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per service request")
+    parser.add_argument("--startup", type=float, default=0.5, help="Other start-up work before the first request")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        cert_path, key_path = self_signed_certificate(directory)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+        service = _StandIn(args.latency, handshake=args.handshake, ssl_context=context).start()
+        tokens = _StandIn(args.token_latency).start()
+        endpoint = f"{service.url}/api/projects/cold-start"
+        cache_path = directory / "tokens.json"
+
+        def open_client(credential: Any) -> Any:
+            transport = create_pooled_transport(4, connection_verify=str(cert_path))
+            return open_project_client(endpoint, credential, transport=transport)
+
+        def list_once(client: Any) -> None:
+            next(iter(client.agents.list_agents(limit=1)), None)
+
+        def per_call() -> None:
+            from azure.identity import DefaultAzureCredential
+
+            with DefaultAzureCredential() as credential, open_client(credential) as client:
+                list_once(client)
+
+        def shared(name: str, cache: Optional[Path], warm: bool) -> ScenarioResult:
+            tokens.requests = service.connections = 0
+            credential = CachingCredential(ManagedIdentityCredential(), cache)
+            client = open_client(credential)
+
+            def start_up() -> None:
+                if warm:
+                    warm_up(client, credential, connections=1, background=True)
+                time.sleep(args.startup)
+
+            first, total = _first_and_total(args.requests, lambda: list_once(client), start_up)
+            client.close()
+            credential.close()
+            return ScenarioResult(name, first, total - args.startup, tokens.requests, service.connections)
+
+        with managed_identity_env(tokens.url):
+            from azure.identity import ManagedIdentityCredential
+
+            results = []
+            first, total = _first_and_total(args.requests, per_call, lambda: time.sleep(args.startup))
+            results.append(ScenarioResult("per-call", first, total - args.startup, tokens.requests, service.connections))
+            results.append(shared("shared", None, warm=False))
+            shared("(populate cache)", cache_path, warm=False)
+            results.append(shared("shared+cache", cache_path, warm=False))
+            results.append(shared("shared+warm-up", None, warm=True))
+
+        service.shutdown()
+        tokens.shutdown()
+
+    print(f"{args.requests} requests per scenario; token {args.token_latency:g}s, handshake {args.handshake:g}s, "
+          f"request {args.latency:g}s")
+    print(f"{'scenario':<16}{'first (ms)':>12}{'total (s)':>11}{'tokens':>8}{'connections':>13}")
+    for result in results:
+        print(
+            f"{result.name:<16}{result.first_request * 1000:>12.1f}{result.total:>11.3f}"
+            f"{result.token_requests:>8}{result.connections:>13}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
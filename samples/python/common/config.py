@@ -4,17 +4,11 @@ import os
 from dataclasses import dataclass
 from typing import Optional
 
-# Load .env file if it exists
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass  # dotenv is optional
-
 _ENV_KEYS = {
     "project_endpoint": "PROJECT_ENDPOINT",
     "model_deployment_name": "MODEL_DEPLOYMENT_NAME",
     "openai_connection_id": "AZURE_OPENAI_CONNECTION_ID",
+    "embedding_deployment_name": "EMBEDDING_DEPLOYMENT_NAME",
     "ai_search_connection_id": "AI_SEARCH_CONNECTION_ID",
     "ai_search_index_name": "AI_SEARCH_INDEX_NAME",
     "logic_app_callback_url": "LOGIC_APP_CALLBACK_URL",
@@ -34,6 +28,7 @@ class WorkshopConfig:
     project_endpoint: str
     model_deployment_name: str
     openai_connection_id: Optional[str] = None
+    embedding_deployment_name: Optional[str] = None
     ai_search_connection_id: Optional[str] = None
     ai_search_index_name: Optional[str] = None
     logic_app_callback_url: Optional[str] = None
@@ -53,6 +48,23 @@ class WorkshopConfig:
         return bool(self.logic_app_callback_url)
 
 
+_env_file_loaded = False
+
+
+def load_env_file() -> None:
+    """Load a ``.env`` file into the environment once per process (python-dotenv is optional)."""
+
+    global _env_file_loaded
+    if _env_file_loaded:
+        return
+    _env_file_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return  # dotenv is optional
+    load_dotenv()
+
+
 def _get_env_or_fail(name: str) -> str:
     value = os.getenv(name)
     if not value:
@@ -72,6 +84,7 @@ def load_config(optional: bool = True) -> WorkshopConfig:
         all known environment variables must exist.
     """
 
+    load_env_file()
     required = {
         "project_endpoint": _get_env_or_fail(_ENV_KEYS["project_endpoint"]),
         "model_deployment_name": _get_env_or_fail(_ENV_KEYS["model_deployment_name"]),
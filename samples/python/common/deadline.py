@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_RUN_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("run_deadline", default=None)
+
+
+@contextmanager
+def run_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Set the time budget for the current run; tools read it via :func:`remaining_budget`."""
+
+    token = _RUN_DEADLINE.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _RUN_DEADLINE.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current run's budget, or ``None`` when no deadline is set."""
+
+    deadline = _RUN_DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+import unicodedata
+from typing import Any, Callable, Iterable, Optional
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+Embedder = Callable[[str], Any]
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required for vector search (pip install numpy)")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-normalise, lowercase and collapse whitespace and trailing punctuation."""
+
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = " ".join(text.split())
+    return text.rstrip(" ?？!！.。")
+
+
+@lru_cache(maxsize=1 << 18)
+def _feature_slot(feature: str, dim: int) -> tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest[:4], "little") % dim, 1.0 if digest[4] & 1 else -1.0
+
+
+class HashingEmbedder:
+    """Deterministic text embedding for local development that needs no model or network.
+
+    Words and character 2-/3-grams (which also cover Japanese text without a tokenizer) are
+    hashed into ``dim`` signed buckets and the vector is L2-normalised. Similar wording gives
+    similar vectors; it is not a semantic model, but it is stable across processes, which is
+    what offline indexes and tests need. "Product A" and "product B" look almost the same to
+    it, so never use it to decide that two questions mean the same thing in production.
+    """
+
+    def __init__(self, dim: int = 256) -> None:
+        _require_numpy()
+        self.dim = dim
+
+    @property
+    def name(self) -> str:
+        return f"hashing:{self.dim}"
+
+    def _features(self, text: str) -> Iterable[str]:
+        text = normalize_text(text)
+        yield from (f"w:{word}" for word in _WORD_PATTERN.findall(text))
+        compact = text.replace(" ", "")
+        for size in (2, 3):
+            yield from (f"c:{compact[i:i + size]}" for i in range(len(compact) - size + 1))
+
+    def __call__(self, text: str) -> Any:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts = Counter(self._features(text))
+        if counts:
+            slots = [_feature_slot(feature, self.dim) for feature in counts]
+            buckets = np.fromiter((bucket for bucket, _ in slots), dtype=np.int64, count=len(slots))
+            weights = np.fromiter(
+                (sign * count for (_, sign), count in zip(slots, counts.values())), dtype=np.float32, count=len(slots)
+            )
+            np.add.at(vector, buckets, weights)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+def default_embedder() -> Optional[HashingEmbedder]:
+    """Return a :class:`HashingEmbedder`, or ``None`` when numpy is not installed."""
+
+    return HashingEmbedder() if np is not None else None
+
+
+class AzureOpenAIEmbedder:
+    """Embeddings from an Azure OpenAI embedding deployment (e.g. ``text-embedding-3-small``).
+
+    ``client`` is an ``openai.AzureOpenAI`` client, or a zero-argument callable returning one
+    that is only called on first use (so a cache hit never opens it). Vectors are returned
+    L2-normalised, like :class:`HashingEmbedder`.
+    """
+
+    def __init__(
+        self, client: Any, deployment: str, *, dimensions: Optional[int] = None, batch_size: int = 64
+    ) -> None:
+        _require_numpy()
+        self.deployment = deployment
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+        self._client = client
+
+    @property
+    def name(self) -> str:
+        return f"azure-openai:{self.deployment}:{self.dimensions or 'default'}"
+
+    def embed_many(self, texts: Iterable[str]) -> list[Any]:
+        """Embed ``texts`` in order, ``batch_size`` inputs per request."""
+
+        if callable(self._client) and not hasattr(self._client, "embeddings"):
+            self._client = self._client()
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        texts = list(texts)
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = self._client.embeddings.create(model=self.deployment, input=batch, **kwargs)
+            for item in sorted(response.data, key=lambda item: item.index):
+                vector = np.asarray(item.embedding, dtype=np.float32)
+                norm = float(np.linalg.norm(vector))
+                vectors.append(vector / norm if norm else vector)
+        return vectors
+
+    def __call__(self, text: str) -> Any:
+        return self.embed_many([text])[0]
+
+
+def project_embedder(config: Any) -> Optional[AzureOpenAIEmbedder]:
+    """Embedder for ``config.embedding_deployment_name`` in the project, or ``None`` when unset.
+
+    The OpenAI client comes from the shared project client's ``get_openai_client``, using
+    ``OPENAI_API_VERSION`` (default ``2024-10-21``).
+    """
+
+    deployment = getattr(config, "embedding_deployment_name", None)
+    if not deployment:
+        return None
+    from .clients import get_project_client
+
+    api_version = os.getenv("OPENAI_API_VERSION", "2024-10-21")
+    return AzureOpenAIEmbedder(
+        lambda: get_project_client(config.project_endpoint).get_openai_client(api_version=api_version), deployment
+    )
+
+
+class VectorIndex:
+    """In-memory cosine-similarity index over normalised vectors.
+
+    Search is a NumPy brute-force matrix product. With ``lsh_tables`` set, random-hyperplane
+    LSH buckets narrow the candidates first and only those are scored exactly; when no
+    bucket matches, the index falls back to brute force so recall never drops to zero.
+    """
+
+    def __init__(self, dim: int, *, lsh_tables: int = 0, lsh_bits: int = 12, seed: int = 0) -> None:
+        _require_numpy()
+        self.dim = dim
+        self._matrix = np.zeros((16, dim), dtype=np.float32)
+        self._keys: list[Optional[str]] = []
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        rng = np.random.default_rng(seed)
+        self._planes = [rng.standard_normal((lsh_bits, dim)).astype(np.float32) for _ in range(lsh_tables)]
+        self._buckets: list[dict[int, set[int]]] = [{} for _ in range(lsh_tables)]
+        self._weights = 1 << np.arange(lsh_bits, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    def _signatures(self, vector: Any) -> list[int]:
+        return [int(((planes @ vector) > 0).astype(np.int64) @ self._weights) for planes in self._planes]
+
+    def add(self, key: str, vector: Any) -> None:
+        self.remove(key)
+        vector = np.asarray(vector, dtype=np.float32)
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+        else:
+            slot = len(self._keys)
+            if slot == len(self._matrix):
+                grown = np.zeros((len(self._matrix) * 2, self.dim), dtype=np.float32)
+                grown[:slot] = self._matrix
+                self._matrix = grown
+            self._keys.append(key)
+        self._matrix[slot] = vector
+        self._slots[key] = slot
+        for buckets, signature in zip(self._buckets, self._signatures(vector)):
+            buckets.setdefault(signature, set()).add(slot)
+
+    def remove(self, key: str) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        for buckets, signature in zip(self._buckets, self._signatures(self._matrix[slot])):
+            buckets.get(signature, set()).discard(slot)
+        self._matrix[slot] = 0.0
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def search(self, vector: Any, k: int = 1) -> list[tuple[str, float]]:
+        """Return up to ``k`` ``(key, cosine similarity)`` pairs, best first."""
+
+        if not self._slots:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        candidates: set[int] = set()
+        for buckets, signature in zip(self._buckets, self._signatures(vector)):
+            candidates |= buckets.get(signature, set())
+        if candidates:
+            slots = np.fromiter(candidates, dtype=np.int64)
+        else:
+            slots = np.fromiter(self._slots.values(), dtype=np.int64)
+        scores = self._matrix[slots] @ vector
+        best = np.argsort(-scores)[:k]
+        return [(self._keys[int(slots[i])], float(scores[i])) for i in best]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Optional
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Statuses that mean the request was turned away before it was processed. Non-idempotent
+# requests (a POST that sends an email) are only retried on these: after a 500/502/504 or a
+# read timeout the work may already have happened, and a retry would repeat it.
+UNPROCESSED_STATUS_CODES = frozenset({429, 503})
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Return the delay requested by ``retry-after-ms`` / ``Retry-After`` headers in seconds."""
+
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if not value:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            try:
+                when = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                continue
+            return max(0.0, when.timestamp() - time.time())
+    return None
+
+
+def backoff_delay(
+    attempt: int, backoff_factor: float, retry_after: Optional[float] = None, max_delay: float = 30.0
+) -> float:
+    """Exponential backoff with ±20% jitter, never shorter than a server ``Retry-After``."""
+
+    delay = min(max_delay, backoff_factor * (2**attempt)) * random.uniform(0.8, 1.2)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second with bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; returns the seconds spent waiting."""
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
@@ -0,0 +1,133 @@
+"""Import-time benchmark and budget check for the sample modules.
+
+Each module is imported in a fresh interpreter with ``python -X importtime``; the best of
+``--runs`` cumulative times is compared with :data:`BUDGETS_MS`. The heaviest packages the
+sample code imports directly are listed so a regression points at the import that caused it::
+
+    python -m samples.python.common.importtime            # report
+    python -m samples.python.common.importtime --check    # exit 1 when over budget
+
+Budgets are about twice the times measured when they were set, so only real regressions
+fail, such as a module-level import of ``azure.ai.projects``, ``aiohttp`` or the
+OpenTelemetry SDK. ``tests/test_importtime.py`` enforces them as part of the test suite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+# Cumulative import time budgets in milliseconds.
+BUDGETS_MS = {
+    "samples.python.common": 10,
+    "samples.python.common.config": 20,
+    "samples.python.common.metrics": 50,
+    "samples.python.01_minimal_agent.main": 260,
+    "samples.python.02_ai_search_rag.main": 400,
+    "samples.python.03_logic_app_tool.main": 300,
+    "samples.python.04_connected_agents.main": 370,
+    "samples.python.05_evaluation.main": 3000,
+    "samples.python.06_observability_tracing.main": 260,
+    "samples.python.server.main": 270,
+    "samples.python.emulator.main": 220,
+}
+
+_REPOSITORY_ROOT = Path(__file__).resolve().parents[3]
+_MARKER = "-- importtime start --"
+# ``__import__`` goes through the C import machinery that ``-X importtime`` instruments.
+_SCRIPT = "import sys; print({marker!r}, file=sys.stderr); __import__({module!r})"
+
+
+@dataclass(slots=True)
+class ImportProfile:
+    module: str
+    total_ms: float
+    direct_imports: list[tuple[str, float]] = field(default_factory=list)
+
+
+def _parse(stderr: str) -> list[tuple[str, float, int]]:
+    """``(module, cumulative ms, depth)`` entries of ``-X importtime`` output, in report order."""
+
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), int(cumulative) / 1000, depth))
+    return entries
+
+
+def _direct_imports(entries: list[tuple[str, float, int]]) -> list[tuple[str, float]]:
+    """Modules imported directly by sample code, heaviest first.
+
+    ``-X importtime`` reports a module after everything it imported, so an entry's importer
+    is the next entry with a smaller depth.
+    """
+
+    heaviest: dict[str, float] = {}
+    for index, (name, ms, depth) in enumerate(entries):
+        if name.startswith("samples."):
+            continue
+        importer = next((entry[0] for entry in entries[index + 1 :] if entry[2] < depth), "")
+        if importer.startswith("samples."):
+            heaviest[name] = max(ms, heaviest.get(name, 0.0))
+    return sorted(heaviest.items(), key=lambda item: -item[1])
+
+
+def measure(module: str, runs: int = 3) -> ImportProfile:
+    """Import ``module`` ``runs`` times in fresh interpreters and keep the fastest run."""
+
+    best: Optional[ImportProfile] = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _SCRIPT.format(marker=_MARKER, module=module)],
+            cwd=_REPOSITORY_ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{completed.stderr.splitlines()[-1]}")
+        # The interpreter's own start-up imports (encodings, site) are reported before the marker.
+        entries = _parse(completed.stderr.split(_MARKER, 1)[1])
+        total = sum(ms for _, ms, depth in entries if depth == 0)
+        profile = ImportProfile(module, total, _direct_imports(entries))
+        if best is None or profile.total_ms < best.total_ms:
+            best = profile
+    assert best is not None
+    return best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: every budgeted module)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest direct imports to list per module")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when a module is over budget")
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for module in args.modules or list(BUDGETS_MS):
+        profile = measure(module, args.runs)
+        budget = BUDGETS_MS.get(module)
+        verdict = "" if budget is None else ("ok" if profile.total_ms <= budget else "OVER")
+        budget_text = "-" if budget is None else f"{budget}"
+        print(f"{module:<48}{profile.total_ms:>9.1f} ms  budget {budget_text:>5} ms  {verdict}")
+        for name, ms in profile.direct_imports[: args.top]:
+            print(f"    {name:<44}{ms:>9.1f} ms")
+        if verdict == "OVER":
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"Over import-time budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1 if args.check else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
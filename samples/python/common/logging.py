@@ -2,10 +2,17 @@ from __future__ import annotations
 
 import logging
 
+from .config import load_env_file
+
 
 def configure_logging(level: int = logging.INFO) -> None:
-    """Configure a consistent logging format for samples."""
+    """Configure a consistent logging format for samples.
+
+    Also loads ``.env``, because samples call this first and read ``WORKSHOP_*`` settings
+    (metrics, profiling) before :func:`~.config.load_config`.
+    """
 
+    load_env_file()
     handler = logging.StreamHandler()
     formatter = logging.Formatter(
         fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
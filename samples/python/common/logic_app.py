@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
 import json
 import logging
-import os
-from dataclasses import dataclass
-from typing import Callable
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
 
 import requests
-from azure.ai.agents.models import FunctionTool
+from azure.ai.agents.models import AsyncFunctionTool, FunctionTool
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from .http import RETRY_STATUS_CODES, UNPROCESSED_STATUS_CODES, backoff_delay, parse_retry_after
+from .deadline import remaining_budget
 
 _logger = logging.getLogger(__name__)
 
@@ -15,15 +27,517 @@ _logger = logging.getLogger(__name__)
 @dataclass(slots=True)
 class LogicAppToolConfig:
     callback_url: str
+    timeout: float = 30.0
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    pool_size: int = 10
+    batch_max_items: int = 1
+    batch_window: float = 0.05
+    async_pattern: bool = False
+    status_poll_interval: float = 2.0
+    status_timeout: float = 3600.0
+
+    @property
+    def batching(self) -> bool:
+        return self.batch_max_items > 1
+
+
+@dataclass(slots=True)
+class LogicAppResponse:
+    status: int
+    location: Optional[str] = None
+    batch_index: Optional[int] = None
+
+    def to_json(self) -> str:
+        data: dict[str, Any] = {"status": self.status, "location": self.location}
+        if self.batch_index is not None:
+            data["batch_index"] = self.batch_index
+        return json.dumps(data)
+
+
+class LogicAppDeadlineExceeded(TimeoutError):
+    """Raised when the run's remaining budget is spent before the Logic App answers."""
+
+
+def _attempt_timeout(config: LogicAppToolConfig) -> float:
+    budget = remaining_budget()
+    if budget is None:
+        return config.timeout
+    if budget <= 0:
+        raise LogicAppDeadlineExceeded("Run budget exhausted before calling the Logic App")
+    return min(config.timeout, budget)
+
+
+def _retry_delay(config: LogicAppToolConfig, attempt: int, headers: Any) -> Optional[float]:
+    """Return how long to wait before the next attempt, or ``None`` when it would miss the deadline."""
+
+    delay = backoff_delay(attempt, config.backoff_factor, parse_retry_after(headers))
+    budget = remaining_budget()
+    if budget is not None and delay >= budget:
+        return None
+    return delay
+
+
+def _not_sent(exc: requests.RequestException) -> bool:
+    """Whether ``exc`` means the request never reached the server (connect or TLS failure)."""
+
+    if isinstance(exc, (requests.ConnectTimeout, requests.exceptions.SSLError)):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class LogicAppClient:
+    """Pooled, retrying HTTP client for a Logic App HTTP trigger.
+
+    One ``requests.Session`` keeps connections alive across tool calls. Failed requests are
+    retried with exponential backoff, honouring ``Retry-After``. Trigger POSTs are not
+    idempotent (each one sends an email), so they are only retried when the Logic App cannot
+    have run: connection failures before the request was sent, ``429`` and ``503``. Status
+    polls (GET) are also retried on read timeouts and other 5xx responses. Each attempt's
+    timeout is capped by the run's remaining budget (see :func:`run_deadline`), and no retry
+    is started that would end after it.
+    """
+
+    def __init__(self, config: LogicAppToolConfig, session: Optional[requests.Session] = None) -> None:
+        self.config = config
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self._session = session
+
+    def post(self, payload: Any) -> LogicAppResponse:
+        response = self._send("POST", self.config.callback_url, payload)
+        response.raise_for_status()
+        return LogicAppResponse(response.status_code, response.headers.get("Location"))
+
+    def _send(self, method: str, url: str, payload: Any = None) -> requests.Response:
+        """Send with retries and return the final response; the caller checks its status."""
+
+        config = self.config
+        idempotent = method in {"GET", "HEAD", "OPTIONS"}
+        retry_statuses = RETRY_STATUS_CODES if idempotent else UNPROCESSED_STATUS_CODES
+        attempt = 0
+        while True:
+            try:
+                response = self._session.request(
+                    method, url, json=payload, timeout=_attempt_timeout(config)
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                retryable = idempotent or _not_sent(exc)
+                delay = _retry_delay(config, attempt, None) if retryable and attempt < config.max_retries else None
+                if delay is None:
+                    raise
+                _logger.warning("Logic App call failed, retrying (Logic App 呼び出しを再試行します): %s", exc)
+            else:
+                if response.status_code not in retry_statuses or attempt >= config.max_retries:
+                    return response
+                delay = _retry_delay(config, attempt, response.headers)
+                if delay is None:
+                    return response
+                _logger.warning(
+                    "Logic App returned %s, retrying (Logic App が %s を返したため再試行します)",
+                    response.status_code,
+                    response.status_code,
+                )
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class AsyncLogicAppClient:
+    """``aiohttp`` counterpart of :class:`LogicAppClient` for async agents.
+
+    Retries follow the same rule as :meth:`LogicAppClient.post`: only connection failures,
+    ``429`` and ``503``. Use as an async context manager so the connection pool is closed on exit.
+    """
+
+    def __init__(self, config: LogicAppToolConfig) -> None:
+        # Imported here rather than at module level: aiohttp is slow to import and only the
+        # async pattern needs it.
+        try:
+            import aiohttp
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("aiohttp is required for AsyncLogicAppClient (pip install aiohttp)") from exc
+        self._aiohttp = aiohttp
+        # aiohttp < 3.10 has no separate connect timeout error; total timeouts are never retried.
+        self._connect_timeout = getattr(aiohttp, "ConnectionTimeoutError", aiohttp.ClientConnectorError)
+        self.config = config
+        self._session: Optional[Any] = None
+
+    async def __aenter__(self) -> "AsyncLogicAppClient":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def _ensure_session(self) -> Any:
+        if self._session is None:
+            connector = self._aiohttp.TCPConnector(limit=self.config.pool_size, keepalive_timeout=30)
+            self._session = self._aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def post(self, payload: Any) -> LogicAppResponse:
+        config = self.config
+        session = self._ensure_session()
+        attempt = 0
+        while True:
+            try:
+                total = _attempt_timeout(config)
+                timeout = self._aiohttp.ClientTimeout(total=total, sock_connect=min(10.0, total))
+                async with session.post(config.callback_url, json=payload, timeout=timeout) as response:
+                    await response.read()
+                    if response.status not in UNPROCESSED_STATUS_CODES or attempt >= config.max_retries:
+                        response.raise_for_status()
+                        return LogicAppResponse(response.status, response.headers.get("Location"))
+                    delay = _retry_delay(config, attempt, response.headers)
+                    if delay is None:
+                        response.raise_for_status()
+            # Only failures to connect: after a read timeout or a dropped connection the
+            # workflow may already have sent the email.
+            except (self._aiohttp.ClientConnectorError, self._connect_timeout) as exc:
+                delay = _retry_delay(config, attempt, None) if attempt < config.max_retries else None
+                if delay is None:
+                    raise
+                _logger.warning("Logic App call failed, retrying (Logic App 呼び出しを再試行します): %s", exc)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class LogicAppBatcher:
+    """Coalesce Logic App calls into one array payload per trigger execution.
+
+    Payloads submitted within ``window`` seconds of the first pending one (or until
+    ``max_items`` are pending) are posted together as a JSON array, so the workflow must
+    accept an array body. Identical payloads inside a window are sent once and share a
+    result. Each caller receives the batch's status and ``Location`` together with its
+    ``batch_index`` in the array.
+    """
+
+    def __init__(self, client: LogicAppClient, *, max_items: int = 10, window: float = 0.05) -> None:
+        self.client = client
+        self.max_items = max_items
+        self.window = window
+        self.batches = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self._pending: dict[str, tuple[Any, Future]] = {}
+        self._first_at = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._loop, name="logic-app-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, payload: Any) -> "Future[LogicAppResponse]":
+        key = json.dumps(payload, sort_keys=True)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("LogicAppBatcher is closed")
+            self.submitted += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.deduplicated += 1
+                return pending[1]
+            future: Future = Future()
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending[key] = (payload, future)
+            self._condition.notify()
+            return future
+
+    def close(self) -> None:
+        """Flush pending payloads and stop the background worker."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join()
+
+    def _take_batch(self) -> Optional[list[tuple[Any, Future]]]:
+        with self._condition:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._condition.wait()
+            while len(self._pending) < self.max_items and not self._closed:
+                remaining = self._first_at + self.window - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            keys = list(self._pending)[: self.max_items]
+            batch = [self._pending.pop(key) for key in keys]
+            if self._pending:
+                self._first_at = time.monotonic()
+            return batch
+
+    def _loop(self) -> None:
+        while (batch := self._take_batch()) is not None:
+            self.batches += 1
+            try:
+                response = self.client.post([payload for payload, _ in batch])
+            except Exception as exc:  # noqa: BLE001 - delivered to every waiting caller
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for index, (_, future) in enumerate(batch):
+                future.set_result(LogicAppResponse(response.status, response.location, index))
+
+
+@dataclass(slots=True)
+class LogicAppOperation:
+    """State of a Logic App call started in async-pattern mode."""
+
+    handle: str
+    state: str = "submitting"
+    status: Optional[int] = None
+    location: Optional[str] = None
+    result: Any = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in {"succeeded", "failed"}
+
+    def to_json(self) -> str:
+        data = {"handle": self.handle, "state": self.state, "status": self.status}
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return json.dumps(data)
+
+
+def _response_body(response: requests.Response) -> Any:
+    if not response.content:
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+class LogicAppStatusTracker:
+    """Trigger Logic Apps in the background and follow their ``202 Accepted`` ``Location``.
+
+    :meth:`start` returns an operation handle immediately; the trigger POST and the status
+    polls run on ``workers`` threads, driven by one scheduler thread, so long-running
+    workflows never hold the agent run in ``requires_action``. Polls honour ``Retry-After``
+    and back off up to ``max_poll_interval``. Finished operations are kept for lookups
+    until ``max_operations`` newer ones push them out.
+    """
+
+    def __init__(
+        self,
+        client: LogicAppClient,
+        *,
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 30.0,
+        timeout: float = 3600.0,
+        workers: int = 2,
+        max_operations: int = 1024,
+    ) -> None:
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.max_operations = max_operations
+        self._operations: OrderedDict[str, LogicAppOperation] = OrderedDict()
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="logic-app-status")
+        self._thread = threading.Thread(target=self._loop, name="logic-app-status", daemon=True)
+        self._thread.start()
+
+    def start(self, payload: Any) -> LogicAppOperation:
+        operation = LogicAppOperation(handle=uuid.uuid4().hex)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("LogicAppStatusTracker is closed")
+            self._operations[operation.handle] = operation
+            while len(self._operations) > self.max_operations:
+                self._operations.popitem(last=False)
+        self._executor.submit(self._submit, operation, payload)
+        return operation
+
+    def get(self, handle: str) -> Optional[LogicAppOperation]:
+        with self._condition:
+            return self._operations.get(handle)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _finish(self, operation: LogicAppOperation, response: Optional[requests.Response], error: Optional[str]) -> None:
+        if response is not None:
+            operation.status = response.status_code
+            operation.result = _response_body(response)
+            if response.status_code >= 400:
+                error = error or f"Logic App returned HTTP {response.status_code}"
+        operation.error = error
+        operation.completed_at = time.time()
+        operation.state = "failed" if error else "succeeded"
+        _logger.info(
+            "Logic App operation %s %s (Logic App の処理が完了しました)", operation.handle, operation.state
+        )
+
+    def _submit(self, operation: LogicAppOperation, payload: Any) -> None:
+        try:
+            response = self.client._send("POST", self.client.config.callback_url, payload)
+        except requests.RequestException as exc:
+            self._finish(operation, None, str(exc))
+            return
+        self._follow(operation, response, 0)
+
+    def _poll(self, operation: LogicAppOperation, attempt: int) -> None:
+        if time.time() - operation.submitted_at > self.timeout:
+            self._finish(operation, None, f"No result within {self.timeout:.0f}s")
+            return
+        try:
+            response = self.client._send("GET", operation.location)
+        except requests.RequestException as exc:
+            self._finish(operation, None, str(exc))
+            return
+        self._follow(operation, response, attempt + 1)
+
+    def _follow(self, operation: LogicAppOperation, response: requests.Response, attempt: int) -> None:
+        location = response.headers.get("Location") or operation.location
+        if response.status_code != 202 or not location:
+            self._finish(operation, response, None)
+            return
+        operation.state = "running"
+        operation.status = 202
+        operation.location = location
+        delay = parse_retry_after(response.headers)
+        if delay is None:
+            delay = min(self.max_poll_interval, self.poll_interval * (1.5**attempt))
+        with self._condition:
+            if not self._closed:
+                heapq.heappush(
+                    self._heap, (time.monotonic() + delay, next(self._sequence), operation.handle, attempt)
+                )
+                self._condition.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+                _, _, handle, attempt = heapq.heappop(self._heap)
+                operation = self._operations.get(handle)
+            if operation is not None:
+                self._executor.submit(self._poll, operation, attempt)
+
+
+_clients: dict[tuple, LogicAppClient] = {}
+_batchers: dict[tuple, LogicAppBatcher] = {}
+_trackers: dict[tuple, LogicAppStatusTracker] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_key(config: LogicAppToolConfig) -> tuple:
+    return (config.callback_url, config.timeout, config.max_retries, config.backoff_factor, config.pool_size)
+
+
+def get_logic_app_client(config: LogicAppToolConfig) -> LogicAppClient:
+    """Return the process-wide pooled client for ``config``."""
+
+    with _clients_lock:
+        client = _clients.get(_client_key(config))
+        if client is None:
+            client = _clients[_client_key(config)] = LogicAppClient(config)
+        return client
+
+
+def get_logic_app_batcher(config: LogicAppToolConfig) -> LogicAppBatcher:
+    """Return the process-wide batcher for ``config`` so concurrent runs share windows."""
+
+    client = get_logic_app_client(config)
+    key = (*_client_key(config), config.batch_max_items, config.batch_window)
+    with _clients_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = LogicAppBatcher(
+                client, max_items=config.batch_max_items, window=config.batch_window
+            )
+        return batcher
+
+
+def get_logic_app_tracker(config: LogicAppToolConfig) -> LogicAppStatusTracker:
+    """Return the process-wide async-pattern tracker for ``config``."""
+
+    client = get_logic_app_client(config)
+    key = (*_client_key(config), config.status_poll_interval, config.status_timeout)
+    with _clients_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = LogicAppStatusTracker(
+                client, poll_interval=config.status_poll_interval, timeout=config.status_timeout
+            )
+        return tracker
+
+
+def _wait_for_batch(future: "Future[LogicAppResponse]") -> LogicAppResponse:
+    try:
+        return future.result(timeout=remaining_budget())
+    except FutureTimeoutError as exc:
+        raise LogicAppDeadlineExceeded("Run budget exhausted while waiting for the batched Logic App call") from exc
+
+
+def _email_payload(to: str, subject: str, body: str) -> dict[str, str]:
+    payload = {"to": to, "subject": subject, "body": body}
+    _logger.debug("Payload for Logic App request: %s (Logic App へ送信するペイロード)", payload)
+    return payload
+
+
+def _describe(function: Callable[..., Any], async_pattern: bool = False) -> Callable[..., Any]:
+    function.__name__ = "send_email_via_logic_app"
+    function.__doc__ = (
+        "Send an email using a Logic App trigger. Parameters must include to, subject, and body."
+    )
+    if async_pattern:
+        function.__doc__ += (
+            " Returns an operation handle right away; call check_logic_app_status with it to confirm delivery."
+        )
+    return function
 
 
 def create_logic_app_function_tool(config: LogicAppToolConfig) -> FunctionTool:
     """Create a function tool that forwards agent tool calls to a Logic App.
 
     The generated tool expects the agent to provide ``to``, ``subject``, and ``body`` fields.
-    The Logic App is triggered via HTTP POST with a JSON payload.
+    The Logic App is triggered via HTTP POST with a JSON payload over a shared, pooled
+    :class:`LogicAppClient`. When ``config.batch_max_items`` is greater than one, calls go
+    through a shared :class:`LogicAppBatcher` and the workflow receives JSON arrays.
+
+    With ``config.async_pattern`` the tool returns an operation handle immediately, a
+    :class:`LogicAppStatusTracker` follows the workflow's ``Location`` in the background,
+    and a second ``check_logic_app_status`` function reports the outcome.
     """
 
+    client = get_logic_app_client(config)
+    batcher = get_logic_app_batcher(config) if config.batching else None
+    tracker = get_logic_app_tracker(config) if config.async_pattern else None
+
     def send_email_via_logic_app(to: str, subject: str, body: str) -> str:
         """Send an email via the configured Logic App workflow.
 
@@ -37,17 +551,51 @@ def create_logic_app_function_tool(config: LogicAppToolConfig) -> FunctionTool:
             Body text for the message.
         """
 
-        payload = {"to": to, "subject": subject, "body": body}
-        _logger.debug(
-            "Payload for Logic App request: %s (Logic App へ送信するペイロード)", payload
-        )
-        response = requests.post(config.callback_url, json=payload, timeout=30)
-        response.raise_for_status()
-        return json.dumps({"status": response.status_code, "location": response.headers.get("Location")})
+        payload = _email_payload(to, subject, body)
+        if tracker is not None:
+            return tracker.start(payload).to_json()
+        if batcher is not None:
+            return _wait_for_batch(batcher.submit(payload)).to_json()
+        return client.post(payload).to_json()
 
-    send_email_via_logic_app.__name__ = "send_email_via_logic_app"
-    send_email_via_logic_app.__doc__ = (
-        "Send an email using a Logic App trigger. Parameters must include to, subject, and body."
-    )
+    functions: set[Callable[..., Any]] = {_describe(send_email_via_logic_app, tracker is not None)}
+    if tracker is not None:
+
+        def check_logic_app_status(handle: str) -> str:
+            """Report the state of a Logic App operation started by send_email_via_logic_app.
+
+            Parameters
+            ----------
+            handle: str
+                Handle returned by send_email_via_logic_app.
+            """
+
+            operation = tracker.get(handle)
+            if operation is None:
+                return json.dumps({"handle": handle, "state": "unknown"})
+            return operation.to_json()
+
+        functions.add(check_logic_app_status)
+
+    return FunctionTool(functions=functions)
+
+
+def create_async_logic_app_function_tool(client: AsyncLogicAppClient) -> AsyncFunctionTool:
+    """Async variant of :func:`create_logic_app_function_tool` backed by ``client``."""
+
+    async def send_email_via_logic_app(to: str, subject: str, body: str) -> str:
+        """Send an email via the configured Logic App workflow.
+
+        Parameters
+        ----------
+        to: str
+            Recipient email address.
+        subject: str
+            Subject line for the message.
+        body: str
+            Body text for the message.
+        """
+
+        return (await client.post(_email_payload(to, subject, body))).to_json()
 
-    return FunctionTool(functions={send_email_via_logic_app})
+    return AsyncFunctionTool(functions={_describe(send_email_via_logic_app)})
@@ -0,0 +1,379 @@
+"""OpenTelemetry metrics for Agent Service operations.
+
+:func:`get_metrics` returns the process-wide :class:`AgentMetrics`, which records latency
+histograms (agent create, thread create, run queue time, run execution time, tool calls,
+message listing) and counters (tokens, failures) tagged with the agent name and model
+deployment. Until :func:`configure_metrics` installs a meter provider the instruments are
+no-ops. ``WORKSHOP_METRICS`` selects a local exporter:
+
+* ``prometheus`` serves the Prometheus text format on ``WORKSHOP_METRICS_PORT`` (9464).
+* ``file`` appends OTLP-style JSON snapshots to ``WORKSHOP_METRICS_FILE`` (``metrics.jsonl``).
+* ``console`` prints snapshots to stdout.
+
+Percentiles of a file export can be checked without Azure Monitor::
+
+    python -m samples.python.common.metrics report metrics.jsonl
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+try:  # pragma: no cover - optional dependency
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # pragma: no cover - optional dependency
+    otel_metrics = None  # type: ignore[assignment]
+
+_logger = logging.getLogger(__name__)
+
+AGENT_CREATE = "agent.create"
+THREAD_CREATE = "agent.thread.create"
+RUN_QUEUE = "agent.run.queue"
+RUN_EXECUTION = "agent.run.execution"
+TOOL_CALL = "agent.tool_call"
+MESSAGE_LIST = "agent.messages.list"
+OPERATIONS = (AGENT_CREATE, THREAD_CREATE, RUN_QUEUE, RUN_EXECUTION, TOOL_CALL, MESSAGE_LIST)
+
+AGENT_NAME = "gen_ai.agent.name"
+MODEL = "gen_ai.request.model"
+
+# Seconds; covers millisecond tool calls up to multi-minute runs.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _seconds_between(start: Any, end: Any) -> Optional[float]:
+    if isinstance(start, datetime) and isinstance(end, datetime):
+        return max(0.0, (end - start).total_seconds())
+    return None
+
+
+class AgentMetrics:
+    """Instruments for agent operations, tagged by agent name and model deployment.
+
+    Agents are described once with :meth:`describe_agent` (the registry does this); later
+    measurements only need the agent ID.
+    """
+
+    def __init__(self, meter: Any = None) -> None:
+        self._agents: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+        if meter is None and otel_metrics is not None:
+            meter = otel_metrics.get_meter("samples.python.agents")
+        self._histograms = {}
+        self._tokens = self._failures = None
+        if meter is None:
+            return
+        for operation in OPERATIONS:
+            self._histograms[operation] = meter.create_histogram(
+                f"{operation}.duration", unit="s", description=f"Duration of {operation}"
+            )
+        self._tokens = meter.create_counter("agent.tokens", unit="{token}", description="Tokens used by runs")
+        self._failures = meter.create_counter("agent.failures", description="Failed agent operations")
+
+    def describe_agent(self, agent_id: str, name: str, model: str) -> None:
+        with self._lock:
+            self._agents[agent_id] = {AGENT_NAME: name, MODEL: model}
+
+    def attributes(self, agent_id: Optional[str] = None, **extra: Any) -> dict[str, Any]:
+        attributes = dict(self._agents.get(agent_id, {})) if agent_id else {}
+        attributes.update((key, value) for key, value in extra.items() if value is not None)
+        return attributes
+
+    def record(self, operation: str, seconds: float, agent_id: Optional[str] = None, **attributes: Any) -> None:
+        histogram = self._histograms.get(operation)
+        if histogram is not None:
+            histogram.record(seconds, self.attributes(agent_id, **attributes))
+
+    def failure(self, operation: str, agent_id: Optional[str] = None, **attributes: Any) -> None:
+        if self._failures is not None:
+            self._failures.add(1, self.attributes(agent_id, operation=operation, **attributes))
+
+    def tokens(self, usage: Any, agent_id: Optional[str] = None, **attributes: Any) -> None:
+        if self._tokens is None or usage is None:
+            return
+        for token_type in ("prompt", "completion"):
+            count = getattr(usage, f"{token_type}_tokens", None)
+            if count:
+                self._tokens.add(count, self.attributes(agent_id, **attributes, **{"gen_ai.token.type": token_type}))
+
+    @contextmanager
+    def time(self, operation: str, agent_id: Optional[str] = None, **attributes: Any) -> Iterator[None]:
+        """Record the duration of the block; an exception also counts as a failure."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.failure(operation, agent_id, **attributes)
+            raise
+        finally:
+            self.record(operation, time.perf_counter() - started, agent_id, **attributes)
+
+    def record_run(self, run: Any, timings: Any = None, agent_id: Optional[str] = None) -> None:
+        """Record queue and execution time, tokens, and failure of a finished run.
+
+        ``timings`` is a streamed run's :class:`RunMetrics`; without it (polled runs) the
+        service's ``created_at`` / ``started_at`` / ``completed_at`` timestamps are used.
+        """
+
+        if run is None:
+            return
+        agent_id = agent_id or getattr(run, "agent_id", None)
+        attributes = {} if agent_id in self._agents else {MODEL: getattr(run, "model", None)}
+        queue = execution = None
+        if timings is not None and timings.in_progress_at is not None:
+            queue = timings.in_progress_at - (timings.queued_at or timings.started_at)
+            if timings.finished_at is not None:
+                execution = timings.finished_at - timings.in_progress_at
+        else:
+            ended = next(
+                (
+                    value
+                    for value in (getattr(run, name, None) for name in ("completed_at", "failed_at", "cancelled_at"))
+                    if value is not None
+                ),
+                None,
+            )
+            queue = _seconds_between(getattr(run, "created_at", None), getattr(run, "started_at", None))
+            execution = _seconds_between(getattr(run, "started_at", None), ended)
+        if queue is not None:
+            self.record(RUN_QUEUE, queue, agent_id, **attributes)
+        if execution is not None:
+            self.record(RUN_EXECUTION, execution, agent_id, **attributes)
+        self.tokens(getattr(run, "usage", None), agent_id, **attributes)
+        status = str(getattr(run.status, "value", run.status))
+        if status != "completed":
+            self.failure("agent.run", agent_id, status=status, **attributes)
+
+
+_metrics: Optional[AgentMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> AgentMetrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = AgentMetrics()
+        return _metrics
+
+
+def _prometheus_name(name: str, unit: str) -> str:
+    base = "".join(char if char.isalnum() else "_" for char in name)
+    return f"{base}_seconds" if unit == "s" and not base.endswith("_seconds") else base
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(attributes: dict[str, Any], extra: Optional[dict[str, str]] = None) -> str:
+    pairs = {**{key: str(value) for key, value in attributes.items()}, **(extra or {})}
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        f'{"".join(char if char.isalnum() else "_" for char in key)}="{_label_value(value)}"'
+        for key, value in sorted(pairs.items())
+    )
+    return "{" + rendered + "}"
+
+
+def render_prometheus(metrics_data: Any) -> str:
+    """Render SDK ``MetricsData`` (cumulative) in the Prometheus text exposition format."""
+
+    lines: list[str] = []
+    for resource_metrics in getattr(metrics_data, "resource_metrics", None) or []:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                name = _prometheus_name(metric.name, metric.unit or "")
+                points = metric.data.data_points
+                if hasattr(metric.data, "is_monotonic"):
+                    lines.append(f"# TYPE {name}_total counter")
+                    lines.extend(f"{name}_total{_labels(dict(point.attributes))} {point.value}" for point in points)
+                    continue
+                lines.append(f"# TYPE {name} histogram")
+                for point in points:
+                    attributes = dict(point.attributes)
+                    cumulative = 0
+                    for bound, count in zip(list(point.explicit_bounds) + [math.inf], point.bucket_counts):
+                        cumulative += count
+                        le = "+Inf" if math.isinf(bound) else repr(float(bound))
+                        lines.append(f"{name}_bucket{_labels(attributes, {'le': le})} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(attributes)} {point.sum}")
+                    lines.append(f"{name}_count{_labels(attributes)} {point.count}")
+    return "\n".join(lines) + "\n"
+
+
+def _serve_prometheus(reader: Any, port: int) -> Any:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            body = render_prometheus(reader.get_metrics_data()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+_configured = False
+
+
+def configure_metrics(exporter: Optional[str] = None) -> None:
+    """Install a meter provider with the exporter named by ``WORKSHOP_METRICS``.
+
+    Does nothing when the variable is unset or ``off``, or when the OpenTelemetry SDK is not
+    installed. Safe to call more than once; the provider flushes at interpreter exit.
+    """
+
+    global _configured
+    exporter = (exporter or os.getenv("WORKSHOP_METRICS", "off")).lower()
+    if _configured or exporter in {"", "0", "false", "no", "off"}:
+        return
+    try:
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import (
+            ConsoleMetricExporter,
+            InMemoryMetricReader,
+            MetricExporter,
+            MetricExportResult,
+            PeriodicExportingMetricReader,
+        )
+        from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+    except ImportError:  # pragma: no cover - optional dependency
+        _logger.warning("opentelemetry-sdk is not installed; metrics are disabled (メトリックは無効です)")
+        return
+
+    class FileMetricExporter(MetricExporter):
+        """Append one JSON snapshot (the SDK's OTLP-shaped ``MetricsData``) per export."""
+
+        def __init__(self, path: Path) -> None:
+            super().__init__()
+            self.path = path
+
+        def export(self, metrics_data: Any, timeout_millis: float = 10_000, **kwargs: Any) -> Any:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as stream:
+                stream.write(metrics_data.to_json(indent=None) + "\n")
+            return MetricExportResult.SUCCESS
+
+        def force_flush(self, timeout_millis: float = 10_000) -> bool:
+            return True
+
+        def shutdown(self, timeout_millis: float = 30_000, **kwargs: Any) -> None:
+            return
+
+    interval = int(os.getenv("WORKSHOP_METRICS_INTERVAL_MS", "10000"))
+    if exporter == "prometheus":
+        reader = InMemoryMetricReader()
+        port = int(os.getenv("WORKSHOP_METRICS_PORT", "9464"))
+        _serve_prometheus(reader, port)
+        _logger.info("Serving Prometheus metrics on http://127.0.0.1:%d/metrics", port)
+    elif exporter == "file":
+        path = Path(os.getenv("WORKSHOP_METRICS_FILE", "metrics.jsonl"))
+        reader = PeriodicExportingMetricReader(FileMetricExporter(path), export_interval_millis=interval)
+        _logger.info("Writing metrics to %s (メトリックをファイルに出力します)", path)
+    elif exporter == "console":
+        reader = PeriodicExportingMetricReader(ConsoleMetricExporter(), export_interval_millis=interval)
+    else:
+        _logger.warning("Unknown WORKSHOP_METRICS exporter %r; metrics are disabled", exporter)
+        return
+
+    view = View(
+        instrument_name="agent.*.duration",
+        aggregation=ExplicitBucketHistogramAggregation(boundaries=LATENCY_BUCKETS),
+    )
+    otel_metrics.set_meter_provider(MeterProvider(metric_readers=[reader], views=[view]))
+    _configured = True
+
+
+def histogram_percentile(bounds: list[float], counts: list[int], fraction: float, low: float, high: float) -> float:
+    """Estimate a percentile from bucket counts, interpolating linearly inside the bucket."""
+
+    total = sum(counts)
+    if not total:
+        return math.nan
+    target = fraction * total
+    cumulative = 0
+    edges = [low] + list(bounds) + [high]
+    for index, count in enumerate(counts):
+        if count and cumulative + count >= target:
+            lower, upper = max(low, edges[index]), min(high, edges[index + 1])
+            return lower + (upper - lower) * (target - cumulative) / count
+        cumulative += count
+    return high
+
+
+def report(path: Path) -> list[dict[str, Any]]:
+    """p50/p95/p99 of every histogram series in the last snapshot of a ``file`` export."""
+
+    last = None
+    with path.open(encoding="utf-8") as stream:
+        for line in stream:
+            if line.strip():
+                last = json.loads(line)
+    rows = []
+    for resource_metrics in (last or {}).get("resource_metrics", []):
+        for scope_metrics in resource_metrics["scope_metrics"]:
+            for metric in scope_metrics["metrics"]:
+                for point in metric["data"]["data_points"]:
+                    if "bucket_counts" not in point:
+                        rows.append({"metric": metric["name"], "attributes": point["attributes"], "value": point["value"]})
+                        continue
+                    bounds, counts = point["explicit_bounds"], point["bucket_counts"]
+                    low, high = point.get("min", 0.0), point.get("max", bounds[-1] if bounds else 0.0)
+                    rows.append(
+                        {
+                            "metric": metric["name"],
+                            "attributes": point["attributes"],
+                            "count": point["count"],
+                            **{
+                                f"p{round(fraction * 100)}": histogram_percentile(bounds, counts, fraction, low, high)
+                                for fraction in (0.5, 0.95, 0.99)
+                            },
+                        }
+                    )
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect metrics written with WORKSHOP_METRICS=file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report_parser = commands.add_parser("report", help="Print p50/p95/p99 per histogram series")
+    report_parser.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    for row in report(args.path):
+        labels = ", ".join(f"{key}={value}" for key, value in sorted(row["attributes"].items()))
+        if "count" in row:
+            print(
+                f"{row['metric']:<32} n={row['count']:<6} p50={row['p50']:.3f}s p95={row['p95']:.3f}s "
+                f"p99={row['p99']:.3f}s  {labels}"
+            )
+        else:
+            print(f"{row['metric']:<32} total={row['value']:<8} {labels}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
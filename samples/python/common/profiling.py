@@ -0,0 +1,455 @@
+"""Opt-in profiling of Agent Service calls.
+
+With ``WORKSHOP_PROFILE=true`` (or :func:`configure_profiling`), clients opened through
+:func:`~.clients.open_project_client` record every ``project_client.agents.*`` call the samples make:
+wall time, time spent on the wire, time spent acquiring tokens, bytes sent and received,
+and HTTP retries. Records go to a bounded in-memory ring buffer; at exit a summary table is
+printed and two files are written to ``WORKSHOP_PROFILE_DIR`` (``profile``):
+
+* ``agents.collapsed`` – collapsed stacks (``frame;frame;... microseconds``) for
+  ``flamegraph.pl`` / ``inferno``.
+* ``agents.speedscope.json`` – the same stacks for https://www.speedscope.app.
+
+Each stack is the sample code that made the call, the (nested) agent operations, and a
+leaf telling where the time went: ``[service]`` (HTTP round trips), ``[credential]``
+(token acquisition) or the operation itself (everything else on the client: serialisation,
+polling sleeps, tool callbacks).
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy, HTTPPolicy
+
+_logger = logging.getLogger(__name__)
+
+# Calls wrapped on ``project_client.agents``: (attribute path, method name).
+INSTRUMENTED_CALLS = (
+    ("", "create_agent"),
+    ("", "get_agent"),
+    ("", "delete_agent"),
+    ("threads", "create"),
+    ("threads", "delete"),
+    ("messages", "create"),
+    ("messages", "list"),
+    ("runs", "create"),
+    ("runs", "create_and_process"),
+    ("runs", "get"),
+    ("runs", "stream"),
+    ("runs", "submit_tool_outputs"),
+    ("runs", "submit_tool_outputs_stream"),
+    ("run_steps", "list"),
+)
+
+_SAMPLES_ROOT = str(Path(__file__).resolve().parents[1])
+_THIS_FILE = str(Path(__file__).resolve())
+_ID_SEGMENT = re.compile(r"^(?:asst|thread|run|msg|step|call|file|vs|vsfb)_[A-Za-z0-9]+$|^\d+$")
+_RESOURCES = {"assistants", "threads", "files", "vector_stores"}
+# Lists page lazily, after the wrapped call returned: name their requests after the call.
+_PAGED_ROUTES = {
+    "GET /assistants": "agents.list_agents",
+    "GET /threads/{id}/messages": "messages.list",
+    "GET /threads/{id}/runs": "runs.list",
+    "GET /threads/{id}/runs/{id}/steps": "run_steps.list",
+}
+_current: contextvars.ContextVar[Optional["CallRecord"]] = contextvars.ContextVar("agent_call", default=None)
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("WORKSHOP_PROFILE", "false").lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """One profiled operation. Durations are seconds; ``stack`` ends with the operation."""
+
+    operation: str
+    stack: tuple[str, ...]
+    started_at: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    http_seconds: float = 0.0
+    credential_seconds: float = 0.0
+    child_seconds: float = 0.0
+    requests: int = 0
+    attempts: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    error: Optional[str] = None
+    _request_ids: set[int] = field(default_factory=set, repr=False)
+
+    @property
+    def retries(self) -> int:
+        return self.attempts - self.requests
+
+    @property
+    def client_seconds(self) -> float:
+        """Time not spent on the wire, on tokens, or in nested operations."""
+
+        return max(0.0, self.duration - self.http_seconds - self.credential_seconds - self.child_seconds)
+
+
+def _code_stack() -> tuple[str, ...]:
+    """``file.py:function`` for the sample frames on the current stack, outermost first."""
+
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_SAMPLES_ROOT) and filename != _THIS_FILE:
+            frames.append(f"{Path(filename).name}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _route(http_request: Any) -> str:
+    """``GET /threads/{id}/messages`` style name; paged list routes map to their operation."""
+
+    path = http_request.url.split("?", 1)[0].split("://", 1)[-1].split("/", 1)[-1]
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/") if segment]
+    # Drop the project prefix (api/projects/<name>) in front of the first agent resource.
+    start = next((index for index, segment in enumerate(segments) if segment in _RESOURCES), 0)
+    route = f"{http_request.method} /{'/'.join(segments[start:])}"
+    return f"{_PAGED_ROUTES[route]} (paging)" if route in _PAGED_ROUTES else route
+
+
+def _body_size(http_request: Any) -> int:
+    length = http_request.headers.get("Content-Length")
+    if length is not None:
+        return int(length)
+    body = getattr(http_request, "content", None)
+    if body is None:
+        body = getattr(http_request, "body", None)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return len(body) if isinstance(body, (bytes, bytearray)) else 0
+
+
+class ProfilingPolicy(HTTPPolicy):
+    """Per-retry pipeline policy attributing each HTTP attempt to the current operation.
+
+    HTTP made outside a wrapped call (for example while iterating a lazily paged list) is
+    recorded as its own operation, named after the route.
+    """
+
+    def __init__(self, profiler: "AgentProfiler") -> None:
+        super().__init__()
+        self._profiler = profiler
+
+    def _begin(self, request: Any) -> tuple[CallRecord, bool, float, float]:
+        record = _current.get()
+        owned = record is None
+        if owned:
+            route = _route(request.http_request)
+            record = CallRecord(route, _code_stack() + (route,))
+        return record, owned, time.perf_counter(), record.credential_seconds
+
+    def _end(self, request: Any, record: CallRecord, owned: bool, started: float, credential_before: float) -> None:
+        elapsed = time.perf_counter() - started
+        # Token acquisition may run inside this attempt (bearer policy after us).
+        record.http_seconds += max(0.0, elapsed - (record.credential_seconds - credential_before))
+        record.attempts += 1
+        if id(request.http_request) not in record._request_ids:
+            record._request_ids.add(id(request.http_request))
+            record.requests += 1
+        record.bytes_sent += _body_size(request.http_request)
+        if owned:
+            record.duration = elapsed
+            self._profiler.add(record)
+
+    def send(self, request: Any) -> Any:
+        record, owned, started, credential_before = self._begin(request)
+        try:
+            response = self.next.send(request)
+        except BaseException as exc:
+            record.error = type(exc).__name__
+            raise
+        finally:
+            self._end(request, record, owned, started, credential_before)
+        record.bytes_received += self._response_size(request, response)
+        return response
+
+    @staticmethod
+    def _response_size(request: Any, response: Any) -> int:
+        http_response = response.http_response
+        length = http_response.headers.get("Content-Length")
+        if length is not None:
+            return int(length)
+        if request.context.options.get("stream"):
+            return 0  # Streamed body (server-sent events): size unknown until consumed.
+        try:
+            return len(http_response.body())
+        except Exception:  # noqa: BLE001 - size is best effort
+            return 0
+
+
+class AsyncProfilingPolicy(ProfilingPolicy, AsyncHTTPPolicy):
+    """:class:`ProfilingPolicy` for async pipelines (``azure.ai.projects.aio``).
+
+    Async clients are not instrumented per call, so each HTTP attempt is recorded as its own
+    operation named after the route. Response sizes come from ``Content-Length`` only.
+    """
+
+    async def send(self, request: Any) -> Any:  # type: ignore[override]
+        record, owned, started, credential_before = self._begin(request)
+        try:
+            response = await self.next.send(request)
+        except BaseException as exc:
+            record.error = type(exc).__name__
+            raise
+        finally:
+            self._end(request, record, owned, started, credential_before)
+        record.bytes_received += int(response.http_response.headers.get("Content-Length") or 0)
+        return response
+
+
+class _ProfiledCredential:
+    """Credential wrapper charging ``get_token`` time to the current operation."""
+
+    def __init__(self, credential: Any, profiler: "AgentProfiler") -> None:
+        self._credential = credential
+        self._profiler = profiler
+        self.get_token = functools.partial(self._timed, "get_token")
+        if hasattr(credential, "get_token_info"):
+            # Only offer the newer protocol when the wrapped credential implements it.
+            self.get_token_info = functools.partial(self._timed, "get_token_info")
+
+    def _timed(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return getattr(self._credential, name)(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            record = _current.get()
+            if record is not None:
+                record.credential_seconds += elapsed
+            else:
+                self._profiler.add(
+                    CallRecord("credential.get_token", _code_stack() + ("[credential]",), duration=elapsed)
+                )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._credential, name)
+
+    def __enter__(self) -> "_ProfiledCredential":
+        self._credential.__enter__()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._credential.__exit__(*exc_info)
+
+
+class AgentProfiler:
+    """Ring buffer of :class:`CallRecord` objects plus the hooks that fill it.
+
+    Parameters
+    ----------
+    capacity:
+        Records kept; the oldest are dropped first (counted in :attr:`dropped`).
+    """
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self.records: deque[CallRecord] = deque(maxlen=capacity)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, record: CallRecord) -> None:
+        with self._lock:
+            if len(self.records) == self.records.maxlen:
+                self.dropped += 1
+            self.records.append(record)
+
+    @contextmanager
+    def call(self, operation: str) -> Iterator[CallRecord]:
+        parent = _current.get()
+        stack = (parent.stack if parent is not None else _code_stack()) + (operation,)
+        record = CallRecord(operation, stack)
+        token = _current.set(record)
+        try:
+            yield record
+        except BaseException as exc:
+            record.error = type(exc).__name__
+            raise
+        finally:
+            _current.reset(token)
+            record.duration = time.perf_counter() - record.started_at
+            if parent is not None:
+                parent.child_seconds += record.duration
+            self.add(record)
+
+    def wrap(self, operation: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.call(operation):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def instrument(self, agents_client: Any) -> Any:
+        """Wrap :data:`INSTRUMENTED_CALLS` on ``agents_client`` in place and return it."""
+
+        for group, name in INSTRUMENTED_CALLS:
+            target = getattr(agents_client, group) if group else agents_client
+            function = getattr(target, name, None)
+            if function is None or getattr(function, "__profiled__", False):
+                continue
+            wrapped = self.wrap(f"{group or 'agents'}.{name}", function)
+            wrapped.__profiled__ = True  # type: ignore[attr-defined]
+            setattr(target, name, wrapped)
+        return agents_client
+
+    def policy(self) -> ProfilingPolicy:
+        return ProfilingPolicy(self)
+
+    def async_policy(self) -> AsyncProfilingPolicy:
+        return AsyncProfilingPolicy(self)
+
+    def wrap_credential(self, credential: Any) -> Any:
+        return _ProfiledCredential(credential, self)
+
+    def snapshot(self) -> list[CallRecord]:
+        with self._lock:
+            return list(self.records)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Per-operation totals and latency percentiles, slowest total first."""
+
+        groups: dict[str, list[CallRecord]] = defaultdict(list)
+        for record in self.snapshot():
+            groups[record.operation].append(record)
+        rows = []
+        for operation, records in groups.items():
+            durations = sorted(record.duration for record in records)
+            rows.append(
+                {
+                    "operation": operation,
+                    "calls": len(records),
+                    "total_s": sum(durations),
+                    "p50_ms": statistics.median(durations) * 1000,
+                    "p95_ms": durations[min(len(durations) - 1, int(0.95 * len(durations)))] * 1000,
+                    "service_s": sum(record.http_seconds for record in records),
+                    "credential_s": sum(record.credential_seconds for record in records),
+                    "client_s": sum(record.client_seconds for record in records),
+                    "bytes_sent": sum(record.bytes_sent for record in records),
+                    "bytes_received": sum(record.bytes_received for record in records),
+                    "retries": sum(record.retries for record in records),
+                    "errors": sum(record.error is not None for record in records),
+                }
+            )
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def collapsed(self) -> dict[tuple[str, ...], int]:
+        """Self time in microseconds per stack, split into service / credential / client."""
+
+        stacks: dict[tuple[str, ...], int] = defaultdict(int)
+        for record in self.snapshot():
+            for leaf, seconds in (
+                ("[service]", record.http_seconds),
+                ("[credential]", record.credential_seconds),
+                (None, record.client_seconds),
+            ):
+                micros = round(seconds * 1e6)
+                if micros > 0:
+                    stacks[record.stack + ((leaf,) if leaf else ())] += micros
+        return dict(stacks)
+
+    def speedscope(self, name: str = "agent calls") -> dict[str, Any]:
+        frames: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, micros in sorted(self.collapsed().items()):
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(micros / 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": frame} for frame in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": name,
+            "exporter": "samples.python.common.profiling",
+        }
+
+    def dump(self, directory: Path) -> tuple[Path, Path]:
+        """Write ``agents.collapsed`` and ``agents.speedscope.json`` to ``directory``."""
+
+        directory.mkdir(parents=True, exist_ok=True)
+        collapsed_path = directory / "agents.collapsed"
+        lines = [f"{';'.join(stack)} {micros}" for stack, micros in sorted(self.collapsed().items())]
+        collapsed_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        speedscope_path = directory / "agents.speedscope.json"
+        speedscope_path.write_text(json.dumps(self.speedscope()), encoding="utf-8")
+        return collapsed_path, speedscope_path
+
+    def print_summary(self, out: TextIO = sys.stderr) -> None:
+        rows = self.summary()
+        header = (
+            f"{'operation':<36}{'calls':>7}{'total s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'service s':>11}{'token s':>9}{'client s':>10}{'sent':>10}{'recv':>10}{'retries':>9}"
+        )
+        print(header, file=out)
+        for row in rows:
+            print(
+                f"{row['operation'][:35]:<36}{row['calls']:>7}{row['total_s']:>10.3f}{row['p50_ms']:>9.1f}"
+                f"{row['p95_ms']:>9.1f}{row['service_s']:>11.3f}{row['credential_s']:>9.3f}{row['client_s']:>10.3f}"
+                f"{row['bytes_sent']:>10}{row['bytes_received']:>10}{row['retries']:>9}",
+                file=out,
+            )
+        if self.dropped:
+            print(f"({self.dropped} oldest records dropped from the ring buffer)", file=out)
+
+
+_profiler: Optional[AgentProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Optional[AgentProfiler]:
+    """The process-wide profiler, or ``None`` when profiling is off."""
+
+    return _profiler
+
+
+def configure_profiling(enabled: Optional[bool] = None, output_dir: Optional[Path] = None) -> Optional[AgentProfiler]:
+    """Turn profiling on (``WORKSHOP_PROFILE`` when ``enabled`` is ``None``) and dump at exit."""
+
+    global _profiler
+    if not (profiling_enabled() if enabled is None else enabled):
+        return _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = AgentProfiler(int(os.getenv("WORKSHOP_PROFILE_BUFFER", "10000")))
+            directory = output_dir or Path(os.getenv("WORKSHOP_PROFILE_DIR", "profile"))
+            atexit.register(_dump_at_exit, _profiler, directory)
+            _logger.info("Profiling agent calls (エージェント呼び出しをプロファイルします) -> %s", directory)
+    return _profiler
+
+
+def _dump_at_exit(profiler: AgentProfiler, directory: Path) -> None:
+    if not profiler.records:
+        return
+    profiler.print_summary()
+    collapsed_path, speedscope_path = profiler.dump(directory)
+    print(f"Profile written to {collapsed_path} and {speedscope_path}", file=sys.stderr)
+
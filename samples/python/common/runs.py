@@ -0,0 +1,497 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator, Literal, Optional, TextIO
+
+from azure.ai.agents.models import AgentEventHandler, AsyncAgentEventHandler, ToolOutput
+from azure.core.exceptions import HttpResponseError
+
+from .http import parse_retry_after
+from .metrics import get_metrics
+from .tools import as_dispatcher
+from .usage import log_run_usage
+
+_logger = logging.getLogger(__name__)
+
+RunEventKind = Literal["status", "delta", "message", "tool_call", "error", "done"]
+
+def _value(item: Any) -> str:
+    """Return the plain string behind SDK string enums (``RunStatus``, ``AgentStreamEvent``...)."""
+
+    return str(getattr(item, "value", item))
+
+
+@dataclass(slots=True)
+class RunEvent:
+    """A simplified view over one Agent Service stream event."""
+
+    kind: RunEventKind
+    text: Optional[str] = None
+    status: Optional[str] = None
+    data: Any = None
+
+
+@dataclass(slots=True)
+class RunMetrics:
+    """Client-side timings for a streamed run (seconds, ``time.perf_counter`` based)."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    queued_at: Optional[float] = None
+    in_progress_at: Optional[float] = None
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class _RunStreamBase:
+    def __init__(
+        self,
+        agents_client: Any,
+        *,
+        thread_id: str,
+        agent_id: str,
+        functions: Optional[Any] = None,
+        **run_kwargs: Any,
+    ) -> None:
+        self._client = agents_client
+        self.thread_id = thread_id
+        self.agent_id = agent_id
+        self.functions = functions
+        self.run_kwargs = run_kwargs
+        self.run: Any = None
+        self.metrics = RunMetrics()
+        self._deltas: list[str] = []
+        self._awaiting_tools = False
+
+    @property
+    def text(self) -> str:
+        """Text streamed so far by the agent."""
+
+        return "".join(self._deltas)
+
+    def _translate(self, event_type: str, event_data: Any) -> Iterator[RunEvent]:
+        event_type = _value(event_type)
+
+        if event_type == "thread.message.delta":
+            text = getattr(event_data, "text", None)
+            if text:
+                if self.metrics.first_token_at is None:
+                    self.metrics.first_token_at = time.perf_counter()
+                self._deltas.append(text)
+                yield RunEvent("delta", text=text, data=event_data)
+        elif event_type == "thread.message.completed":
+            yield RunEvent("message", data=event_data)
+        elif event_type == "thread.run.step.completed":
+            if _value(getattr(event_data, "type", "")) == "tool_calls":
+                yield RunEvent("tool_call", data=event_data)
+        elif event_type.startswith("thread.run.") and not event_type.startswith("thread.run.step."):
+            self.run = event_data
+            status = _value(getattr(event_data, "status", ""))
+            self._awaiting_tools = status == "requires_action"
+            if status == "queued" and self.metrics.queued_at is None:
+                self.metrics.queued_at = time.perf_counter()
+            elif status == "in_progress" and self.metrics.in_progress_at is None:
+                self.metrics.in_progress_at = time.perf_counter()
+            yield RunEvent("status", status=status, data=event_data)
+            if status in {"failed", "cancelled", "expired", "incomplete"}:
+                yield RunEvent("error", status=status, data=getattr(event_data, "last_error", None))
+        elif event_type == "error":
+            yield RunEvent("error", text=str(event_data), data=event_data)
+        elif event_type == "done":
+            self.metrics.finished_at = time.perf_counter()
+            yield RunEvent("done", data=event_data)
+
+    def _pending_tool_calls(self) -> list[Any]:
+        """Return tool calls of a ``requires_action`` event that has not been answered yet."""
+
+        if not self._awaiting_tools:
+            return []
+        self._awaiting_tools = False
+        action = getattr(self.run, "required_action", None)
+        submit = getattr(action, "submit_tool_outputs", None)
+        return list(getattr(submit, "tool_calls", None) or [])
+
+
+class RunStream(_RunStreamBase):
+    """Create a run and iterate over its events as they arrive.
+
+    Iterating yields :class:`RunEvent` objects for status changes, message text deltas,
+    completed tool-call steps, errors and the final ``done`` marker. When ``functions`` (a
+    ``FunctionTool`` or a :class:`ToolDispatcher`) is given, the tool calls of each
+    ``requires_action`` step are executed locally in parallel and their outputs submitted
+    together on the same stream. After iteration, :attr:`run` holds the last run
+    object and :attr:`metrics` the client-side timings, including time to first token.
+
+    Parameters
+    ----------
+    agents_client:
+        ``project_client.agents``.
+    thread_id, agent_id:
+        The thread and agent to run.
+    functions:
+        Optional ``FunctionTool`` or :class:`ToolDispatcher` used to answer
+        ``requires_action`` tool calls.
+    run_kwargs:
+        Extra keyword arguments for ``runs.stream`` (e.g. ``additional_instructions``).
+    """
+
+    def __iter__(self) -> Iterator[RunEvent]:
+        handler = AgentEventHandler()
+        self.metrics = RunMetrics()
+        with self._client.runs.stream(
+            thread_id=self.thread_id, agent_id=self.agent_id, event_handler=handler, **self.run_kwargs
+        ) as stream:
+            for event_type, event_data, _ in stream:
+                yield from self._translate(event_type, event_data)
+                tool_calls = self._pending_tool_calls()
+                if tool_calls:
+                    self._client.runs.submit_tool_outputs_stream(
+                        thread_id=self.thread_id,
+                        run_id=self.run.id,
+                        tool_outputs=self._execute(tool_calls),
+                        event_handler=handler,
+                    )
+        if self.metrics.finished_at is None:
+            self.metrics.finished_at = time.perf_counter()
+        get_metrics().record_run(self.run, self.metrics, self.agent_id)
+
+    def _execute(self, tool_calls: list[Any]) -> list[ToolOutput]:
+        if self.functions is None:
+            raise RuntimeError("Run requires tool outputs but no functions were provided")
+        return as_dispatcher(self.functions).execute_all(tool_calls)
+
+
+class AsyncRunStream(_RunStreamBase):
+    """Async counterpart of :class:`RunStream` for ``azure.ai.projects.aio`` clients.
+
+    ``functions`` may be a ``FunctionTool`` or an ``AsyncFunctionTool``.
+    """
+
+    async def __aiter__(self) -> AsyncIterator[RunEvent]:
+        handler = AsyncAgentEventHandler()
+        self.metrics = RunMetrics()
+        async with await self._client.runs.stream(
+            thread_id=self.thread_id, agent_id=self.agent_id, event_handler=handler, **self.run_kwargs
+        ) as stream:
+            async for event_type, event_data, _ in stream:
+                for event in self._translate(event_type, event_data):
+                    yield event
+                tool_calls = self._pending_tool_calls()
+                if tool_calls:
+                    await self._client.runs.submit_tool_outputs_stream(
+                        thread_id=self.thread_id,
+                        run_id=self.run.id,
+                        tool_outputs=await self._execute(tool_calls),
+                        event_handler=handler,
+                    )
+        if self.metrics.finished_at is None:
+            self.metrics.finished_at = time.perf_counter()
+        get_metrics().record_run(self.run, self.metrics, self.agent_id)
+
+    async def _execute(self, tool_calls: list[Any]) -> list[ToolOutput]:
+        if self.functions is None:
+            raise RuntimeError("Run requires tool outputs but no functions were provided")
+        return await as_dispatcher(self.functions).execute_all_async(tool_calls)
+
+
+def echo_run(stream: RunStream, out: Optional[TextIO] = None) -> Any:
+    """Consume ``stream``, writing text deltas to ``out`` (default: the current ``sys.stdout``).
+
+    Tool-call steps and errors are logged, and time to first token and token usage are
+    logged once the run ends. Returns the final run object.
+    """
+
+    out = out if out is not None else sys.stdout
+    for event in stream:
+        if event.kind == "delta":
+            out.write(event.text or "")
+            out.flush()
+        elif event.kind == "tool_call":
+            _logger.info("Tool call step completed (ツール呼び出しが完了しました): %s", event.data.id)
+        elif event.kind == "error":
+            _logger.error("Run stream error (ストリーム エラー): %s", event.text or event.data)
+    if stream.text:
+        out.write("\n")
+        out.flush()
+
+    ttft = stream.metrics.time_to_first_token
+    if ttft is not None:
+        _logger.info(
+            "Time to first token: %.2fs, total: %.2fs (最初のトークンまでの時間 / 合計時間)",
+            ttft,
+            stream.metrics.duration or 0.0,
+        )
+    log_run_usage(stream.run)
+    return stream.run
+
+
+TERMINAL_RUN_STATUSES = frozenset({"completed", "failed", "cancelled", "expired", "incomplete"})
+_SLOW_STATUSES = frozenset({"queued", "requires_action", "cancelling"})
+_THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+
+@dataclass(slots=True)
+class PollPolicy:
+    """Adaptive polling schedule for run status checks.
+
+    The first ``fast_polls`` checks happen every ``initial_delay`` seconds so short runs are
+    picked up quickly. After that the delay grows by ``multiplier`` per check, capped at
+    ``max_delay`` while the run is queued or waiting on a tool, and at ``active_max_delay``
+    while it is in progress. ``jitter`` spreads polls of concurrent runs by ±that fraction.
+    """
+
+    initial_delay: float = 0.25
+    multiplier: float = 1.6
+    max_delay: float = 8.0
+    active_max_delay: float = 2.0
+    fast_polls: int = 3
+    jitter: float = 0.2
+    timeout: Optional[float] = 600.0
+
+    def next_delay(self, attempt: int, status: str, retry_after: Optional[float] = None) -> float:
+        if attempt < self.fast_polls:
+            delay = self.initial_delay
+        else:
+            cap = self.max_delay if status in _SLOW_STATUSES else self.active_max_delay
+            delay = min(cap, self.initial_delay * self.multiplier ** (attempt - self.fast_polls + 1))
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _get_run(agents_client: Any, thread_id: str, run_id: str) -> tuple[Any, Optional[float]]:
+    """Fetch a run, returning it with any ``Retry-After`` hint from the response."""
+
+    try:
+        return agents_client.runs.get(
+            thread_id=thread_id,
+            run_id=run_id,
+            cls=lambda response, run, _: (run, parse_retry_after(response.http_response.headers)),
+        )
+    except HttpResponseError as exc:
+        if exc.status_code not in _THROTTLE_STATUS_CODES or exc.response is None:
+            raise
+        _logger.warning("Run status poll throttled (ステータス確認がスロットリングされました): %s", exc.status_code)
+        return None, parse_retry_after(exc.response.headers)
+
+
+def _submit_tool_outputs(agents_client: Any, run: Any, functions: Any) -> None:
+    calls = run.required_action.submit_tool_outputs.tool_calls
+    outputs = as_dispatcher(functions).execute_all(calls)
+    agents_client.runs.submit_tool_outputs(thread_id=run.thread_id, run_id=run.id, tool_outputs=outputs)
+
+
+def wait_for_run(
+    agents_client: Any,
+    thread_id: str,
+    run_id: str,
+    *,
+    policy: Optional[PollPolicy] = None,
+    functions: Optional[Any] = None,
+) -> Any:
+    """Poll a run until it reaches a terminal status using an adaptive :class:`PollPolicy`.
+
+    ``requires_action`` steps are answered with ``functions`` when given; otherwise the run is
+    returned to the caller in that state.
+    """
+
+    policy = policy or PollPolicy()
+    deadline = None if policy.timeout is None else time.monotonic() + policy.timeout
+    attempt = 0
+    status = "queued"
+    retry_after: Optional[float] = None
+    while True:
+        time.sleep(policy.next_delay(attempt, status, retry_after))
+        run, retry_after = _get_run(agents_client, thread_id, run_id)
+        attempt += 1
+        if run is not None:
+            status = _value(run.status)
+            if status in TERMINAL_RUN_STATUSES:
+                get_metrics().record_run(run)
+                return run
+            if status == "requires_action":
+                if functions is None:
+                    return run
+                _submit_tool_outputs(agents_client, run, functions)
+                attempt = 0
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Run {run_id} did not finish within {policy.timeout}s")
+
+
+@dataclass(order=True, slots=True)
+class _ScheduledPoll:
+    due: float
+    sequence: int
+    agents_client: Any = field(compare=False)
+    thread_id: str = field(compare=False)
+    run_id: str = field(compare=False)
+    functions: Any = field(compare=False)
+    future: Future = field(compare=False)
+    deadline: Optional[float] = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+    status: str = field(default="queued", compare=False)
+
+
+class RunPollScheduler:
+    """Multiplex status polling for many concurrent runs onto a fixed set of threads.
+
+    One scheduler thread keeps a heap of due polls; the status requests themselves run on a
+    small pool of ``poll_workers`` threads, so the thread count does not grow with the number
+    of runs being waited on. Each run follows ``policy`` and honours ``Retry-After``.
+
+    Use as a context manager, or call :meth:`close` when finished.
+    """
+
+    def __init__(self, policy: Optional[PollPolicy] = None, poll_workers: int = 4) -> None:
+        self.policy = policy or PollPolicy()
+        self.poll_count = 0
+        self.throttled_count = 0
+        self._heap: list[_ScheduledPoll] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=poll_workers, thread_name_prefix="run-poll")
+        self._thread = threading.Thread(target=self._loop, name="run-poll-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self, agents_client: Any, thread_id: str, run_id: str, *, functions: Optional[Any] = None
+    ) -> Future:
+        """Start waiting for a run; the returned future resolves to the terminal run."""
+
+        timeout = self.policy.timeout
+        entry = _ScheduledPoll(
+            due=time.monotonic() + self.policy.initial_delay,
+            sequence=next(self._sequence),
+            agents_client=agents_client,
+            thread_id=thread_id,
+            run_id=run_id,
+            functions=functions,
+            future=Future(),
+            deadline=None if timeout is None else time.monotonic() + timeout,
+        )
+        self._schedule(entry)
+        return entry.future
+
+    def wait(self, agents_client: Any, thread_id: str, run_id: str, *, functions: Optional[Any] = None) -> Any:
+        return self.submit(agents_client, thread_id, run_id, functions=functions).result()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        for entry in self._heap:
+            entry.future.cancel()
+
+    def __enter__(self) -> "RunPollScheduler":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _schedule(self, entry: _ScheduledPoll) -> None:
+        with self._condition:
+            if self._closed:
+                entry.future.set_exception(RuntimeError("RunPollScheduler is closed"))
+                return
+            heapq.heappush(self._heap, entry)
+            self._condition.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and (not self._heap or self._heap[0].due > time.monotonic()):
+                    timeout = self._heap[0].due - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+                entry = heapq.heappop(self._heap)
+            self._executor.submit(self._poll, entry)
+
+    def _poll(self, entry: _ScheduledPoll) -> None:
+        try:
+            run, retry_after = _get_run(entry.agents_client, entry.thread_id, entry.run_id)
+            with self._condition:
+                self.poll_count += 1
+                self.throttled_count += run is None
+            if run is not None:
+                entry.status = _value(run.status)
+                if entry.status in TERMINAL_RUN_STATUSES or (
+                    entry.status == "requires_action" and entry.functions is None
+                ):
+                    if entry.status in TERMINAL_RUN_STATUSES:
+                        get_metrics().record_run(run)
+                    entry.future.set_result(run)
+                    return
+                if entry.status == "requires_action":
+                    _submit_tool_outputs(entry.agents_client, run, entry.functions)
+                    entry.attempt = -1
+            if entry.deadline is not None and time.monotonic() > entry.deadline:
+                raise TimeoutError(f"Run {entry.run_id} did not finish within {self.policy.timeout}s")
+            entry.attempt += 1
+            entry.due = time.monotonic() + self.policy.next_delay(entry.attempt, entry.status, retry_after)
+            entry.sequence = next(self._sequence)
+            self._schedule(entry)
+        except BaseException as exc:  # propagate to the waiting caller
+            entry.future.set_exception(exc)
+
+
+async def async_wait_for_run(
+    agents_client: Any,
+    thread_id: str,
+    run_id: str,
+    *,
+    policy: Optional[PollPolicy] = None,
+) -> Any:
+    """Async variant of :func:`wait_for_run`; the event loop multiplexes concurrent waits."""
+
+    policy = policy or PollPolicy()
+    deadline = None if policy.timeout is None else time.monotonic() + policy.timeout
+    attempt = 0
+    status = "queued"
+    retry_after: Optional[float] = None
+    while True:
+        await asyncio.sleep(policy.next_delay(attempt, status, retry_after))
+        try:
+            run, retry_after = await agents_client.runs.get(
+                thread_id=thread_id,
+                run_id=run_id,
+                cls=lambda response, run, _: (run, parse_retry_after(response.http_response.headers)),
+            )
+        except HttpResponseError as exc:
+            if exc.status_code not in _THROTTLE_STATUS_CODES or exc.response is None:
+                raise
+            run, retry_after = None, parse_retry_after(exc.response.headers)
+        attempt += 1
+        if run is not None:
+            status = _value(run.status)
+            if status in TERMINAL_RUN_STATUSES or status == "requires_action":
+                if status in TERMINAL_RUN_STATUSES:
+                    get_metrics().record_run(run)
+                return run
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Run {run_id} did not finish within {policy.timeout}s")
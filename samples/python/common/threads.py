@@ -1,26 +1,255 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional
 
 from azure.ai.agents.models import MessageRole
 
+from .metrics import THREAD_CREATE, get_metrics
+
 _logger = logging.getLogger(__name__)
 
 
-def pretty_print_messages(messages: Iterable) -> None:
-    """Log agent thread messages in chronological order."""
+def _role(message: Any) -> str:
+    role = getattr(message, "role", "unknown")
+    return role.value if isinstance(role, MessageRole) else str(role)
+
+
+def pretty_print_messages(messages: Iterable, max_chars: Optional[int] = None) -> None:
+    """Log agent thread messages in the order given.
+
+    Messages are consumed one at a time, so passing :meth:`MessageReader.new_messages` (or
+    any lazy iterator) keeps memory bounded by a single page. ``max_chars`` truncates long
+    text items in the log.
+    """
 
     for message in messages:
-        role = getattr(message, "role", "unknown")
-        if isinstance(role, MessageRole):
-            role = role.value
-        text_items = []
+        role = _role(message)
+        logged = False
         for content in getattr(message, "text_messages", []):
-            text_items.append(content.text.value)
-        if not text_items and hasattr(message, "content"):
+            _logger.info("%s: %s", role, _truncate(content.text.value, max_chars))
+            logged = True
+        if not logged and hasattr(message, "content"):
             # Fallback for REST-shaped responses
-            text_items.append(str(getattr(message, "content")))
+            _logger.info("%s: %s", role, _truncate(str(getattr(message, "content")), max_chars))
+
+
+def _truncate(text: str, max_chars: Optional[int]) -> str:
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}… (+{len(text) - max_chars} chars)"
+
+
+class MessageReader:
+    """Read thread messages lazily, one page per request, with cursors.
+
+    ``messages.list`` returns an ``ItemPaged`` that walks the whole thread and, after the
+    last page, asks the service for one more (empty) page. The reader fetches ``page_size``
+    messages per request, stops after a short page, and remembers the newest message it
+    has returned per thread so :meth:`new_messages` only fetches what was added since the
+    previous turn.
+
+    Parameters
+    ----------
+    agents_client:
+        ``project_client.agents``.
+    page_size:
+        Messages per request (the service allows 1–100).
+    max_threads:
+        Number of threads whose cursor is remembered; the least recently used is dropped.
+    """
+
+    def __init__(self, agents_client: Any, *, page_size: int = 20, max_threads: int = 1024) -> None:
+        self._client = agents_client
+        self.page_size = page_size
+        self.max_threads = max_threads
+        self._cursors: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def iter_messages(
+        self,
+        thread_id: str,
+        *,
+        order: str = "asc",
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        run_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """Yield messages in ``order`` between the ``after`` and ``before`` cursors.
+
+        Pages are requested as the iterator is consumed; stop early (or pass ``limit``) and
+        no further requests are made.
+        """
+
+        page_size = min(self.page_size, limit) if limit else self.page_size
+        pages = self._client.messages.list(
+            thread_id=thread_id, run_id=run_id, limit=page_size, order=order, before=before
+        ).by_page(continuation_token=after)
+        returned = 0
+        for page in pages:
+            count = 0
+            for message in page:
+                count += 1
+                returned += 1
+                yield message
+                if limit is not None and returned >= limit:
+                    return
+            if count < page_size:
+                return  # A short page is the last one; skip the empty follow-up request.
+
+    def new_messages(self, thread_id: str, *, run_id: Optional[str] = None) -> Iterator[Any]:
+        """Yield messages added since the previous call for ``thread_id``, oldest first.
+
+        The cursor advances as messages are consumed, so an interrupted iteration resumes
+        where it stopped. The first call for a thread reads it from the beginning; call
+        :meth:`mark_seen` first to skip existing history.
+        """
+
+        for message in self.iter_messages(thread_id, order="asc", after=self.cursor(thread_id), run_id=run_id):
+            self.mark_seen(thread_id, message.id)
+            yield message
+
+    def latest(self, thread_id: str, *, role: Optional[str] = "assistant", run_id: Optional[str] = None) -> Any:
+        """Return the newest message (from ``role``, if given), or ``None``; reads newest first."""
+
+        for message in self.iter_messages(thread_id, order="desc", run_id=run_id):
+            if role is None or _role(message) == role:
+                return message
+        return None
+
+    def cursor(self, thread_id: str) -> Optional[str]:
+        """ID of the newest message returned for ``thread_id`` so far."""
+
+        with self._lock:
+            cursor = self._cursors.get(thread_id)
+            if cursor is not None:
+                self._cursors.move_to_end(thread_id)
+            return cursor
+
+    def mark_seen(self, thread_id: str, message_id: str) -> None:
+        with self._lock:
+            self._cursors[thread_id] = message_id
+            self._cursors.move_to_end(thread_id)
+            while len(self._cursors) > self.max_threads:
+                self._cursors.popitem(last=False)
+
+    def forget(self, thread_id: str) -> None:
+        with self._lock:
+            self._cursors.pop(thread_id, None)
+
+
+def discard_thread(agents_client: Any, thread_id: str) -> None:
+    """Delete a thread, logging instead of raising when cleanup fails."""
+
+    try:
+        agents_client.threads.delete(thread_id)
+    except Exception as exc:  # pragma: no cover - best-effort cleanup
+        _logger.warning("Failed to delete thread %s (スレッドを削除できませんでした): %s", thread_id, exc)
+
+
+class AgentThreadPool:
+    """Hand out pre-created agent threads and delete them in the background after use.
+
+    ``size`` threads are created ahead of time on a small worker pool; every
+    :meth:`acquire` takes one (creating it inline only when the pool is empty) and schedules
+    a replacement. :meth:`release` deletes the thread asynchronously. Threads are never handed
+    out twice, so no conversation history leaks between requests.
+
+    Parameters
+    ----------
+    agents_client:
+        ``project_client.agents``.
+    size:
+        Number of ready threads to keep.
+    workers:
+        Background threads used for create and delete calls.
+    """
+
+    def __init__(self, agents_client: Any, size: int = 4, *, workers: int = 2) -> None:
+        self._client = agents_client
+        self.size = size
+        self._ready: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-threads")
+        self._lock = threading.Lock()
+        self._creating = 0
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self._replenish()
+
+    def acquire(self) -> str:
+        """Return the ID of an unused thread."""
+
+        try:
+            thread_id = self._ready.get_nowait()
+            with self._lock:
+                self.hits += 1
+        except queue.Empty:
+            thread_id = self._create()
+            with self._lock:
+                self.misses += 1
+        self._replenish()
+        return thread_id
+
+    def release(self, thread_id: str) -> None:
+        """Schedule deletion of a thread that is no longer needed."""
+
+        with self._lock:
+            if not self._closed:
+                self._executor.submit(discard_thread, self._client, thread_id)
+                return
+        discard_thread(self._client, thread_id)
+
+    @contextmanager
+    def lease(self) -> Iterator[str]:
+        thread_id = self.acquire()
+        try:
+            yield thread_id
+        finally:
+            self.release(thread_id)
+
+    def close(self) -> None:
+        """Delete unused ready threads and wait for pending deletions."""
+
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                discard_thread(self._client, self._ready.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> "AgentThreadPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _replenish(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - self._ready.qsize() - self._creating
+            self._creating += max(0, missing)
+            for _ in range(missing):
+                self._executor.submit(self._create_ready)
+
+    def _create(self) -> str:
+        with get_metrics().time(THREAD_CREATE):
+            return self._client.threads.create().id
 
-        for line in text_items:
-            _logger.info("%s: %s", role, line)
+    def _create_ready(self) -> None:
+        try:
+            self._ready.put(self._create())
+        except Exception as exc:  # pragma: no cover - acquire falls back to inline creation
+            _logger.warning("Failed to pre-create thread (スレッドの事前作成に失敗しました): %s", exc)
+        finally:
+            with self._lock:
+                self._creating -= 1
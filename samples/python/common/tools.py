@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import inspect
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from azure.ai.agents.models import ToolOutput
+
+from .deadline import remaining_budget
+from .metrics import TOOL_CALL, get_metrics
+
+_logger = logging.getLogger(__name__)
+
+_TOOL_NAME = "gen_ai.tool.name"
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool-call")
+        return _shared_executor
+
+
+@dataclass(slots=True)
+class ToolLimits:
+    """Per-function limits applied by :class:`ToolDispatcher`."""
+
+    timeout: Optional[float] = None
+    max_concurrency: Optional[int] = None
+
+
+def _function_name(call: Any) -> str:
+    function = getattr(call, "function", None)
+    return getattr(function, "name", "") or ""
+
+
+def _error_output(message: str) -> str:
+    return json.dumps({"error": message})
+
+
+class ToolDispatcher:
+    """Execute the tool calls of one ``requires_action`` step concurrently.
+
+    Wraps a ``FunctionTool`` / ``AsyncFunctionTool`` (or anything with ``execute(call)`` and
+    ``definitions``). Calls run on a thread pool, or as asyncio tasks in
+    :meth:`execute_all_async`, and every output is returned together so it can be submitted
+    in one request. A call that exceeds its timeout (capped by the run's remaining budget)
+    is answered with a JSON error instead of holding up the others; ``max_concurrency``
+    limits how many calls of one function run at once across all runs sharing the
+    dispatcher.
+
+    Parameters
+    ----------
+    functions:
+        The tool whose ``execute`` answers a single call.
+    limits:
+        Optional :class:`ToolLimits` by function name.
+    default_timeout:
+        Timeout for functions without their own limit; ``None`` waits indefinitely.
+    executor:
+        Thread pool to run calls on. Defaults to a process-wide pool of eight threads.
+    """
+
+    def __init__(
+        self,
+        functions: Any,
+        *,
+        limits: Optional[dict[str, ToolLimits]] = None,
+        default_timeout: Optional[float] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ) -> None:
+        self.functions = functions
+        self.limits = dict(limits or {})
+        self.default_timeout = default_timeout
+        self._executor = executor
+        self._slots = {
+            name: threading.BoundedSemaphore(limit.max_concurrency)
+            for name, limit in self.limits.items()
+            if limit.max_concurrency
+        }
+        self._async_slots: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def definitions(self) -> Any:
+        return self.functions.definitions
+
+    def _timeout(self, name: str) -> Optional[float]:
+        limit = self.limits.get(name)
+        timeout = limit.timeout if limit is not None and limit.timeout is not None else self.default_timeout
+        budget = remaining_budget()
+        if budget is not None:
+            timeout = max(0.0, budget) if timeout is None else max(0.0, min(timeout, budget))
+        return timeout
+
+    def _run(self, call: Any) -> Any:
+        name = _function_name(call)
+        slot = self._slots.get(name)
+        # Timed inside the slot, like _run_async: waiting for a slot is queueing, not tool latency.
+        with slot if slot is not None else contextlib.nullcontext():
+            with get_metrics().time(TOOL_CALL, **{_TOOL_NAME: name}):
+                return self.functions.execute(call)
+
+    def execute(self, call: Any) -> Any:
+        """Answer a single call; same contract as ``FunctionTool.execute``."""
+
+        return self.execute_all([call])[0].output
+
+    def execute_all(self, tool_calls: list[Any]) -> list[ToolOutput]:
+        """Run ``tool_calls`` in parallel and return their outputs in the original order."""
+
+        if len(tool_calls) == 1 and self._timeout(_function_name(tool_calls[0])) is None:
+            # Nothing to overlap or bound; skip the thread hop.
+            return [ToolOutput(tool_call_id=tool_calls[0].id, output=self._run(tool_calls[0]))]
+
+        executor = self._executor or _default_executor()
+        started = time.perf_counter()
+        futures = [
+            # Copy the context so tools still see the caller's run_deadline().
+            (
+                call,
+                self._timeout(_function_name(call)),
+                executor.submit(contextvars.copy_context().run, self._run, call),
+            )
+            for call in tool_calls
+        ]
+        outputs = []
+        for call, timeout, future in futures:
+            name = _function_name(call)
+            try:
+                wait = None if timeout is None else max(0.0, started + timeout - time.perf_counter())
+                output = future.result(timeout=wait)
+            except FutureTimeoutError:
+                future.cancel()
+                get_metrics().failure(TOOL_CALL, **{_TOOL_NAME: name, "reason": "timeout"})
+                _logger.warning("Tool call timed out (ツール呼び出しがタイムアウトしました): %s", name)
+                output = _error_output(f"Function '{name}' did not finish within {timeout:.1f}s")
+            except Exception as exc:  # noqa: BLE001 - reported back to the agent
+                output = _error_output(f"Error executing function '{name}': {exc}")
+            outputs.append(ToolOutput(tool_call_id=call.id, output=output))
+        _logger.debug("Executed %d tool calls in %.3fs", len(tool_calls), time.perf_counter() - started)
+        return outputs
+
+    async def _run_async(self, call: Any) -> Any:
+        name = _function_name(call)
+        limit = self.limits.get(name)
+        slot = None
+        if limit is not None and limit.max_concurrency:
+            slot = self._async_slots.setdefault(name, asyncio.Semaphore(limit.max_concurrency))
+        if slot is not None:
+            await slot.acquire()
+        started = time.perf_counter()
+        try:
+            execute = self.functions.execute
+            if inspect.iscoroutinefunction(execute):
+                return await execute(call)
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            output = await loop.run_in_executor(self._executor or _default_executor(), context.run, execute, call)
+            if inspect.isawaitable(output):
+                output = await output
+            return output
+        except Exception:
+            get_metrics().failure(TOOL_CALL, **{_TOOL_NAME: name})
+            raise
+        finally:
+            get_metrics().record(TOOL_CALL, time.perf_counter() - started, **{_TOOL_NAME: name})
+            if slot is not None:
+                slot.release()
+
+    async def _answer_async(self, call: Any) -> ToolOutput:
+        name = _function_name(call)
+        timeout = self._timeout(name)
+        try:
+            output = await asyncio.wait_for(self._run_async(call), timeout)
+        except asyncio.TimeoutError:
+            get_metrics().failure(TOOL_CALL, **{_TOOL_NAME: name, "reason": "timeout"})
+            _logger.warning("Tool call timed out (ツール呼び出しがタイムアウトしました): %s", name)
+            output = _error_output(f"Function '{name}' did not finish within {timeout:.1f}s")
+        except Exception as exc:  # noqa: BLE001 - reported back to the agent
+            output = _error_output(f"Error executing function '{name}': {exc}")
+        return ToolOutput(tool_call_id=call.id, output=output)
+
+    async def execute_all_async(self, tool_calls: list[Any]) -> list[ToolOutput]:
+        """Async variant of :meth:`execute_all` running each call as a task."""
+
+        return list(await asyncio.gather(*(self._answer_async(call) for call in tool_calls)))
+
+
+def as_dispatcher(functions: Any) -> ToolDispatcher:
+    """Return ``functions`` as a :class:`ToolDispatcher`, wrapping plain function tools."""
+
+    return functions if isinstance(functions, ToolDispatcher) else ToolDispatcher(functions)
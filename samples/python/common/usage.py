@@ -0,0 +1,131 @@
+"""Token usage accounting for agent runs.
+
+Every finished run carries ``run.usage`` (prompt and completion tokens). A
+:class:`UsageAccountant` adds them up per phase (or any other label) and, with a token
+``budget``, tells the caller when to stop starting new runs. Tokens per minute are the
+quota a deployment is throttled on, so the budget is the knob that bounds throughput cost.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class TokenPricing:
+    """Price per 1,000 prompt and completion tokens, in any currency."""
+
+    prompt_per_1k: float
+    completion_per_1k: float
+
+    @classmethod
+    def from_env(cls) -> Optional["TokenPricing"]:
+        """Read ``WORKSHOP_PROMPT_PRICE_PER_1K`` / ``WORKSHOP_COMPLETION_PRICE_PER_1K``; ``None`` when unset."""
+
+        prompt = os.getenv("WORKSHOP_PROMPT_PRICE_PER_1K")
+        completion = os.getenv("WORKSHOP_COMPLETION_PRICE_PER_1K")
+        if not prompt and not completion:
+            return None
+        return cls(float(prompt or 0), float(completion or 0))
+
+
+@dataclass(slots=True)
+class TokenUsage:
+    """Prompt and completion tokens summed over ``runs`` runs."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    runs: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, usage: Any) -> None:
+        """Add a ``run.usage`` object (or another :class:`TokenUsage`); ``None`` counts as a run without usage."""
+
+        self.prompt_tokens += getattr(usage, "prompt_tokens", None) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", None) or 0
+        self.runs += usage.runs if isinstance(usage, TokenUsage) else 1
+
+    def cost(self, pricing: TokenPricing) -> float:
+        return (self.prompt_tokens * pricing.prompt_per_1k + self.completion_tokens * pricing.completion_per_1k) / 1000
+
+
+def log_run_usage(run: Any) -> None:
+    """Log the token usage of a finished run, if the service reported one."""
+
+    usage = getattr(run, "usage", None)
+    if usage is None:
+        return
+    _logger.info(
+        "Token usage (トークン使用量): prompt=%s, completion=%s, total=%s",
+        usage.prompt_tokens,
+        usage.completion_tokens,
+        usage.total_tokens,
+    )
+
+
+class UsageAccountant:
+    """Thread-safe token totals per phase for one workflow, with an optional budget.
+
+    Usage is only reported once a run finishes, so a budget cannot interrupt a run that is
+    already going; it stops the workflow before the next run is started. A sequential
+    workflow may therefore overshoot by the size of the run that crossed the budget. With
+    runs in parallel, every other run in flight may finish too (up to concurrency × run
+    size) unless the caller cancels them once :attr:`exhausted` turns true, as
+    ``AsyncConnectedAgentsOrchestrator`` does; cancelled runs still bill the tokens they used.
+
+    Parameters
+    ----------
+    budget:
+        Maximum total tokens for the workflow. ``None`` disables the check.
+    """
+
+    def __init__(self, budget: Optional[int] = None) -> None:
+        self.budget = budget
+        self._phases: dict[str, TokenUsage] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, run: Any) -> None:
+        """Add the usage of ``run`` to ``phase``."""
+
+        with self._lock:
+            self._phases.setdefault(phase, TokenUsage()).add(getattr(run, "usage", None))
+
+    @property
+    def phases(self) -> dict[str, TokenUsage]:
+        with self._lock:
+            return {
+                phase: TokenUsage(usage.prompt_tokens, usage.completion_tokens, usage.runs)
+                for phase, usage in self._phases.items()
+            }
+
+    @property
+    def total(self) -> TokenUsage:
+        total = TokenUsage()
+        for usage in self.phases.values():
+            total.add(usage)
+        return total
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.budget is None:
+            return None
+        return max(0, self.budget - self.total.total_tokens)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining == 0
+
+    def describe(self) -> str:
+        """``"<used> / <budget> tokens"`` for log and result messages."""
+
+        used = self.total.total_tokens
+        return f"{used:,} tokens" if self.budget is None else f"{used:,} / {self.budget:,} tokens"
@@ -0,0 +1 @@
+"""Local Agent Service emulator and load generator for offline load and latency testing."""
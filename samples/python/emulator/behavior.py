@@ -0,0 +1,210 @@
+"""Latency, rate-limit and fault models for the Agent Service emulator.
+
+Latencies are :class:`Distribution` objects parsed from short specs, so they can be given on
+the command line::
+
+    0.05                 constant 50 ms
+    const:0.05           the same
+    uniform:0.02,0.08    uniform between 20 and 80 ms
+    normal:0.5,0.1       mean 500 ms, standard deviation 100 ms (clamped at 0)
+    lognormal:0.8,0.4    median 800 ms, sigma 0.4 — the usual shape of service latencies
+    exp:0.3              exponential with mean 300 ms
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+_ARITY = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+
+
+@dataclass(frozen=True, slots=True)
+class Distribution:
+    """A non-negative random variable; see the module docstring for the spec syntax."""
+
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, _, values = spec.partition(":")
+        if not values:
+            kind, values = "const", kind
+        kind = kind.strip().lower()
+        if kind not in _ARITY:
+            raise ValueError(f"unknown distribution {kind!r}; choose from {', '.join(_ARITY)}")
+        params = tuple(float(value) for value in values.split(","))
+        if len(params) != _ARITY[kind]:
+            raise ValueError(f"{kind} takes {_ARITY[kind]} parameter(s), got {len(params)}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        kind, params = self.kind, self.params
+        if kind == "const":
+            value = params[0]
+        elif kind == "uniform":
+            value = rng.uniform(*params)
+        elif kind == "normal":
+            value = rng.gauss(*params)
+        elif kind == "lognormal":
+            value = rng.lognormvariate(math.log(params[0]), params[1]) if params[0] > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(f'{value:g}' for value in self.params)}"
+
+
+def distribution(spec: str) -> Distribution:
+    """``argparse`` type for :class:`Distribution` specs."""
+
+    return Distribution.parse(spec)
+
+
+class TokenBucket:
+    """Rate limiter refilled continuously at ``per_minute`` units, bursting up to a minute's worth."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.per_minute = per_minute
+        self._clock = clock
+        self._level = per_minute
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def take(self, amount: float) -> float:
+        """Take ``amount`` units; returns 0, or the seconds to wait when the bucket is short."""
+
+        amount = min(amount, self.per_minute)
+        with self._lock:
+            now = self._clock()
+            self._level = min(self.per_minute, self._level + (now - self._updated) * self.per_minute / 60.0)
+            self._updated = now
+            if self._level >= amount:
+                self._level -= amount
+                return 0.0
+            return (amount - self._level) * 60.0 / self.per_minute
+
+
+@dataclass(slots=True)
+class EmulatorProfile:
+    """How the emulated service behaves.
+
+    Attributes
+    ----------
+    request_latency:
+        Added to every API request (thread, message, run and agent calls).
+    queue_latency:
+        Time a run spends ``queued`` before it starts.
+    first_token_latency:
+        Time from a run starting (or resuming after tool outputs) to its first text token.
+    tool_latency:
+        Duration of a server-side tool call (AI Search, code interpreter, connected agent).
+    tokens_per_second:
+        Generation speed of the streamed answer.
+    completion_tokens:
+        Length of each answer in tokens.
+    requests_per_minute:
+        API request rate limit; requests over it get ``429`` with ``Retry-After``.
+    tokens_per_minute:
+        Model token quota shared by all runs; runs over it fail with ``rate_limit_exceeded``,
+        as they do on the real service.
+    max_active_runs:
+        Runs processed at once; later runs stay ``queued`` until one finishes.
+    throttle_rate, error_rate:
+        Fraction of API requests answered with an injected ``429`` or ``500``.
+    run_failure_rate:
+        Fraction of runs that fail with ``server_error``.
+    seed:
+        Seed for every random choice, for reproducible runs.
+    """
+
+    request_latency: Distribution = field(default_factory=lambda: Distribution.parse("lognormal:0.04,0.3"))
+    queue_latency: Distribution = field(default_factory=lambda: Distribution.parse("lognormal:0.3,0.5"))
+    first_token_latency: Distribution = field(default_factory=lambda: Distribution.parse("lognormal:0.8,0.4"))
+    tool_latency: Distribution = field(default_factory=lambda: Distribution.parse("lognormal:1.0,0.5"))
+    tokens_per_second: float = 50.0
+    completion_tokens: Distribution = field(default_factory=lambda: Distribution.parse("normal:150,40"))
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_active_runs: Optional[int] = None
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    run_failure_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the :class:`EmulatorProfile` options to ``parser``."""
+
+    defaults = EmulatorProfile()
+    group = parser.add_argument_group("emulated service behaviour")
+    group.add_argument(
+        "--request-latency",
+        type=distribution,
+        default=defaults.request_latency,
+        help="Latency added to each API request (default %(default)s)",
+    )
+    group.add_argument(
+        "--queue-latency",
+        type=distribution,
+        default=defaults.queue_latency,
+        help="Time a run stays queued (default %(default)s)",
+    )
+    group.add_argument(
+        "--first-token-latency",
+        type=distribution,
+        default=defaults.first_token_latency,
+        help="Time to the first token of an answer (default %(default)s)",
+    )
+    group.add_argument(
+        "--tool-latency",
+        type=distribution,
+        default=defaults.tool_latency,
+        help="Duration of server-side tool calls (default %(default)s)",
+    )
+    group.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=defaults.tokens_per_second,
+        help="Answer generation speed (default %(default)s)",
+    )
+    group.add_argument(
+        "--completion-tokens",
+        type=distribution,
+        default=defaults.completion_tokens,
+        help="Answer length in tokens (default %(default)s)",
+    )
+    group.add_argument("--rpm", type=float, default=None, help="API requests per minute before 429")
+    group.add_argument("--tpm", type=float, default=None, help="Model tokens per minute before runs fail")
+    group.add_argument("--max-active-runs", type=int, default=None, help="Runs processed at once by the service")
+    group.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    group.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    group.add_argument("--run-failure-rate", type=float, default=0.0, help="Fraction of runs that fail")
+    group.add_argument("--seed", type=int, default=None, help="Random seed")
+
+
+def profile_from_args(args: argparse.Namespace) -> EmulatorProfile:
+    return EmulatorProfile(
+        request_latency=args.request_latency,
+        queue_latency=args.queue_latency,
+        first_token_latency=args.first_token_latency,
+        tool_latency=args.tool_latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_active_runs=args.max_active_runs,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        run_failure_rate=args.run_failure_rate,
+        seed=args.seed,
+    )
@@ -0,0 +1,247 @@
+"""Load generator that drives samples 01–04 against the emulator at a target request rate.
+
+Starts an in-process :class:`~.server.EmulatorServer`, points the samples at it with
+:meth:`~.server.EmulatorServer.environment` and calls each sample's ``main()`` on an open-loop
+schedule: requests start at the target rate whether or not earlier ones have finished, so
+a saturated client or service shows up as latency, not as a quietly lower request rate.
+Latency is measured from each request's scheduled start and so includes time spent waiting
+for a free worker. Scenarios are interleaved round-robin::
+
+    python -m samples.python.emulator.loadgen --rps 5 --duration 60 --scenarios 01,02,03,04
+    python -m samples.python.emulator.loadgen --rps 20 --tpm 200000 --throttle-rate 0.05 --json load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from ..common.config import load_env_file
+from .behavior import add_profile_arguments, profile_from_args
+from .server import EmulatorServer
+
+_logger = logging.getLogger("emulator.loadgen")
+
+SCENARIOS = {
+    "01": "01_minimal_agent.main",
+    "02": "02_ai_search_rag.main",
+    "03": "03_logic_app_tool.main",
+    "04": "04_connected_agents.stock_price_example",
+}
+# Settings that would send a sample somewhere other than the emulator.
+_CLEARED_ENV = (
+    "AZURE_CLIENT_ID",
+    "AZURE_CLIENT_SECRET",
+    "AZURE_TENANT_ID",
+    "AZURE_FEDERATED_TOKEN_FILE",
+    "WORKSHOP_RAG_LOCAL_INDEX",
+    "LOGIC_APP_ASYNC_PATTERN",
+)
+
+
+@dataclass(slots=True)
+class RequestSample:
+    scenario: str
+    scheduled: float
+    started: float
+    finished: float
+    ok: bool
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.scheduled
+
+
+@dataclass(slots=True)
+class ScenarioReport:
+    scenario: str
+    requests: int
+    failures: int
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Linearly interpolated percentile of sorted ``values`` (``fraction`` in 0..1)."""
+
+    if not values:
+        return math.nan
+    position = fraction * (len(values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(samples: list[RequestSample], elapsed: float) -> list[ScenarioReport]:
+    """One report per scenario, then ``all``; latency percentiles cover successful requests."""
+
+    groups: dict[str, list[RequestSample]] = {}
+    for sample in samples:
+        groups.setdefault(sample.scenario, []).append(sample)
+    groups["all"] = samples
+
+    reports = []
+    for scenario, group in groups.items():
+        latencies = sorted(sample.latency * 1000 for sample in group if sample.ok)
+        reports.append(
+            ScenarioReport(
+                scenario=scenario,
+                requests=len(group),
+                failures=sum(not sample.ok for sample in group),
+                throughput=len(latencies) / elapsed if elapsed > 0 else 0.0,
+                p50_ms=percentile(latencies, 0.50),
+                p90_ms=percentile(latencies, 0.90),
+                p95_ms=percentile(latencies, 0.95),
+                p99_ms=percentile(latencies, 0.99),
+                max_ms=latencies[-1] if latencies else math.nan,
+            )
+        )
+    return reports
+
+
+def _point_samples_at(server: EmulatorServer, workers: int) -> None:
+    # Load .env first: it is loaded once per process, so it cannot override these later.
+    load_env_file()
+    for name in _CLEARED_ENV:
+        os.environ.pop(name, None)
+    os.environ.update(server.environment())
+    os.environ["WORKSHOP_HTTP_POOL_SIZE"] = str(workers)
+
+
+def _sample_mains(names: list[str]) -> dict[str, Callable[[], int]]:
+    package = __package__.rsplit(".", 1)[0]
+    return {name: importlib.import_module(f"{package}.{SCENARIOS[name]}").main for name in names}
+
+
+def _call(scenario: str, run: Callable[[], int], scheduled: float) -> RequestSample:
+    started = time.perf_counter()
+    try:
+        ok = run() == 0
+    except Exception as exc:  # noqa: BLE001 - counted as a failed request
+        _logger.debug("Scenario %s raised: %s", scenario, exc)
+        ok = False
+    return RequestSample(scenario, scheduled, started, time.perf_counter(), ok)
+
+
+def generate_load(
+    mains: dict[str, Callable[[], int]],
+    *,
+    rps: float,
+    duration: float,
+    workers: int,
+    poisson: bool = False,
+    seed: Optional[int] = None,
+) -> tuple[list[RequestSample], float]:
+    """Start ``rps * duration`` requests on schedule; returns the samples and elapsed seconds."""
+
+    rng = random.Random(seed)
+    names = list(mains)
+    total = max(1, round(rps * duration))
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loadgen") as executor:
+        start = scheduled = time.perf_counter()
+        for index in range(total):
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name = names[index % len(names)]
+            futures.append(executor.submit(_call, name, mains[name], scheduled))
+            scheduled += rng.expovariate(rps) if poisson else 1.0 / rps
+        samples = [future.result() for future in futures]
+    return samples, max(sample.finished for sample in samples) - start
+
+
+def _print_report(reports: list[ScenarioReport], stats: dict[str, Any], rps: float, elapsed: float) -> None:
+    print(f"Offered {rps:g} rps; finished in {elapsed:.1f}s")
+    header = ("scenario", "requests", "failed", "rps", "p50 ms", "p90 ms", "p95 ms", "p99 ms", "max ms")
+    print(f"{header[0]:<10}{header[1]:>9}{header[2]:>8}" + "".join(f"{title:>9}" for title in header[3:]))
+    for report in reports:
+        print(
+            f"{report.scenario:<10}{report.requests:>9}{report.failures:>8}{report.throughput:>9.2f}"
+            f"{report.p50_ms:>9.0f}{report.p90_ms:>9.0f}{report.p95_ms:>9.0f}{report.p99_ms:>9.0f}{report.max_ms:>9.0f}"
+        )
+    print(
+        "Emulator: {requests} requests, {throttled} throttled (429), {errors} errors (500); runs "
+        "{runs_completed} completed, {runs_failed} failed; peak {peak_active_runs} active runs; "
+        "{prompt_tokens} prompt + {completion_tokens} completion tokens".format(**stats)
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated samples to drive")
+    parser.add_argument("--rps", type=float, default=2.0, help="Target requests per second across all scenarios")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument("--workers", type=int, default=64, help="Requests in flight at most")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times instead of fixed")
+    parser.add_argument(
+        "--warm-up", action=argparse.BooleanOptionalAction, default=True, help="Run each scenario once first"
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the samples' output and logs")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown or not names:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+    if args.rps <= 0 or args.duration <= 0:
+        parser.error("--rps and --duration must be positive")
+
+    with EmulatorServer(profile_from_args(args)) as server:
+        _point_samples_at(server, args.workers)
+        mains = _sample_mains(names)
+        with contextlib.ExitStack() as quiet:
+            if not args.verbose:
+                quiet.enter_context(contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")))
+                logging.disable(logging.CRITICAL)
+            if args.warm_up:
+                for name, run in mains.items():
+                    if run() != 0:
+                        logging.disable(logging.NOTSET)
+                        _logger.error("Warm-up of scenario %s failed (ウォームアップに失敗しました)", name)
+                        return 1
+            before = server.stats()
+            samples, elapsed = generate_load(
+                mains, rps=args.rps, duration=args.duration, workers=args.workers, poisson=args.poisson, seed=args.seed
+            )
+            after = server.stats()
+        logging.disable(logging.NOTSET)
+
+    # Counters cover the measured load only; gauges (peak and active runs) are taken as they are.
+    stats = {key: value - before[key] if not key.endswith("active_runs") else value for key, value in after.items()}
+    reports = summarize(samples, elapsed)
+    _print_report(reports, stats, args.rps, elapsed)
+    if args.json is not None:
+        payload = {
+            "rps": args.rps,
+            "duration": args.duration,
+            "elapsed": elapsed,
+            "scenarios": [asdict(report) for report in reports],
+            "emulator": stats,
+        }
+        tmp_path = args.json.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, args.json)
+    return 0 if all(sample.ok for sample in samples) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
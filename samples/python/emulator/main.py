@@ -0,0 +1,56 @@
+"""Serve the Agent Service emulator until interrupted.
+
+Prints the environment variables that point the samples at it; set them in a separate
+shell (they replace the system CA store)::
+
+    python -m samples.python.emulator.main --port 8443 --throttle-rate 0.05
+    # in another shell, after the printed exports:
+    python -m samples.python.01_minimal_agent.main
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import shlex
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+from ..common import configure_logging
+from .behavior import add_profile_arguments, profile_from_args
+from .server import EmulatorServer
+
+_logger = logging.getLogger("emulator")
+
+_DEFAULT_DIRECTORY = Path.home() / ".cache" / "azure-ai-agent-workshop" / "emulator"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8443, help="HTTPS port on 127.0.0.1")
+    parser.add_argument(
+        "--directory", type=Path, default=_DEFAULT_DIRECTORY, help="Where the certificate and agent index are kept"
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    server = EmulatorServer(profile_from_args(args), port=args.port, directory=args.directory).start()
+    print("# Point the samples at the emulator (エミュレーターを使う環境変数):")
+    for name, value in server.environment().items():
+        print(f"export {name}={shlex.quote(value)}")
+    _logger.info("Agent Service emulator listening on %s (エミュレーターを起動しました)", server.url)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _logger.info("Emulator stats (エミュレーターの統計): %s", server.stats())
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
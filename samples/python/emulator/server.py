@@ -0,0 +1,173 @@
+"""Run the emulator over HTTPS on a background thread and point clients at it."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import ssl
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from azure.core.credentials import AccessToken
+
+from ..common.cold_start import self_signed_certificate
+from .behavior import EmulatorProfile
+from .service import AgentServiceEmulator
+
+PROJECT_NAME = "emulator"
+MODEL_NAME = "emulated-gpt-4o"
+
+
+class EmulatorCredential:
+    """Token credential for the emulator, which accepts any bearer token.
+
+    Works with sync clients, and with ``azure.ai.projects.aio`` behind
+    :class:`~samples.python.common.clients.AsyncCredentialAdapter`.
+    """
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        return AccessToken("emulator-token", int(time.time()) + 3600)
+
+    def close(self) -> None:
+        return None
+
+    def __enter__(self) -> "EmulatorCredential":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+class EmulatorServer:
+    """An :class:`~.service.AgentServiceEmulator` served on ``https://127.0.0.1:{port}``.
+
+    The self-signed certificate is written to ``directory`` (a temporary directory by
+    default); clients trust it through ``connection_verify`` or the variables returned by
+    :meth:`environment`. Use as a context manager, or call :meth:`start` and :meth:`stop`.
+    """
+
+    def __init__(
+        self, profile: Optional[EmulatorProfile] = None, *, port: int = 0, directory: Optional[Path] = None
+    ) -> None:
+        self.emulator = AgentServiceEmulator(profile)
+        self.port = port
+        self._directory = directory
+        self._tmp: Optional[tempfile.TemporaryDirectory[str]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Any = None
+        self.cert_path: Optional[Path] = None
+
+    @property
+    def url(self) -> str:
+        return f"https://127.0.0.1:{self.port}"
+
+    @property
+    def project_endpoint(self) -> str:
+        return f"{self.url}/api/projects/{PROJECT_NAME}"
+
+    def ssl_context(self) -> ssl.SSLContext:
+        """Server-side TLS context, creating the certificate on first use."""
+
+        if self._directory is None:
+            self._tmp = tempfile.TemporaryDirectory()
+            self._directory = Path(self._tmp.name)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self.cert_path, key_path = self_signed_certificate(self._directory, datetime.timedelta(days=30))
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(self.cert_path, key_path)
+        return context
+
+    def start(self) -> "EmulatorServer":
+        from aiohttp import web
+
+        context = self.ssl_context()
+        loop = self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors: list[BaseException] = []
+
+        async def serve() -> None:
+            self._runner = web.AppRunner(self.emulator.application(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", self.port, ssl_context=context)
+            await site.start()
+            self.port = self._runner.addresses[0][1]
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(serve())
+            except BaseException as exc:  # noqa: BLE001 - re-raised by start()
+                errors.append(exc)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="agent-service-emulator", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        if self._loop is not None:
+            self._loop.close()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+        self._loop = self._thread = self._runner = self._tmp = None
+
+    def __enter__(self) -> "EmulatorServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, Any]:
+        """A snapshot of :class:`~.service.EmulatorStats`, taken on the emulator's loop."""
+
+        async def snapshot() -> dict[str, Any]:
+            return self.emulator.stats.to_dict()
+
+        assert self._loop is not None, "the emulator is not running"
+        return asyncio.run_coroutine_threadsafe(snapshot(), self._loop).result(timeout=10)
+
+    def project_client(self, *, pool_size: int = 16, **kwargs: Any) -> Any:
+        """A new ``AIProjectClient`` for the emulator with an :class:`EmulatorCredential`."""
+
+        from ..common.clients import create_pooled_transport, open_project_client
+
+        kwargs.setdefault("transport", create_pooled_transport(pool_size, connection_verify=str(self.cert_path)))
+        return open_project_client(self.project_endpoint, EmulatorCredential(), **kwargs)
+
+    def environment(self) -> dict[str, str]:
+        """Variables that point the samples (and ``DefaultAzureCredential``) at the emulator.
+
+        ``REQUESTS_CA_BUNDLE`` and ``SSL_CERT_FILE`` replace the system CA store, so only set
+        them in a shell or process that talks to nothing but the emulator.
+        """
+
+        return {
+            "PROJECT_ENDPOINT": self.project_endpoint,
+            "MODEL_DEPLOYMENT_NAME": MODEL_NAME,
+            "AI_SEARCH_CONNECTION_ID": "emulated-search-connection",
+            "AI_SEARCH_INDEX_NAME": "emulated-index",
+            "LOGIC_APP_CALLBACK_URL": f"{self.url}/logic-app/trigger",
+            "IDENTITY_ENDPOINT": f"{self.url}/msi/token",
+            "IDENTITY_HEADER": "emulator",
+            "REQUESTS_CA_BUNDLE": str(self.cert_path),
+            "SSL_CERT_FILE": str(self.cert_path),
+            # Never mix emulator tokens and agent IDs into the real caches.
+            "WORKSHOP_TOKEN_CACHE": "off",
+            "WORKSHOP_AGENT_REGISTRY": str(self._directory / "agents.json") if self._directory else "",
+            "WORKSHOP_RAG_CACHE": "off",
+        }
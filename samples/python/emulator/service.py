@@ -0,0 +1,790 @@
+"""In-memory emulator of the Azure AI Agent Service REST API.
+
+Implements the agent, thread, message, run and run-step endpoints that ``azure-ai-agents``
+calls, under ``/api/projects/{project}``, so an unmodified ``AIProjectClient`` (sync or
+``aio``) works against it. It also serves two helpers that let the samples run unchanged:
+
+* ``GET /msi/token`` – the App Service managed identity protocol (``IDENTITY_ENDPOINT``), so
+  ``DefaultAzureCredential`` gets a token without Azure;
+* ``POST /logic-app/trigger`` – accepts Logic App notifications (``LOGIC_APP_CALLBACK_URL``).
+
+Runs move through ``queued`` → ``in_progress`` → ``completed`` with the latencies of an
+:class:`~.behavior.EmulatorProfile`. Server-side tools (AI Search, code interpreter, connected
+agents) add a ``tool_calls`` step; a connected agent's answer is generated by emulating a run
+of the child agent. An agent with function tools stops in ``requires_action`` until
+``submit_tool_outputs``. Answers are streamed as server-sent events when ``stream`` is set.
+``GET /_emulator/stats`` reports request, throttling, run and token counters.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+from .behavior import EmulatorProfile, TokenBucket
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from aiohttp import web
+
+PROJECT_PREFIX = "/api/projects/{project}"
+SERVER_SIDE_TOOLS = frozenset(
+    {"code_interpreter", "azure_ai_search", "connected_agent", "file_search", "bing_grounding"}
+)
+_WORDS = (
+    "the agent reviewed the request and prepared a concise answer with the relevant details "
+    "including figures dates and next steps for the workshop participant"
+).split()
+
+Event = tuple[str, Any]
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def _text_content(value: str, annotations: Optional[list[dict[str, Any]]] = None) -> list[dict[str, Any]]:
+    return [{"type": "text", "text": {"value": value, "annotations": annotations or []}}]
+
+
+def _message_text(message: dict[str, Any]) -> str:
+    return "".join(part["text"]["value"] for part in message["content"] if part.get("type") == "text")
+
+
+def _content_text(content: Any) -> str:
+    """Text of a message ``content`` field, which is a string or a list of content blocks."""
+
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        text = block.get("text")
+        parts.append(text.get("value", "") if isinstance(text, dict) else str(text or ""))
+    return "".join(parts)
+
+
+def _arguments(parameters: Optional[dict[str, Any]]) -> str:
+    """Plausible JSON arguments for a function with the given JSON schema ``parameters``."""
+
+    placeholders = {"integer": 1, "number": 1.0, "boolean": True, "array": [], "object": {}}
+    properties = (parameters or {}).get("properties", {})
+    return json.dumps(
+        {name: placeholders.get(schema.get("type"), f"emulated {name}") for name, schema in properties.items()}
+    )
+
+
+def _page(items: list[dict[str, Any]], query: Any, *, default_order: str = "desc") -> dict[str, Any]:
+    """An OpenAI-style list page of ``items`` (kept in creation order) for ``query``."""
+
+    ordered = list(reversed(items)) if query.get("order", default_order) == "desc" else list(items)
+    ids = [item["id"] for item in ordered]
+    after, before = query.get("after"), query.get("before")
+    if after in ids:
+        ordered = ordered[ids.index(after) + 1 :]
+    if before in ids:
+        ordered = ordered[: [item["id"] for item in ordered].index(before)]
+    limit = max(1, min(100, int(query.get("limit", 20))))
+    data = ordered[:limit]
+    return {
+        "object": "list",
+        "data": data,
+        "first_id": data[0]["id"] if data else None,
+        "last_id": data[-1]["id"] if data else None,
+        "has_more": len(ordered) > limit,
+    }
+
+
+@dataclass(slots=True)
+class EmulatorStats:
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    runs_started: int = 0
+    runs_completed: int = 0
+    runs_failed: int = 0
+    runs_cancelled: int = 0
+    tool_calls: int = 0
+    child_runs: int = 0
+    logic_app_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    active_runs: int = 0
+    peak_active_runs: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class _Run:
+    data: dict[str, Any]
+    agent: dict[str, Any]
+    steps: list[dict[str, Any]] = field(default_factory=list)
+    pending_calls: list[dict[str, Any]] = field(default_factory=list)
+    tool_outputs: Optional[dict[str, str]] = None
+    cancel_requested: bool = False
+
+
+class _NotFound(Exception):
+    pass
+
+
+class AgentServiceEmulator:
+    """State and request handlers of the emulated service; see :meth:`application`."""
+
+    def __init__(self, profile: Optional[EmulatorProfile] = None) -> None:
+        self.profile = profile or EmulatorProfile()
+        self.stats = EmulatorStats()
+        self.agents: dict[str, dict[str, Any]] = {}
+        self.threads: dict[str, dict[str, Any]] = {}
+        self.messages: dict[str, list[dict[str, Any]]] = {}
+        self.runs: dict[str, dict[str, _Run]] = {}
+        self._rng = random.Random(self.profile.seed)
+        self._request_bucket = (
+            TokenBucket(self.profile.requests_per_minute) if self.profile.requests_per_minute else None
+        )
+        self._token_bucket = TokenBucket(self.profile.tokens_per_minute) if self.profile.tokens_per_minute else None
+        self._run_slots: Optional[asyncio.Semaphore] = None
+        self._background: set[asyncio.Task[None]] = set()
+
+    # -- application -------------------------------------------------------------------
+
+    def application(self) -> "web.Application":
+        from aiohttp import web
+
+        app = web.Application(middlewares=[self._middleware()])
+        p = PROJECT_PREFIX
+        app.add_routes(
+            [
+                web.post(f"{p}/assistants", self.create_agent),
+                web.get(f"{p}/assistants", self.list_agents),
+                web.get(f"{p}/assistants/{{agent_id}}", self.get_agent),
+                web.post(f"{p}/assistants/{{agent_id}}", self.update_agent),
+                web.delete(f"{p}/assistants/{{agent_id}}", self.delete_agent),
+                web.post(f"{p}/threads/runs", self.create_thread_and_run),
+                web.post(f"{p}/threads", self.create_thread),
+                web.get(f"{p}/threads/{{thread_id}}", self.get_thread),
+                web.delete(f"{p}/threads/{{thread_id}}", self.delete_thread),
+                web.post(f"{p}/threads/{{thread_id}}/messages", self.create_message),
+                web.get(f"{p}/threads/{{thread_id}}/messages", self.list_messages),
+                web.get(f"{p}/threads/{{thread_id}}/messages/{{message_id}}", self.get_message),
+                web.post(f"{p}/threads/{{thread_id}}/runs", self.create_run),
+                web.get(f"{p}/threads/{{thread_id}}/runs", self.list_runs),
+                web.get(f"{p}/threads/{{thread_id}}/runs/{{run_id}}", self.get_run),
+                web.post(f"{p}/threads/{{thread_id}}/runs/{{run_id}}/submit_tool_outputs", self.submit_tool_outputs),
+                web.post(f"{p}/threads/{{thread_id}}/runs/{{run_id}}/cancel", self.cancel_run),
+                web.get(f"{p}/threads/{{thread_id}}/runs/{{run_id}}/steps", self.list_run_steps),
+                web.get(f"{p}/threads/{{thread_id}}/runs/{{run_id}}/steps/{{step_id}}", self.get_run_step),
+                web.get("/msi/token", self.managed_identity_token),
+                web.post("/logic-app/trigger", self.logic_app_trigger),
+                web.get("/_emulator/stats", self.get_stats),
+            ]
+        )
+        return app
+
+    def _middleware(self) -> Any:
+        from aiohttp import web
+
+        @web.middleware
+        async def middleware(request: "web.Request", handler: Any) -> "web.StreamResponse":
+            if not request.path.startswith("/api/projects/"):
+                return await handler(request)
+            profile, stats = self.profile, self.stats
+            stats.requests += 1
+            await asyncio.sleep(profile.request_latency.sample(self._rng))
+            wait = self._request_bucket.take(1) if self._request_bucket is not None else 0.0
+            if wait or self._rng.random() < profile.throttle_rate:
+                stats.throttled += 1
+                return self._error(429, "too_many_requests", "Rate limit is exceeded.", retry_after=max(1, round(wait)))
+            if self._rng.random() < profile.error_rate:
+                stats.errors += 1
+                return self._error(500, "internal_error", "Injected server error.")
+            try:
+                return await handler(request)
+            except _NotFound as exc:
+                return self._error(404, "not_found", str(exc))
+
+        return middleware
+
+    @staticmethod
+    def _error(status: int, code: str, message: str, *, retry_after: Optional[int] = None) -> "web.Response":
+        from aiohttp import web
+
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        return web.json_response({"error": {"code": code, "message": message}}, status=status, headers=headers)
+
+    @staticmethod
+    async def _body(request: "web.Request") -> dict[str, Any]:
+        if not request.can_read_body:
+            return {}
+        body = await request.json()
+        return body if isinstance(body, dict) else {}
+
+    # -- agents ------------------------------------------------------------------------
+
+    def _agent(self, agent_id: str) -> dict[str, Any]:
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            raise _NotFound(f"No assistant found with id '{agent_id}'.")
+        return agent
+
+    async def create_agent(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        body = await self._body(request)
+        agent = {
+            "id": _new_id("asst"),
+            "object": "assistant",
+            "created_at": _now(),
+            "name": body.get("name"),
+            "description": body.get("description"),
+            "model": body.get("model"),
+            "instructions": body.get("instructions"),
+            "tools": body.get("tools") or [],
+            "tool_resources": body.get("tool_resources") or {},
+            "temperature": body.get("temperature", 1.0),
+            "top_p": body.get("top_p", 1.0),
+            "response_format": body.get("response_format", "auto"),
+            "metadata": body.get("metadata") or {},
+        }
+        self.agents[agent["id"]] = agent
+        return web.json_response(agent)
+
+    async def list_agents(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(_page(list(self.agents.values()), request.query))
+
+    async def get_agent(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(self._agent(request.match_info["agent_id"]))
+
+    async def update_agent(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        agent = self._agent(request.match_info["agent_id"])
+        agent.update({key: value for key, value in (await self._body(request)).items() if key in agent})
+        return web.json_response(agent)
+
+    async def delete_agent(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        agent_id = request.match_info["agent_id"]
+        self._agent(agent_id)
+        del self.agents[agent_id]
+        return web.json_response({"id": agent_id, "object": "assistant.deleted", "deleted": True})
+
+    # -- threads and messages ----------------------------------------------------------
+
+    def _thread(self, thread_id: str) -> dict[str, Any]:
+        thread = self.threads.get(thread_id)
+        if thread is None:
+            raise _NotFound(f"No thread found with id '{thread_id}'.")
+        return thread
+
+    def _new_thread(self, body: dict[str, Any]) -> dict[str, Any]:
+        thread = {
+            "id": _new_id("thread"),
+            "object": "thread",
+            "created_at": _now(),
+            "tool_resources": body.get("tool_resources") or {},
+            "metadata": body.get("metadata") or {},
+        }
+        self.threads[thread["id"]] = thread
+        self.messages[thread["id"]] = []
+        self.runs[thread["id"]] = {}
+        for message in body.get("messages") or []:
+            self._add_message(thread["id"], message.get("role", "user"), _content_text(message.get("content")))
+        return thread
+
+    def _add_message(
+        self,
+        thread_id: str,
+        role: str,
+        text: str,
+        *,
+        run: Optional[_Run] = None,
+        status: str = "completed",
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        message = {
+            "id": _new_id("msg"),
+            "object": "thread.message",
+            "created_at": _now(),
+            "thread_id": thread_id,
+            "status": status,
+            "incomplete_details": None,
+            "completed_at": _now() if status == "completed" else None,
+            "incomplete_at": None,
+            "role": role,
+            "content": _text_content(text),
+            "assistant_id": run.agent["id"] if run else None,
+            "run_id": run.data["id"] if run else None,
+            "attachments": [],
+            "metadata": metadata or {},
+        }
+        self.messages[thread_id].append(message)
+        return message
+
+    async def create_thread(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(self._new_thread(await self._body(request)))
+
+    async def get_thread(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(self._thread(request.match_info["thread_id"]))
+
+    async def delete_thread(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        thread_id = request.match_info["thread_id"]
+        self._thread(thread_id)
+        for run in self.runs.pop(thread_id).values():
+            run.cancel_requested = True
+        del self.threads[thread_id]
+        del self.messages[thread_id]
+        return web.json_response({"id": thread_id, "object": "thread.deleted", "deleted": True})
+
+    async def create_message(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        thread_id = request.match_info["thread_id"]
+        self._thread(thread_id)
+        body = await self._body(request)
+        message = self._add_message(
+            thread_id, body.get("role", "user"), _content_text(body.get("content")), metadata=body.get("metadata")
+        )
+        return web.json_response(message)
+
+    async def list_messages(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        thread_id = request.match_info["thread_id"]
+        self._thread(thread_id)
+        messages = self.messages[thread_id]
+        run_id = request.query.get("run_id")
+        if run_id:
+            messages = [message for message in messages if message["run_id"] == run_id]
+        return web.json_response(_page(messages, request.query))
+
+    async def get_message(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        thread_id, message_id = request.match_info["thread_id"], request.match_info["message_id"]
+        self._thread(thread_id)
+        for message in self.messages[thread_id]:
+            if message["id"] == message_id:
+                return web.json_response(message)
+        raise _NotFound(f"No message found with id '{message_id}'.")
+
+    # -- runs --------------------------------------------------------------------------
+
+    def _run(self, thread_id: str, run_id: str) -> _Run:
+        self._thread(thread_id)
+        run = self.runs[thread_id].get(run_id)
+        if run is None:
+            raise _NotFound(f"No run found with id '{run_id}'.")
+        return run
+
+    def _start_run(self, thread_id: str, body: dict[str, Any]) -> _Run:
+        agent = self._agent(body.get("assistant_id", ""))
+        for message in body.get("additional_messages") or []:
+            self._add_message(thread_id, message.get("role", "user"), _content_text(message.get("content")))
+        instructions = body.get("instructions") or agent["instructions"] or ""
+        if body.get("additional_instructions"):
+            instructions = f"{instructions} {body['additional_instructions']}".strip()
+        data = {
+            "id": _new_id("run"),
+            "object": "thread.run",
+            "thread_id": thread_id,
+            "assistant_id": agent["id"],
+            "status": "queued",
+            "required_action": None,
+            "last_error": None,
+            "model": body.get("model") or agent["model"],
+            "instructions": instructions,
+            "tools": body.get("tools") or agent["tools"],
+            "created_at": _now(),
+            "expires_at": _now() + 600,
+            "started_at": None,
+            "completed_at": None,
+            "cancelled_at": None,
+            "failed_at": None,
+            "incomplete_details": None,
+            "usage": None,
+            "temperature": body.get("temperature", agent["temperature"]),
+            "top_p": body.get("top_p", agent["top_p"]),
+            "max_prompt_tokens": body.get("max_prompt_tokens"),
+            "max_completion_tokens": body.get("max_completion_tokens"),
+            "truncation_strategy": body.get("truncation_strategy"),
+            "tool_choice": body.get("tool_choice"),
+            "response_format": body.get("response_format"),
+            "tool_resources": None,
+            "parallel_tool_calls": body.get("parallel_tool_calls", True),
+            "metadata": body.get("metadata") or {},
+        }
+        run = _Run(data=data, agent=agent)
+        self.runs[thread_id][data["id"]] = run
+        self.stats.runs_started += 1
+        return run
+
+    async def _respond(self, request: "web.Request", run: _Run, events: AsyncIterator[Event], stream: bool) -> Any:
+        from aiohttp import web
+
+        if not stream:
+            task = asyncio.get_running_loop().create_task(self._drain(events))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return web.json_response(run.data)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        try:
+            async for event, data in events:
+                payload = data if isinstance(data, str) else json.dumps(data)
+                await response.write(f"event: {event}\ndata: {payload}\n\n".encode("utf-8"))
+        except ConnectionResetError:
+            # Like the real service, the run carries on without a listener.
+            task = asyncio.get_running_loop().create_task(self._drain(events))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return response
+        await response.write_eof()
+        return response
+
+    @staticmethod
+    async def _drain(events: AsyncIterator[Event]) -> None:
+        async for _ in events:
+            pass
+
+    async def create_run(self, request: "web.Request") -> Any:
+        thread_id = request.match_info["thread_id"]
+        self._thread(thread_id)
+        body = await self._body(request)
+        run = self._start_run(thread_id, body)
+        return await self._respond(request, run, self._advance(run), bool(body.get("stream")))
+
+    async def create_thread_and_run(self, request: "web.Request") -> Any:
+        body = await self._body(request)
+        thread = self._new_thread(body.get("thread") or {})
+        run = self._start_run(thread["id"], body)
+        return await self._respond(request, run, self._advance(run), bool(body.get("stream")))
+
+    async def list_runs(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        thread_id = request.match_info["thread_id"]
+        self._thread(thread_id)
+        return web.json_response(_page([run.data for run in self.runs[thread_id].values()], request.query))
+
+    async def get_run(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(self._run(request.match_info["thread_id"], request.match_info["run_id"]).data)
+
+    async def submit_tool_outputs(self, request: "web.Request") -> Any:
+        run = self._run(request.match_info["thread_id"], request.match_info["run_id"])
+        body = await self._body(request)
+        if run.data["status"] != "requires_action":
+            message = f"Run {run.data['id']} is {run.data['status']}, not requires_action."
+            return self._error(400, "invalid_request", message)
+        outputs = {item["tool_call_id"]: item.get("output", "") for item in body.get("tool_outputs") or []}
+        missing = [call["id"] for call in run.pending_calls if call["id"] not in outputs]
+        if missing:
+            return self._error(400, "invalid_request", f"Missing tool outputs for {', '.join(missing)}.")
+        run.tool_outputs = outputs
+        run.data["status"], run.data["required_action"] = "queued", None
+        return await self._respond(request, run, self._advance(run), bool(body.get("stream")))
+
+    async def cancel_run(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        run = self._run(request.match_info["thread_id"], request.match_info["run_id"])
+        if run.data["status"] in {"queued", "in_progress", "requires_action"}:
+            run.cancel_requested = True
+            if run.data["status"] == "requires_action":
+                self._finish(run, "cancelled")
+            else:
+                run.data["status"] = "cancelling"
+        return web.json_response(run.data)
+
+    async def list_run_steps(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        run = self._run(request.match_info["thread_id"], request.match_info["run_id"])
+        return web.json_response(_page(run.steps, request.query, default_order="asc"))
+
+    async def get_run_step(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        run = self._run(request.match_info["thread_id"], request.match_info["run_id"])
+        for step in run.steps:
+            if step["id"] == request.match_info["step_id"]:
+                return web.json_response(step)
+        raise _NotFound(f"No run step found with id '{request.match_info['step_id']}'.")
+
+    # -- run engine --------------------------------------------------------------------
+
+    def _new_step(self, run: _Run, details: dict[str, Any]) -> dict[str, Any]:
+        step = {
+            "id": _new_id("step"),
+            "object": "thread.run.step",
+            "type": details["type"],
+            "assistant_id": run.agent["id"],
+            "thread_id": run.data["thread_id"],
+            "run_id": run.data["id"],
+            "status": "in_progress",
+            "step_details": details,
+            "last_error": None,
+            "created_at": _now(),
+            "expired_at": None,
+            "completed_at": None,
+            "cancelled_at": None,
+            "failed_at": None,
+            "usage": None,
+            "metadata": {},
+        }
+        run.steps.append(step)
+        return step
+
+    def _finish(self, run: _Run, status: str, error: Optional[tuple[str, str]] = None) -> None:
+        data = run.data
+        data["status"] = status
+        data["required_action"] = None
+        data[{"completed": "completed_at", "failed": "failed_at", "cancelled": "cancelled_at"}[status]] = _now()
+        if error is not None:
+            data["last_error"] = {"code": error[0], "message": error[1]}
+        counter = {"completed": "runs_completed", "failed": "runs_failed", "cancelled": "runs_cancelled"}[status]
+        setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def _terminal(self, run: _Run, status: str, error: Optional[tuple[str, str]] = None) -> list[Event]:
+        self._finish(run, status, error)
+        return [(f"thread.run.{status}", run.data), ("done", "[DONE]")]
+
+    def _answer(self, agent: dict[str, Any], prompt: str, tokens: int) -> str:
+        words = [_WORDS[index % len(_WORDS)] for index in range(max(1, tokens - 8))]
+        return f"[{agent.get('name') or agent['id']}] Re: {prompt[:60]} — " + " ".join(words) + "."
+
+    def _prompt_tokens(self, run: _Run) -> int:
+        history = sum(len(_message_text(message)) for message in self.messages.get(run.data["thread_id"], []))
+        return (history + len(run.data["instructions"] or "")) // 4 + 20 * len(run.data["tools"])
+
+    async def _child_answer(self, child_id: str, prompt: str) -> tuple[str, int]:
+        """Emulate a run of a connected agent; returns its answer and completion tokens."""
+
+        profile = self.profile
+        child = self.agents.get(child_id, {"id": child_id, "name": child_id})
+        tokens = max(1, round(profile.completion_tokens.sample(self._rng)))
+        self.stats.child_runs += 1
+        await asyncio.sleep(
+            profile.queue_latency.sample(self._rng)
+            + profile.first_token_latency.sample(self._rng)
+            + tokens / profile.tokens_per_second
+        )
+        return self._answer(child, prompt, tokens), tokens
+
+    async def _advance(self, run: _Run) -> AsyncIterator[Event]:
+        """Drive ``run`` until it needs tool outputs or ends, yielding its stream events."""
+
+        profile, rng, data = self.profile, self._rng, run.data
+        resuming = run.tool_outputs is not None
+        if not resuming:
+            yield "thread.run.created", data
+            yield "thread.run.queued", data
+        await asyncio.sleep(profile.queue_latency.sample(rng))
+
+        if self._run_slots is None and profile.max_active_runs:
+            self._run_slots = asyncio.Semaphore(profile.max_active_runs)
+        if self._run_slots is not None:
+            await self._run_slots.acquire()
+        self.stats.active_runs += 1
+        self.stats.peak_active_runs = max(self.stats.peak_active_runs, self.stats.active_runs)
+        try:
+            async for event in self._process(run, resuming):
+                yield event
+        finally:
+            self.stats.active_runs -= 1
+            if self._run_slots is not None:
+                self._run_slots.release()
+
+    async def _process(self, run: _Run, resuming: bool) -> AsyncIterator[Event]:
+        profile, rng, data = self.profile, self._rng, run.data
+        if run.cancel_requested:
+            for event in self._terminal(run, "cancelled"):
+                yield event
+            return
+        data["status"] = "in_progress"
+        data["started_at"] = data["started_at"] or _now()
+        yield "thread.run.in_progress", data
+        history = self.messages.get(data["thread_id"], [])
+        prompt = next((_message_text(message) for message in reversed(history) if message["role"] == "user"), "")
+
+        tools = data["tools"]
+        citations: list[dict[str, Any]] = []
+        extra_tokens = 0
+        if not resuming:
+            server_calls = [tool for tool in tools if tool.get("type") in SERVER_SIDE_TOOLS]
+            if server_calls:
+                calls: list[dict[str, Any]] = []
+                step = self._new_step(run, {"type": "tool_calls", "tool_calls": calls})
+                yield "thread.run.step.created", step
+                for tool in server_calls:
+                    kind = tool["type"]
+                    call: dict[str, Any] = {"id": _new_id("call"), "type": kind}
+                    if kind == "connected_agent":
+                        details = tool.get("connected_agent", {})
+                        output, tokens = await self._child_answer(details.get("id", ""), prompt)
+                        extra_tokens += tokens
+                        arguments = json.dumps({"query": prompt})
+                        call[kind] = {"name": details.get("name"), "arguments": arguments, "output": output}
+                    else:
+                        await asyncio.sleep(profile.tool_latency.sample(rng))
+                        call[kind] = {"input": prompt, "output": f"emulated {kind} result"}
+                        if kind == "azure_ai_search":
+                            url = f"https://example.com/docs/{len(citations) + 1}"
+                            citations.append({"url": url, "title": "Emulated document"})
+                    calls.append(call)
+                    self.stats.tool_calls += 1
+                step["status"], step["completed_at"] = "completed", _now()
+                yield "thread.run.step.completed", step
+
+            functions = [tool["function"] for tool in tools if tool.get("type") == "function"]
+            if functions:
+                function = functions[0]
+                call = {
+                    "id": _new_id("call"),
+                    "type": "function",
+                    "function": {"name": function["name"], "arguments": _arguments(function.get("parameters"))},
+                }
+                run.pending_calls = [call]
+                recorded = {**call, "function": {**call["function"], "output": None}}
+                step = self._new_step(run, {"type": "tool_calls", "tool_calls": [recorded]})
+                yield "thread.run.step.created", step
+                data["status"] = "requires_action"
+                data["required_action"] = {"type": "submit_tool_outputs", "submit_tool_outputs": {"tool_calls": [call]}}
+                self.stats.tool_calls += 1
+                yield "thread.run.requires_action", data
+                # The stream ends here; submit_tool_outputs resumes the run on a new stream.
+                return
+        else:
+            for step in run.steps:
+                if step["status"] == "in_progress" and step["type"] == "tool_calls":
+                    for call in step["step_details"]["tool_calls"]:
+                        if call["type"] == "function":
+                            call["function"]["output"] = run.tool_outputs.get(call["id"], "")
+                    step["status"], step["completed_at"] = "completed", _now()
+                    yield "thread.run.step.completed", step
+            run.pending_calls = []
+
+        if run.cancel_requested:
+            for event in self._terminal(run, "cancelled"):
+                yield event
+            return
+        if rng.random() < profile.run_failure_rate:
+            for event in self._terminal(run, "failed", ("server_error", "Sorry, something went wrong.")):
+                yield event
+            return
+
+        completion_tokens = max(1, round(profile.completion_tokens.sample(rng)))
+        prompt_tokens = self._prompt_tokens(run) + extra_tokens
+        if self._token_bucket is not None:
+            wait = self._token_bucket.take(prompt_tokens + completion_tokens)
+            if wait:
+                message = f"Rate limit is exceeded. Try again in {max(1, round(wait))} seconds."
+                for event in self._terminal(run, "failed", ("rate_limit_exceeded", message)):
+                    yield event
+                return
+
+        answer = self._answer(run.agent, prompt, completion_tokens)
+        annotations = []
+        for index, citation in enumerate(citations):
+            marker = f"【{index}:0†source】"
+            annotations.append(
+                {
+                    "type": "url_citation",
+                    "text": marker,
+                    "url_citation": citation,
+                    "start_index": len(answer),
+                    "end_index": len(answer) + len(marker),
+                }
+            )
+            answer += marker
+
+        message = self._add_message(data["thread_id"], "assistant", "", run=run, status="in_progress")
+        step = self._new_step(run, {"type": "message_creation", "message_creation": {"message_id": message["id"]}})
+        yield "thread.run.step.created", step
+        yield "thread.message.created", message
+        yield "thread.message.in_progress", message
+        await asyncio.sleep(profile.first_token_latency.sample(rng))
+
+        chunk_words = 4
+        words = answer.split(" ")
+        for start in range(0, len(words), chunk_words):
+            if run.cancel_requested:
+                break
+            chunk = " ".join(words[start : start + chunk_words]) + (" " if start + chunk_words < len(words) else "")
+            delta = {
+                "id": message["id"],
+                "object": "thread.message.delta",
+                "delta": {"content": [{"index": 0, "type": "text", "text": {"value": chunk, "annotations": []}}]},
+            }
+            yield "thread.message.delta", delta
+            await asyncio.sleep(chunk_words / profile.tokens_per_second)
+
+        message["content"] = _text_content(answer, annotations)
+        message["status"], message["completed_at"] = "completed", _now()
+        yield "thread.message.completed", message
+        step["status"], step["completed_at"] = "completed", _now()
+        yield "thread.run.step.completed", step
+        if run.cancel_requested:
+            for event in self._terminal(run, "cancelled"):
+                yield event
+            return
+
+        self.stats.prompt_tokens += prompt_tokens
+        self.stats.completion_tokens += completion_tokens
+        data["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        for event in self._terminal(run, "completed"):
+            yield event
+
+    # -- helpers -----------------------------------------------------------------------
+
+    async def managed_identity_token(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(
+            {
+                "access_token": f"emulator-token-{uuid.uuid4().hex}",
+                "expires_on": str(_now() + 3600),
+                "resource": request.query.get("resource", "https://ai.azure.com"),
+                "token_type": "Bearer",
+            }
+        )
+
+    async def logic_app_trigger(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        await request.read()
+        self.stats.logic_app_calls += 1
+        await asyncio.sleep(self.profile.request_latency.sample(self._rng))
+        return web.json_response({"status": "accepted"}, status=202)
+
+    async def get_stats(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(self.stats.to_dict())
@@ -0,0 +1 @@
+"""Streaming document ingestion for the workshop search index."""
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from ..common import configure_logging, load_config
+from ..common.config import load_env_file
+from ..common.embeddings import Embedder, project_embedder
+from .pipeline import IngestionStats, ingest
+from .writers import AzureSearchIndexWriter, IndexWriter, LocalIndexWriter
+
+app = typer.Typer(help="Stream documents into the workshop search index")
+console = Console()
+
+_DEFAULT_HOME = Path.home() / ".cache" / "azure-ai-agent-workshop" / "ingestion"
+
+
+def _target(index_dir: Path, latency: float) -> tuple[IndexWriter, Optional[Embedder]]:
+    """Use Azure AI Search when ``AI_SEARCH_ENDPOINT`` is set, otherwise the local stand-in.
+
+    Azure AI Search gets vectors from the ``EMBEDDING_DEPLOYMENT_NAME`` deployment: the lexical
+    ``HashingEmbedder`` used for the stand-in must never end up in a real index.
+    """
+
+    load_env_file()
+    endpoint = os.getenv("AI_SEARCH_ENDPOINT")
+    if not endpoint:
+        return LocalIndexWriter(index_dir, latency=latency), None
+    try:
+        embedder = project_embedder(load_config())
+    except EnvironmentError as exc:
+        raise typer.BadParameter(str(exc), param_hint="AI_SEARCH_ENDPOINT") from exc
+    if embedder is None:
+        raise typer.BadParameter(
+            "Set EMBEDDING_DEPLOYMENT_NAME to ingest into Azure AI Search "
+            "(Azure AI Search に取り込むには EMBEDDING_DEPLOYMENT_NAME を設定してください)",
+            param_hint="AI_SEARCH_ENDPOINT",
+        )
+    writer = AzureSearchIndexWriter(
+        endpoint, os.getenv("AI_SEARCH_INDEX_NAME", "workshop-documents"), os.getenv("AI_SEARCH_API_KEY")
+    )
+    return writer, embedder
+
+
+def _render_stats(title: str, stats: IngestionStats) -> Table:
+    table = Table(title=title)
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Files", str(stats.files))
+    table.add_row("Chunks", str(stats.chunks))
+    table.add_row("Re-embedded", str(stats.embedded))
+    table.add_row("Unchanged", str(stats.unchanged))
+    table.add_row("Deleted", str(stats.deleted))
+    table.add_row("Upload batches", str(stats.batches))
+    for phase, seconds in stats.phase_seconds.items():
+        table.add_row(f"{phase} (s)", f"{seconds:.2f}")
+    table.add_row("Elapsed (s)", f"{stats.elapsed:.2f}")
+    table.add_row("Chunks / s", f"{stats.chunks_per_second:.0f}")
+    return table
+
+
+@app.command(help="Ingest a directory, re-embedding only chunks whose content changed")
+def run(
+    source: Path = typer.Argument(..., exists=True, file_okay=False, help="Directory with .md/.txt documents"),
+    index_dir: Path = typer.Option(_DEFAULT_HOME / "index", help="Local stand-in index directory"),
+    state: Path = typer.Option(_DEFAULT_HOME / "state.json", help="Content hash state file"),
+    workers: int = typer.Option(os.cpu_count() or 2, min=0, help="Parser processes (0 = inline)"),
+    batch_size: int = typer.Option(500, min=1, max=1000, help="Documents per upload batch"),
+    max_chars: int = typer.Option(2000, min=200, help="Maximum characters per chunk"),
+) -> None:
+    configure_logging()
+    writer, embedder = _target(index_dir, 0.0)
+    stats = ingest(
+        source, writer, state, embedder=embedder, workers=workers, batch_size=batch_size, max_chars=max_chars
+    )
+    console.print(_render_stats("Ingestion", stats))
+
+
+def _write_corpus(root: Path, files: int, paragraphs: int, seed: int) -> list[Path]:
+    rng = random.Random(seed)
+    words = "agent thread run tool index search vector latency policy report memo retrieval grounding".split()
+    paths = []
+    for number in range(files):
+        path = root / f"team-{number % 20:02d}" / f"doc-{number:05d}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = "\n\n".join(" ".join(rng.choices(words, k=120)) for _ in range(paragraphs))
+        path.write_text(f"# Document {number}\n\n{body}\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+@app.command(help="Benchmark a full and an incremental run on a synthetic corpus")
+def bench(
+    files: int = typer.Option(2000, min=1, help="Synthetic documents"),
+    paragraphs: int = typer.Option(8, min=1, help="Paragraphs per document"),
+    change_rate: float = typer.Option(0.05, min=0.0, max=1.0, help="Share of documents edited before run 2"),
+    workers: int = typer.Option(os.cpu_count() or 2, min=0, help="Parser processes (0 = inline)"),
+    batch_size: int = typer.Option(500, min=1, max=1000),
+    latency: float = typer.Option(0.05, min=0.0, help="Simulated seconds per bulk request"),
+    seed: Optional[int] = typer.Option(7, help="Corpus seed"),
+) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        root = Path(workdir) / "corpus"
+        paths = _write_corpus(root, files, paragraphs, seed or 0)
+        state = Path(workdir) / "state.json"
+        writer = LocalIndexWriter(Path(workdir) / "index", latency=latency)
+
+        full = ingest(root, writer, state, workers=workers, batch_size=batch_size)
+        console.print(_render_stats("Full run", full))
+
+        for path in random.Random(seed).sample(paths, int(len(paths) * change_rate)):
+            path.write_text(path.read_text(encoding="utf-8") + "\nEdited paragraph.\n", encoding="utf-8")
+        incremental = ingest(root, writer, state, workers=workers, batch_size=batch_size)
+        console.print(_render_stats("Incremental run", incremental))
+        console.print(
+            f"Incremental run re-embedded {incremental.embedded} of {incremental.chunks} chunks "
+            f"and took {incremental.elapsed / full.elapsed:.0%} of the full run"
+        )
+
+
+def main() -> None:
+    app()
+
+
+if __name__ == "__main__":
+    main()
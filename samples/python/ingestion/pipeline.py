@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from ..common.embeddings import Embedder, HashingEmbedder
+from .writers import IndexDocument, IndexWriter
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERNS = ("*.md", "*.txt")
+
+
+@dataclass(slots=True)
+class Chunk:
+    chunk_id: str
+    title: str
+    url: str
+    text: str
+    content_hash: str
+
+
+@dataclass(slots=True)
+class IngestionStats:
+    files: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    uploaded: int = 0
+    deleted: int = 0
+    batches: int = 0
+    phase_seconds: dict[str, float] = field(default_factory=lambda: {"chunk": 0.0, "embed": 0.0, "upload": 0.0})
+    elapsed: float = 0.0
+
+    @property
+    def unchanged(self) -> int:
+        return self.chunks - self.embedded
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed if self.elapsed else 0.0
+
+
+def iter_files(root: Path, patterns: Sequence[str] = DEFAULT_PATTERNS) -> Iterator[Path]:
+    """Yield matching files under ``root`` lazily, in a stable order per directory."""
+
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            path = Path(directory) / name
+            if any(path.match(pattern) for pattern in patterns):
+                yield path
+
+
+def split_text(text: str, max_chars: int = 2000, overlap: int = 200) -> list[str]:
+    """Split on paragraph boundaries into chunks of at most ``max_chars`` characters.
+
+    Paragraphs longer than ``max_chars`` are cut with ``overlap`` characters carried over so
+    sentences at a cut stay retrievable from either side.
+    """
+
+    chunks: list[str] = []
+    current = ""
+    for paragraph in (part.strip() for part in text.split("\n\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars - overlap:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_file(path: Path, root: Path, max_chars: int = 2000, overlap: int = 200) -> list[Chunk]:
+    """Read and chunk one file. Runs in worker processes, so it only takes picklable input."""
+
+    text = path.read_text(encoding="utf-8", errors="replace")
+    relative = path.relative_to(root).as_posix()
+    title = next((line.lstrip("# ").strip() for line in text.splitlines() if line.strip()), relative)
+    chunks = []
+    occurrences: Counter[str] = Counter()
+    for part in split_text(text, max_chars, overlap):
+        # IDs come from the content, not the position: inserting a paragraph must not change
+        # the IDs (and force re-embedding) of every later chunk. Repeats get a counter.
+        digest = content_hash(part)[:16]
+        occurrences[digest] += 1
+        chunk_id = f"{relative}#{digest}" if occurrences[digest] == 1 else f"{relative}#{digest}-{occurrences[digest]}"
+        chunks.append(
+            Chunk(
+                chunk_id=chunk_id,
+                title=title,
+                url=chunk_id,
+                text=part,
+                # The title is embedded with the text, so a new title re-embeds the chunk.
+                content_hash=content_hash(f"{title}\n{part}"),
+            )
+        )
+    return chunks
+
+
+def iter_chunks(
+    paths: Iterable[Path],
+    root: Path,
+    *,
+    workers: int = 0,
+    max_chars: int = 2000,
+    overlap: int = 200,
+) -> Iterator[list[Chunk]]:
+    """Yield each file's chunks, parsing on a process pool when ``workers`` > 0.
+
+    At most ``4 * workers`` files are in flight, so memory stays bounded however many files
+    the directory holds. Files are yielded in completion order.
+    """
+
+    if workers <= 0:
+        for path in paths:
+            yield chunk_file(path, root, max_chars, overlap)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set = set()
+        for path in paths:
+            pending.add(pool.submit(chunk_file, path, root, max_chars, overlap))
+            if len(pending) >= 4 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class IngestionState:
+    """Content hash of every chunk already in the index, persisted as JSON.
+
+    The embedder name is stored alongside; switching embedders invalidates every hash so
+    all chunks are re-embedded once.
+    """
+
+    def __init__(self, path: Path, embedder_name: str) -> None:
+        self.path = path
+        self.embedder_name = embedder_name
+        self.hashes: dict[str, str] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            _logger.warning("Ignoring unreadable ingestion state %s: %s", path, exc)
+            return
+        if data.get("embedder") == embedder_name:
+            self.hashes = data.get("chunks", {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"embedder": self.embedder_name, "chunks": self.hashes}), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def _embedder_name(embedder: Embedder) -> str:
+    return getattr(embedder, "name", None) or f"{type(embedder).__name__}:{getattr(embedder, 'dim', '')}"
+
+
+def ingest(
+    root: Path,
+    writer: IndexWriter,
+    state_path: Path,
+    *,
+    embedder: Optional[Embedder] = None,
+    patterns: Sequence[str] = DEFAULT_PATTERNS,
+    workers: int = 0,
+    batch_size: int = 500,
+    max_chars: int = 2000,
+    overlap: int = 200,
+) -> IngestionStats:
+    """Stream ``root`` into ``writer``, embedding and uploading only changed chunks.
+
+    Files are parsed and chunked on ``workers`` processes; chunks whose content hash matches
+    ``state_path`` are skipped, the rest are embedded and uploaded ``batch_size`` at a time.
+    Chunks that disappeared since the last run are deleted from the index. ``embedder``
+    defaults to the lexical :class:`HashingEmbedder`, which only suits the local stand-in
+    index; pass a model-backed embedder for a real search index.
+    """
+
+    embedder = embedder or HashingEmbedder()
+    # Model-backed embedders (AzureOpenAIEmbedder) take a whole batch per request.
+    embed_many = getattr(embedder, "embed_many", None)
+    state = IngestionState(state_path, _embedder_name(embedder))
+    stats = IngestionStats()
+    seen: set[str] = set()
+    started = time.perf_counter()
+
+    def changed_chunks() -> Iterator[Chunk]:
+        files = iter_files(root, patterns)
+        for chunks in iter_chunks(files, root, workers=workers, max_chars=max_chars, overlap=overlap):
+            stats.files += 1
+            stats.chunks += len(chunks)
+            for chunk in chunks:
+                seen.add(chunk.chunk_id)
+                if state.hashes.get(chunk.chunk_id) != chunk.content_hash:
+                    yield chunk
+
+    waited = 0.0
+    in_flight: Optional[Future] = None
+
+    def upload(documents: list[IndexDocument], batch: list[Chunk]) -> None:
+        upload_started = time.perf_counter()
+        writer.upload(documents)
+        stats.phase_seconds["upload"] += time.perf_counter() - upload_started
+        stats.uploaded += len(documents)
+        stats.batches += 1
+        state.hashes.update((chunk.chunk_id, chunk.content_hash) for chunk in batch)
+        # Persist after every batch so an interrupted run resumes where it stopped.
+        state.save()
+
+    # One upload runs in the background while the next batch is chunked and embedded.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-upload") as uploader:
+        for batch in batched(changed_chunks(), batch_size):
+            phase_started = time.perf_counter()
+            texts = [f"{chunk.title}\n{chunk.text}" for chunk in batch]
+            vectors = embed_many(texts) if embed_many is not None else [embedder(text) for text in texts]
+            documents = [
+                IndexDocument(
+                    id=chunk.chunk_id,
+                    title=chunk.title,
+                    url=chunk.url,
+                    content=chunk.text,
+                    vector=[float(value) for value in vector],
+                )
+                for chunk, vector in zip(batch, vectors)
+            ]
+            stats.phase_seconds["embed"] += time.perf_counter() - phase_started
+            stats.embedded += len(batch)
+            if in_flight is not None:
+                wait_started = time.perf_counter()
+                in_flight.result()
+                waited += time.perf_counter() - wait_started
+            in_flight = uploader.submit(upload, documents, batch)
+        if in_flight is not None:
+            wait_started = time.perf_counter()
+            in_flight.result()
+            waited += time.perf_counter() - wait_started
+
+    stale = [chunk_id for chunk_id in state.hashes if chunk_id not in seen]
+    for batch in batched(stale, batch_size):
+        writer.delete(batch)
+        for chunk_id in batch:
+            del state.hashes[chunk_id]
+    stats.deleted = len(stale)
+    writer.flush()
+    state.save()
+    stats.elapsed = time.perf_counter() - started
+    # Reading and chunking is interleaved with the other phases and uploads overlap them,
+    # so chunking gets whatever the main thread did not spend embedding or waiting.
+    stats.phase_seconds["chunk"] = stats.elapsed - stats.phase_seconds["embed"] - waited
+    return stats
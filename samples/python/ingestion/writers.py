@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional, Protocol
+
+try:  # pragma: no cover - optional dependency
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents import SearchClient
+except ImportError:  # pragma: no cover - optional dependency
+    SearchClient = None  # type: ignore[assignment]
+    AzureKeyCredential = None  # type: ignore[assignment]
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class IndexDocument:
+    id: str
+    title: str
+    url: str
+    content: str
+    vector: list[float]
+
+
+class IndexWriter(Protocol):
+    def upload(self, documents: list[IndexDocument]) -> None: ...
+
+    def delete(self, document_ids: list[str]) -> None: ...
+
+    def flush(self) -> None: ...
+
+
+class LocalIndexWriter:
+    """Offline stand-in for a search index that accepts bulk batches.
+
+    Documents are kept in memory and written to ``directory/documents.jsonl`` on
+    :meth:`flush`. ``latency`` and ``per_document_latency`` simulate the service's bulk
+    upload cost so pipeline throughput can be measured without Azure.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        latency: float = 0.0,
+        per_document_latency: float = 0.0,
+        max_batch_size: int = 1000,
+    ) -> None:
+        self.directory = directory
+        self.latency = latency
+        self.per_document_latency = per_document_latency
+        self.max_batch_size = max_batch_size
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._documents: dict[str, dict] = {}
+        path = directory / "documents.jsonl"
+        if path.exists():
+            with path.open(encoding="utf-8") as stream:
+                for line in stream:
+                    record = json.loads(line)
+                    self._documents[record["id"]] = record
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _request(self, size: int) -> None:
+        if size > self.max_batch_size:
+            raise ValueError(f"Batch of {size} documents exceeds the limit of {self.max_batch_size}")
+        self.requests += 1
+        delay = self.latency + self.per_document_latency * size
+        if delay:
+            time.sleep(delay)
+
+    def upload(self, documents: list[IndexDocument]) -> None:
+        self._request(len(documents))
+        with self._lock:
+            self._documents.update((document.id, asdict(document)) for document in documents)
+
+    def delete(self, document_ids: list[str]) -> None:
+        self._request(len(document_ids))
+        with self._lock:
+            for document_id in document_ids:
+                self._documents.pop(document_id, None)
+
+    def flush(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / "documents.jsonl"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with self._lock, tmp_path.open("w", encoding="utf-8") as stream:
+            for record in self._documents.values():
+                stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+
+def _search_key(document_id: str) -> str:
+    # Search keys only allow letters, digits, "_", "-" and "="; chunk IDs contain "/" and "#".
+    return base64.urlsafe_b64encode(document_id.encode("utf-8")).decode("ascii")
+
+
+class AzureSearchIndexWriter:
+    """Push batches to an Azure AI Search index with ``azure-search-documents``.
+
+    The index needs ``id`` (key), ``title``, ``url``, ``content`` and a ``vector`` field
+    whose dimensions match the embedder. Chunk IDs are stored URL-safe base64 encoded.
+    """
+
+    def __init__(self, endpoint: str, index_name: str, api_key: Optional[str] = None, credential: object = None) -> None:
+        if SearchClient is None:
+            raise RuntimeError("azure-search-documents is required (pip install azure-search-documents)")
+        if credential is None:
+            if not api_key:
+                raise ValueError("Pass api_key or credential for the search service")
+            credential = AzureKeyCredential(api_key)
+        self._client = SearchClient(endpoint=endpoint, index_name=index_name, credential=credential)
+
+    def upload(self, documents: list[IndexDocument]) -> None:
+        records = [{**asdict(document), "id": _search_key(document.id)} for document in documents]
+        results = self._client.merge_or_upload_documents(records)
+        failed = [result.key for result in results if not result.succeeded]
+        if failed:
+            raise RuntimeError(f"Search service rejected {len(failed)} documents, e.g. {failed[:3]}")
+
+    def delete(self, document_ids: list[str]) -> None:
+        self._client.delete_documents([{"id": _search_key(document_id)} for document_id in document_ids])
+
+    def flush(self) -> None:
+        return
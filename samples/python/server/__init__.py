@@ -0,0 +1 @@
+"""Long-running HTTP service that keeps agents, clients and connection pools warm."""
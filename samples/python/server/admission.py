@@ -0,0 +1,111 @@
+"""Admission control for agent runs: bounded concurrency, bounded queue, fast rejection.
+
+An Agent Service project has its own rate limits, and every run started beyond them only
+waits longer or fails with 429 after minutes. The service therefore admits at most
+``max_in_flight`` runs at once and lets at most ``max_queue`` more wait (for up to
+``queue_timeout`` seconds) before answering ``429 Too Many Requests`` with a ``Retry-After``
+estimated from recent run durations. Rejecting early is cheaper for everyone than queueing
+without bound.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator
+
+
+class Overloaded(Exception):
+    """The run was not admitted; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True)
+class AdmissionStats:
+    max_in_flight: int
+    max_queue: int
+    in_flight: int = 0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    average_run_seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class AdmissionController:
+    """Gate runs with :meth:`admit`; raises :class:`Overloaded` instead of queueing forever.
+
+    Parameters
+    ----------
+    max_in_flight:
+        Runs executing at once.
+    max_queue:
+        Requests allowed to wait for a slot; ``0`` rejects as soon as every slot is busy.
+    queue_timeout:
+        Seconds a request may wait for a slot before it is rejected.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 32, queue_timeout: float = 10.0) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.queue_timeout = queue_timeout
+        self.stats = AdmissionStats(max_in_flight=max_in_flight, max_queue=max_queue)
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a request joining the queue now."""
+
+        stats = self.stats
+        average = stats.average_run_seconds or 1.0
+        return max(1, math.ceil(average * (stats.queued + 1) / stats.max_in_flight))
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.stats.rejected += 1
+        return Overloaded(reason, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a run slot for the duration of the ``async with`` block."""
+
+        stats = self.stats
+        if not self._slots.locked():
+            # A free slot is taken without yielding, so concurrent requests cannot all see it.
+            await self._slots.acquire()
+        elif stats.queued >= stats.max_queue:
+            raise self._reject("queue full")
+        else:
+            stats.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject("queue timeout") from None
+            finally:
+                stats.queued -= 1
+
+        stats.admitted += 1
+        stats.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+            stats.completed += 1
+            elapsed = time.monotonic() - started
+            # Exponentially weighted, so the Retry-After estimate follows the current load.
+            if stats.average_run_seconds:
+                stats.average_run_seconds += 0.2 * (elapsed - stats.average_run_seconds)
+            else:
+                stats.average_run_seconds = elapsed
+            self._slots.release()
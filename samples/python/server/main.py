@@ -0,0 +1,394 @@
+"""Long-running HTTP service exposing the workshop scenarios.
+
+Every sample pays its cold start (credential chain, token, TLS handshakes, agent lookup) on
+each invocation. This service pays it once: at start-up it acquires the agents of the
+enabled scenarios through the :class:`~samples.python.common.AgentRegistry`, opens one pooled
+async ``AIProjectClient`` and warms its connections, and then serves runs until it is stopped.
+
+Endpoints
+---------
+``POST /v1/{scenario}/runs``
+    Body ``{"message": "...", "thread_id": "optional"}``. Streams the run as server-sent
+    events: ``thread``, ``status``, ``delta``, ``tool_call``, ``error`` and a final ``done``
+    with token usage and timings. Without ``thread_id`` a thread is created for the request
+    and deleted afterwards. Answers ``429`` with ``Retry-After`` when overloaded.
+``POST /v1/threads`` / ``DELETE /v1/threads/{thread_id}``
+    Create or delete a thread for multi-turn conversations.
+``GET /healthz``
+    Enabled scenarios and admission statistics.
+
+::
+
+    python -m samples.python.server.main --port 8080 --max-in-flight 8 --max-queue 32
+    curl -N localhost:8080/v1/minimal/runs -H 'Content-Type: application/json' \\
+        -d '{"message": "What is 12 * 7?"}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+from ..common import (
+    AgentRegistry,
+    AsyncRunStream,
+    configure_logging,
+    configure_metrics,
+    get_metrics,
+    get_project_client,
+    load_config,
+    run_deadline,
+)
+from ..common.clients import pool_size_from_env
+from ..common.config import WorkshopConfig
+from ..common.metrics import THREAD_CREATE
+from .admission import AdmissionController, Overloaded
+from .scenarios import SCENARIOS, Scenario, available, prepare
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from aiohttp import web
+
+_logger = logging.getLogger("server")
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+def _service_error(exc: Exception) -> "web.Response":
+    """JSON error for a failed agent service call (an ``azure.core`` ``AzureError``).
+
+    The service's own status is passed on; otherwise ``503`` when the request never reached
+    the service (DNS, connection refused, connect timeout) and ``502`` for any other failure.
+    """
+
+    from aiohttp import web
+    from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+    if isinstance(exc, HttpResponseError) and exc.status_code:
+        status = exc.status_code
+    elif isinstance(exc, ServiceRequestError):
+        status = 503
+    else:
+        status = 502
+    return web.json_response({"error": str(getattr(exc, "message", None) or exc)}, status=status)
+
+
+def _usage(run: Any) -> Optional[dict[str, Any]]:
+    usage = getattr(run, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+    }
+
+
+def _event_payload(event: Any) -> Optional[dict[str, Any]]:
+    """JSON body of the server-sent event for a :class:`~samples.python.common.RunEvent`."""
+
+    if event.kind == "delta":
+        return {"text": event.text}
+    if event.kind == "status":
+        return {"status": event.status, "run_id": getattr(event.data, "id", None)}
+    if event.kind == "tool_call":
+        return {"step_id": getattr(event.data, "id", None)}
+    if event.kind == "error":
+        return {"status": event.status, "message": event.text or str(event.data)}
+    # Completed messages repeat the deltas, and ``done`` is sent with usage after the run.
+    return None
+
+
+class AgentService:
+    """Warm agents, one pooled async client and admission control behind an aiohttp app.
+
+    Parameters
+    ----------
+    config:
+        Workshop configuration.
+    scenarios:
+        Scenario names to serve; those without their settings are skipped.
+    admission:
+        Gate for concurrent runs.
+    pool_size:
+        Connections in the async client's pool; keep it at least ``max_in_flight``.
+    """
+
+    def __init__(
+        self,
+        config: WorkshopConfig,
+        scenarios: tuple[str, ...],
+        admission: AdmissionController,
+        *,
+        pool_size: int = 16,
+    ) -> None:
+        self.config = config
+        self.scenario_names = scenarios
+        self.admission = admission
+        self.pool_size = pool_size
+        self.scenarios: dict[str, Scenario] = {}
+        self.client: Any = None
+        self._registry: Optional[AgentRegistry] = None
+        self._logic_app: Any = None
+
+    def application(self) -> "web.Application":
+        from aiohttp import web
+
+        app = web.Application()
+        app.cleanup_ctx.append(self._lifecycle)
+        app.add_routes(
+            [
+                web.post("/v1/threads", self.create_thread),
+                web.delete("/v1/threads/{thread_id}", self.delete_thread),
+                web.post("/v1/{scenario}/runs", self.run_scenario),
+                web.get("/healthz", self.health),
+            ]
+        )
+        return app
+
+    async def _lifecycle(self, app: "web.Application") -> AsyncIterator[None]:
+        await self.start()
+        try:
+            yield
+        finally:
+            await self.stop()
+
+    async def start(self) -> None:
+        """Acquire the agents, open the shared client and warm its connections."""
+
+        from ..common import AsyncLogicAppClient, LogicAppToolConfig, open_async_project_client
+
+        names = available(self.config, self.scenario_names)
+        if "logic-app" in names:
+            self._logic_app = AsyncLogicAppClient(LogicAppToolConfig(callback_url=self.config.logic_app_callback_url))
+        sync_client = await asyncio.to_thread(get_project_client, self.config.project_endpoint)
+        self._registry = AgentRegistry(sync_client.agents, self.config.project_endpoint)
+        for name in names:
+            prepared = await asyncio.to_thread(
+                prepare, name, self.config, self._registry, logic_app_client=self._logic_app
+            )
+            for scenario in prepared:
+                self.scenarios[scenario.name] = scenario
+            _logger.info("Scenario ready (シナリオの準備完了): %s -> %s", name, prepared[0].agent_id)
+
+        if self.client is None:
+            self.client = open_async_project_client(self.config.project_endpoint, pool_size=self.pool_size)
+        await self._warm_up(min(self.pool_size, self.admission.stats.max_in_flight, 4))
+
+    async def _warm_up(self, connections: int) -> None:
+        async def touch() -> None:
+            async for _ in self.client.agents.list_agents(limit=1):
+                break
+
+        try:
+            await asyncio.gather(*(touch() for _ in range(connections)))
+        except Exception as exc:  # noqa: BLE001 - warm-up is best effort
+            _logger.warning("Client warm-up failed (ウォームアップに失敗しました): %s", exc)
+
+    async def stop(self) -> None:
+        """Return the agents to the registry and close the async clients."""
+
+        if self._registry is not None:
+            for scenario in self.scenarios.values():
+                await asyncio.to_thread(self._registry.release, scenario.agent_id)
+        self.scenarios.clear()
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+        if self._logic_app is not None:
+            await self._logic_app.close()
+
+    async def health(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.json_response(
+            {"status": "ok", "scenarios": self._public_scenarios(), "admission": self.admission.stats.to_dict()}
+        )
+
+    def _public_scenarios(self) -> list[str]:
+        # Helper agents (``connected:stock_price_bot``) are kept warm but not served directly.
+        return sorted(name for name in self.scenarios if ":" not in name)
+
+    async def create_thread(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        from azure.core.exceptions import AzureError
+
+        try:
+            with get_metrics().time(THREAD_CREATE):
+                thread = await self.client.agents.threads.create()
+        except AzureError as exc:
+            _logger.error("Failed to create a thread (スレッドの作成に失敗しました): %s", exc)
+            return _service_error(exc)
+        return web.json_response({"thread_id": thread.id}, status=201)
+
+    async def delete_thread(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+        from azure.core.exceptions import AzureError
+
+        try:
+            await self.client.agents.threads.delete(request.match_info["thread_id"])
+        except AzureError as exc:
+            _logger.error("Failed to delete the thread (スレッドの削除に失敗しました): %s", exc)
+            return _service_error(exc)
+        return web.Response(status=204)
+
+    async def run_scenario(self, request: "web.Request") -> "web.StreamResponse":
+        from aiohttp import web
+
+        name = request.match_info["scenario"]
+        scenario = self.scenarios.get(name) if ":" not in name else None
+        if scenario is None:
+            return web.json_response({"error": "unknown scenario", "scenarios": self._public_scenarios()}, status=404)
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({"error": "body must be JSON"}, status=400)
+        message = body.get("message") if isinstance(body, dict) else None
+        if not isinstance(message, str) or not message.strip():
+            return web.json_response({"error": "'message' is required"}, status=400)
+
+        try:
+            async with self.admission.admit():
+                return await self._stream_run(request, scenario, message, body.get("thread_id"))
+        except Overloaded as exc:
+            _logger.warning("Rejected run, service overloaded (過負荷のため実行を拒否しました): %s", exc.reason)
+            return web.json_response(
+                {"error": "overloaded", "reason": exc.reason, "retry_after": exc.retry_after},
+                status=429,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+
+    async def _stream_run(
+        self, request: "web.Request", scenario: Scenario, message: str, thread_id: Optional[str]
+    ) -> "web.StreamResponse":
+        from aiohttp import web
+        from azure.ai.agents.models import MessageRole
+        from azure.core.exceptions import AzureError
+
+        agents = self.client.agents
+        owned = thread_id is None
+        try:
+            if owned:
+                with get_metrics().time(THREAD_CREATE, scenario.agent_id):
+                    thread_id = (await agents.threads.create()).id
+            await agents.messages.create(thread_id=thread_id, role=MessageRole.USER, content=message)
+        except AzureError as exc:
+            _logger.error("Failed to prepare the thread (スレッドの準備に失敗しました): %s", exc)
+            if owned and thread_id is not None:
+                await self._discard_thread(thread_id)
+            return _service_error(exc)
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+        await response.prepare(request)
+        stream = AsyncRunStream(agents, thread_id=thread_id, agent_id=scenario.agent_id, functions=scenario.functions)
+        try:
+            await response.write(_sse("thread", {"thread_id": thread_id, "scenario": scenario.name}))
+            with run_deadline(scenario.run_budget):
+                async for event in stream:
+                    payload = _event_payload(event)
+                    if payload is not None:
+                        await response.write(_sse(event.kind, payload))
+            await response.write(
+                _sse(
+                    "done",
+                    {
+                        "status": getattr(stream.run, "status", None),
+                        "usage": _usage(stream.run),
+                        "time_to_first_token": stream.metrics.time_to_first_token,
+                        "duration": stream.metrics.duration,
+                    },
+                )
+            )
+            await response.write_eof()
+        except ConnectionResetError:
+            _logger.info("Client disconnected, cancelling the run (クライアントが切断したため実行をキャンセルします)")
+            await self._cancel_run(thread_id, stream.run)
+        except asyncio.CancelledError:
+            await self._cancel_run(thread_id, stream.run)
+            raise
+        except Exception as exc:  # noqa: BLE001 - the status line is sent, so report it in the stream
+            _logger.error("Run failed (実行に失敗しました): %s", exc)
+            await response.write(_sse("error", {"status": getattr(exc, "status_code", None), "message": str(exc)}))
+            await response.write_eof()
+        finally:
+            if owned:
+                await self._discard_thread(thread_id)
+        return response
+
+    async def _cancel_run(self, thread_id: str, run: Any) -> None:
+        if run is None or getattr(run, "status", None) in {"completed", "failed", "cancelled", "expired"}:
+            return
+        try:
+            await self.client.agents.runs.cancel(thread_id=thread_id, run_id=run.id)
+        except Exception as exc:  # noqa: BLE001 - the run expires on its own
+            _logger.debug("Could not cancel run %s: %s", run.id, exc)
+
+    async def _discard_thread(self, thread_id: str) -> None:
+        try:
+            await self.client.agents.threads.delete(thread_id)
+        except Exception as exc:  # noqa: BLE001 - cleanup is best effort
+            _logger.debug("Could not delete thread %s: %s", thread_id, exc)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated scenarios to serve ({', '.join(SCENARIOS)})"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Runs executing at once")
+    parser.add_argument("--max-queue", type=int, default=32, help="Requests waiting for a run slot before 429")
+    parser.add_argument("--queue-timeout", type=float, default=10.0, help="Seconds a request may wait in the queue")
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=None,
+        help="Connections in the Agent Service client pool (default WORKSHOP_HTTP_POOL_SIZE or 16)",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    configure_metrics()
+    # Read only now: configure_logging loads .env, which may set WORKSHOP_HTTP_POOL_SIZE.
+    pool_size = args.pool_size or pool_size_from_env()
+
+    try:
+        config = load_config()
+    except EnvironmentError as exc:
+        _logger.error("Failed to load configuration (設定の読み込みに失敗しました): %s", exc)
+        return 1
+
+    names = tuple(name.strip() for name in args.scenarios.split(",") if name.strip())
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    try:
+        from aiohttp import web
+    except ImportError:  # pragma: no cover - optional dependency
+        _logger.error("aiohttp is required for the service (pip install aiohttp)")
+        return 1
+
+    async def create_app() -> "web.Application":
+        # The semaphore and client pool must be created on the server's event loop.
+        admission = AdmissionController(args.max_in_flight, args.max_queue, args.queue_timeout)
+        service = AgentService(config, names, admission, pool_size=max(pool_size, args.max_in_flight))
+        return service.application()
+
+    _logger.info(
+        "Starting agent service on http://%s:%d (エージェント サービスを起動します)", args.host, args.port
+    )
+    web.run_app(create_app(), host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
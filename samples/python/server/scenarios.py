@@ -0,0 +1,138 @@
+"""Agent definitions served by the HTTP service.
+
+Each scenario uses the same agent definition as its sample (01–04), so the
+:class:`~samples.python.common.AgentRegistry` hands the service the agents the samples already
+created and the other way round. Agents are acquired once at start-up and kept for the
+lifetime of the process.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..common import AgentRegistry, ToolDispatcher, WorkshopConfig
+
+_logger = logging.getLogger("server.scenarios")
+
+SCENARIOS = ("minimal", "rag", "logic-app", "connected")
+
+
+@dataclass(slots=True)
+class Scenario:
+    """A warm agent and what a run of it needs locally.
+
+    Attributes
+    ----------
+    name:
+        URL path segment, one of :data:`SCENARIOS`.
+    agent_id:
+        The long-lived agent.
+    functions:
+        ``FunctionTool``/``AsyncFunctionTool``/:class:`ToolDispatcher` answering the
+        agent's function calls, if it has any.
+    run_budget:
+        Seconds each run (tool calls included) may take; ``None`` for no deadline.
+    """
+
+    name: str
+    agent_id: str
+    functions: Optional[Any] = None
+    run_budget: Optional[float] = None
+
+
+def _sample(package: str) -> Any:
+    # Sample packages start with a digit, so they cannot be named in an import statement.
+    return importlib.import_module(f"..{package}.main", __package__)
+
+
+def available(config: WorkshopConfig, names: tuple[str, ...] = SCENARIOS) -> list[str]:
+    """The requested scenarios whose settings are present; the others are logged and skipped."""
+
+    rag = _sample("02_ai_search_rag")
+    enabled = []
+    for name in names:
+        if name == "rag" and not (config.has_search or rag._local_index_dir() is not None):
+            _logger.warning(
+                "Skipping the rag scenario: AI Search is not configured (AI Search 未設定のため rag シナリオをスキップします)"
+            )
+        elif name == "logic-app" and not config.has_logic_app:
+            _logger.warning(
+                "Skipping the logic-app scenario: LOGIC_APP_CALLBACK_URL is not set (LOGIC_APP_CALLBACK_URL 未設定のため logic-app シナリオをスキップします)"
+            )
+        else:
+            enabled.append(name)
+    return enabled
+
+
+def prepare(
+    name: str, config: WorkshopConfig, registry: AgentRegistry, *, logic_app_client: Optional[Any] = None
+) -> list[Scenario]:
+    """Acquire the agents of scenario ``name``; the first item is the one requests run.
+
+    Blocking (it uses the sync registry): call it from a worker thread. ``logic_app_client``
+    is the shared :class:`~samples.python.common.AsyncLogicAppClient` for ``logic-app``.
+    """
+
+    model = config.model_deployment_name
+    if name == "minimal":
+        from azure.ai.agents.models import CodeInterpreterTool
+
+        agent_id = registry.acquire(
+            model=model,
+            name="workshop-minimal-agent",
+            instructions="You are a polite assistant for quick math checks.",
+            tools=CodeInterpreterTool().definitions,
+        )
+        return [Scenario(name, agent_id)]
+
+    if name == "rag":
+        rag = _sample("02_ai_search_rag")
+        search = rag._search_setup(config, rag._local_index_dir())
+        agent_id = registry.acquire(
+            model=model,
+            name="workshop-rag-agent",
+            instructions=search["instructions"],
+            tools=search["tools"],
+            tool_resources=search["tool_resources"],
+        )
+        return [Scenario(name, agent_id, functions=search["functions"])]
+
+    if name == "logic-app":
+        from ..common import create_async_logic_app_function_tool
+
+        logic_app = _sample("03_logic_app_tool")
+        tool = create_async_logic_app_function_tool(logic_app_client)
+        agent_id = registry.acquire(
+            model=model,
+            name="workshop-logic-app-agent",
+            instructions="You can send operational notifications by calling the send_email_via_logic_app tool.",
+            tools=tool.definitions,
+        )
+        functions = ToolDispatcher(tool, limits=logic_app.TOOL_LIMITS)
+        return [Scenario(name, agent_id, functions=functions, run_budget=logic_app.RUN_BUDGET_SECONDS)]
+
+    if name == "connected":
+        from azure.ai.agents.models import ConnectedAgentTool
+
+        child_id = registry.acquire(
+            model=model,
+            name="stock_price_bot",
+            instructions="When asked about stock prices, respond with the last known closing price and include the retrieval date.",
+        )
+        connected_tool = ConnectedAgentTool(
+            id=child_id,
+            name="stock_price_bot",
+            description="Fetches the latest available stock price information for a given company ticker.",
+        )
+        agent_id = registry.acquire(
+            model=model,
+            name="workshop-coordinator-agent",
+            instructions="You orchestrate specialist agents. When a user asks about stock prices, delegate to the stock_price_bot.",
+            tools=connected_tool.definitions,
+        )
+        return [Scenario(name, agent_id), Scenario(f"{name}:stock_price_bot", child_id)]
+
+    raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
@@ -0,0 +1,21 @@
+"""Import-time budgets of the sample modules (``common/importtime.py``).
+
+Each module is imported in fresh interpreters, so this is the slowest part of the suite.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from samples.python.common.importtime import BUDGETS_MS, measure
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_import_time_within_budget(module: str) -> None:
+    profile = measure(module)
+
+    heaviest = ", ".join(f"{name} {ms:.0f} ms" for name, ms in profile.direct_imports[:5])
+    assert profile.total_ms <= BUDGETS_MS[module], (
+        f"{module} took {profile.total_ms:.0f} ms to import (budget {BUDGETS_MS[module]} ms); "
+        f"heaviest direct imports: {heaviest}"
+    )
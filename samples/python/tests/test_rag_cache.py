@@ -0,0 +1,155 @@
+"""Tests for the RAG answer cache (``02_ai_search_rag/cache.py``).
+
+``HashingEmbedder`` is deterministic and needs no model, which is what these tests need; the
+sample itself only enables the similarity tier with a real embedding deployment.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+import pytest
+
+from samples.python.common.embeddings import HashingEmbedder
+
+cache_module = importlib.import_module("samples.python.02_ai_search_rag.cache")
+ResponseCache = cache_module.ResponseCache
+
+INDEX = "contoso-docs"
+QUESTION = "Summarise the maintenance contract updates for the Contoso product line"
+CITATION = {
+    "type": "url_citation",
+    "text": "【0:0†source】",
+    "url_citation": {"url": "https://contoso.example/contracts", "title": "Contracts"},
+}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def similarity_cache(**kwargs: object) -> ResponseCache:
+    return ResponseCache(embedder=HashingEmbedder(), threshold=0.9, **kwargs)
+
+
+def test_exact_hit_ignores_case_whitespace_and_trailing_punctuation(clock: Clock) -> None:
+    cache = ResponseCache()
+    cache.store(INDEX, QUESTION, "answer", [CITATION])
+
+    entry = cache.lookup(INDEX, "  summarise the maintenance contract updates for the contoso product line? ")
+
+    assert entry is not None
+    assert entry.text == "answer"
+    assert entry.similarity == 1.0
+    assert entry.url_citation_annotations[0].url_citation.url == "https://contoso.example/contracts"
+    assert (cache.hits, cache.similar_hits, cache.misses) == (1, 0, 0)
+
+
+def test_near_hit_returns_the_most_similar_answer(clock: Clock) -> None:
+    cache = similarity_cache()
+    cache.store(INDEX, QUESTION, "answer", [CITATION])
+
+    entry = cache.lookup(INDEX, QUESTION.replace("Summarise", "Summarize"))
+
+    assert entry is not None
+    assert entry.text == "answer"
+    assert 0.9 <= entry.similarity < 1.0
+    assert (cache.hits, cache.similar_hits) == (0, 1)
+
+
+def test_miss_for_unrelated_question_and_other_index(clock: Clock) -> None:
+    cache = similarity_cache()
+    cache.store(INDEX, QUESTION, "answer", [])
+
+    assert cache.lookup(INDEX, "How do I reset my password?") is None
+    assert cache.lookup("other-index", QUESTION) is None
+    assert cache.misses == 2
+
+
+def test_without_embedder_only_exact_questions_hit(clock: Clock) -> None:
+    cache = ResponseCache()
+    cache.store(INDEX, "What changed in the warranty for product A in 2024?", "A", [])
+
+    assert cache.lookup(INDEX, "What changed in the warranty for product B in 2024?") is None
+
+
+def test_entries_expire_after_ttl(clock: Clock) -> None:
+    cache = similarity_cache(ttl=60)
+    cache.store(INDEX, QUESTION, "answer", [])
+
+    clock.now += 59
+    assert cache.lookup(INDEX, QUESTION) is not None
+    clock.now += 2
+    assert cache.lookup(INDEX, QUESTION) is None
+    assert cache.lookup(INDEX, QUESTION.replace("Summarise", "Summarize")) is None
+
+
+def test_least_recently_used_entry_is_evicted(clock: Clock) -> None:
+    cache = ResponseCache(max_entries=2)
+    cache.store(INDEX, "first question", "1", [])
+    cache.store(INDEX, "second question", "2", [])
+    assert cache.lookup(INDEX, "first question") is not None
+
+    cache.store(INDEX, "third question", "3", [])
+
+    assert cache.lookup(INDEX, "second question") is None
+    assert cache.lookup(INDEX, "first question") is not None
+    assert cache.lookup(INDEX, "third question") is not None
+
+
+def test_persisted_vectors_are_only_reused_by_the_same_model(clock: Clock, tmp_path) -> None:
+    path = tmp_path / "rag-cache.json"
+    similarity_cache(path=path).store(INDEX, QUESTION, "answer", [CITATION])
+    near = QUESTION.replace("Summarise", "Summarize")
+
+    assert similarity_cache(path=path).lookup(INDEX, near) is not None
+    other_model = ResponseCache(path, embedder=HashingEmbedder(dim=128), threshold=0.9)
+    assert other_model.lookup(INDEX, near) is None
+    assert other_model.lookup(INDEX, QUESTION) is not None
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def __call__(self, text: str):
+        self.calls += 1
+        return super().__call__(text)
+
+
+def test_miss_then_store_embeds_the_question_once(clock: Clock) -> None:
+    embedder = CountingEmbedder()
+    cache = ResponseCache(embedder=embedder, threshold=0.9)
+    cache.store(INDEX, QUESTION, "answer", [])
+    embedder.calls = 0
+
+    assert cache.lookup(INDEX, "How do I reset my password?") is None
+    cache.store(INDEX, "How do I reset my password?", "reset", [])
+    assert cache.lookup(INDEX, "How do I reset my password?") is not None
+
+    assert embedder.calls == 1
+
+
+def test_hits_are_written_on_close_not_on_every_lookup(clock: Clock, tmp_path) -> None:
+    path = tmp_path / "rag-cache.json"
+    cache = ResponseCache(path)
+    cache.store(INDEX, QUESTION, "answer", [])
+    stored = path.read_text(encoding="utf-8")
+
+    assert cache.lookup(INDEX, QUESTION) is not None
+    assert path.read_text(encoding="utf-8") == stored
+
+    cache.close()
+    assert ResponseCache(path).lookup(INDEX, QUESTION).hits == 2
@@ -0,0 +1,73 @@
+"""Tests for the evaluator result cache keys (``05_evaluation/result_cache.py``)."""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+result_cache = importlib.import_module("samples.python.05_evaluation.result_cache")
+content_hash = result_cache.content_hash
+
+
+def converted(
+    run: str, call_id: str, order_id: str, *, created_at: str = "2025-01-01T00:00:00Z"
+) -> dict[str, Any]:
+    """``AIAgentConverter.convert``-shaped output of one run that looks up an order."""
+
+    return {
+        "query": [
+            {"role": "system", "content": "You look up orders."},
+            {
+                "createdAt": created_at,
+                "run_id": run,
+                "role": "user",
+                "content": [{"type": "text", "text": "Where is my order?"}],
+            },
+        ],
+        "response": [
+            {
+                "createdAt": created_at,
+                "run_id": run,
+                "role": "assistant",
+                "content": [
+                    {"type": "tool_call", "tool_call_id": call_id, "name": "get_order", "arguments": {"id": order_id}}
+                ],
+            },
+            {
+                "createdAt": created_at,
+                "run_id": run,
+                "tool_call_id": call_id,
+                "role": "tool",
+                "content": [{"type": "tool_result", "tool_result": {"id": order_id, "created_at": "2024-12-31"}}],
+            },
+            {
+                "createdAt": created_at,
+                "run_id": run,
+                "role": "assistant",
+                "content": [{"type": "text", "text": "It has shipped."}],
+            },
+        ],
+        "tool_definitions": [{"name": "get_order", "description": "Look up an order", "parameters": {}}],
+    }
+
+
+def test_regenerated_run_hashes_the_same() -> None:
+    first = converted("run_1", "call_abc", "A-100")
+    second = converted("run_2", "call_xyz", "A-100", created_at="2025-02-01T00:00:00Z")
+
+    assert content_hash(first) == content_hash(second)
+
+
+def test_tool_arguments_and_results_are_part_of_the_hash() -> None:
+    first = converted("run_1", "call_abc", "A-100")
+    second = converted("run_1", "call_abc", "B-999")
+
+    assert content_hash(first) != content_hash(second)
+
+
+def test_tool_result_timestamps_are_kept() -> None:
+    first = converted("run_1", "call_abc", "A-100")
+    second = converted("run_1", "call_abc", "A-100")
+    second["response"][1]["content"][0]["tool_result"]["created_at"] = "2025-06-30"
+
+    assert content_hash(first) != content_hash(second)